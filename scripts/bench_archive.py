@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import glob
+import tempfile
+import time
+
+from archive import PageArchive, archive_directory, prune_html
+from database import init_db, Source
+from reprocess import reprocess
+from writer import ArticleWriter
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'articles')
+
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.html'), recursive=True)):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    return pages
+
+def populate(Session, pages, count):
+    """
+    count articles of one source, each with its own page: one of pages with a line
+    that makes it unique, archived the way the scraper does.
+    """
+    session = Session()
+    source = Source(name="Bench", url="https://bench.example", archive_pages=True)
+    session.add(source)
+    session.commit()
+    archive = PageArchive(archive_directory(session.get_bind()))
+    source.archive_dictionary = archive.add_dictionary(pages[0])
+    session.commit()
+
+    writer = ArticleWriter(session, batch_size=500)
+    raw = 0
+    start = time.perf_counter()
+    for i in range(count):
+        html = pages[i % len(pages)].replace('</body>', f'<p>Edition {i}</p></body>', 1)
+        raw += len(html.encode('utf-8'))
+        page = archive.put(html, source.archive_dictionary)
+        writer.add({'title': f"Story {i}", 'url': f"https://bench.example/story/{i}", 'content': "Content",
+                    'summary': "Summary", 'sentiment': "Neutral", 'sentiment_score': 0.0,
+                    'source_id': source.id}, page)
+    writer.flush()
+    archive.close()
+    elapsed = time.perf_counter() - start
+    session.close()
+    return raw, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Page archive size per article and offline reprocessing speed")
+    parser.add_argument('--pages', default=FIXTURES, help="Directory of saved pages (*.html) of one site")
+    parser.add_argument('--articles', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, help="Reprocessing processes, defaults to one per core")
+    parser.add_argument('--skip-reprocess', action='store_true', help="Only measure the archive")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    pruned = sum(len(prune_html(html).encode('utf-8')) for html in pages) / len(pages)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_archive.db')
+    Session = init_db(f"sqlite:///{path}")
+    raw, elapsed = populate(Session, pages, args.articles)
+    directory = archive_directory(Session().get_bind())
+    stored = sum(os.path.getsize(name) for name in glob.glob(os.path.join(directory, '*')))
+    print(f"{len(pages)} pages from {os.path.abspath(args.pages)}")
+    print(f"Archived {args.articles} pages in {elapsed:.1f}s ({args.articles / elapsed:.0f}/s): "
+          f"{raw / args.articles / 1024:.1f} KB raw, {pruned / 1024:.1f} KB pruned, "
+          f"{stored / args.articles / 1024:.2f} KB stored per page")
+    if not args.skip_reprocess:
+        reprocess(f"sqlite:///{path}", workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from database import init_db, Source
+from scraper import NewsScraper
+
+PARAGRAPH = (
+    "The city council met on Tuesday to discuss the new transport plan, which proposes "
+    "additional bus routes, wider cycle lanes and a review of parking charges in the centre. "
+)
+
+def make_handler(article_count, latency):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == '/':
+                links = "".join(f'<a href="/news/story-{i}">Story {i}</a>' for i in range(article_count))
+                body = f"<html><body>{links}</body></html>"
+            elif self.path.startswith('/news/story-'):
+                story = self.path.rsplit('-', 1)[-1]
+                paragraphs = "".join(f"<p>{PARAGRAPH * 3}</p>" for _ in range(5))
+                body = (f"<html><head><title>Story {story}</title></head>"
+                        f"<body><article><h1>Story {story}</h1>{paragraphs}</article></body></html>")
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+def run(concurrency, base_url, db_dir, analysis_workers=None):
+    db_path = f"sqlite:///{os.path.join(db_dir, f'bench_{concurrency}_{analysis_workers}.db')}"
+    Session = init_db(db_path)
+    session = Session()
+    source = Source(name="Fixture", url=base_url, max_concurrency=concurrency,
+                    per_host_concurrency=concurrency, min_link_score=0)
+    session.add(source)
+    session.commit()
+
+    scraper = NewsScraper(db_path, analysis_workers=analysis_workers)
+    start = time.perf_counter()
+    added = scraper.scrape_source(source.id)
+    elapsed = time.perf_counter() - start
+    scraper.close()
+    session.close()
+    return added, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Article fetch throughput against a local fixture server")
+    parser.add_argument('--articles', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.3, help="Server delay per request in seconds")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--analysis-workers', type=int, nargs='+', default=[None],
+                        help="Analysis process counts to compare, defaults to one per core")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.articles, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        for workers in args.analysis_workers:
+            for concurrency in args.concurrency:
+                added, elapsed = run(concurrency, base_url, db_dir, workers)
+                print(f"analysis_workers={workers or os.cpu_count():<3} concurrency={concurrency:<3} articles={added:<4} "
+                      f"time={elapsed:6.2f}s  throughput={added / elapsed:6.2f} articles/s")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
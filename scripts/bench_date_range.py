@@ -0,0 +1,122 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, case
+from database import init_db, Source, Article
+from analytics import summary_metrics, sentiment_distribution, sentiment_by_source, daily_counts
+from queries import apply_filters, fetch_feed_page
+
+SOURCES = 20
+CATEGORIES = ['World', 'Business', 'Tech', 'Sport']
+SENTIMENTS = ['Positive', 'Neutral', 'Negative']
+INSERT_BATCH = 10000
+
+def populate(Session, count, years, rng):
+    session = Session()
+    sources = [Source(name=f"Source {i}", url=f"https://source{i}.example", category=CATEGORIES[i % len(CATEGORIES)])
+               for i in range(SOURCES)]
+    session.add_all(sources)
+    session.commit()
+
+    end = datetime(2024, 6, 30)
+    span = int(timedelta(days=365 * years).total_seconds())
+    start = time.perf_counter()
+    connection = session.connection()
+    for offset in range(0, count, INSERT_BATCH):
+        rows = []
+        for i in range(offset, min(offset + INSERT_BATCH, count)):
+            source = rng.choice(sources)
+            rows.append({
+                'title': f"Story {i}",
+                'url': f"https://bench.example/story/{i}",
+                'summary': "Summary",
+                'content': "Content",
+                'source_id': source.id,
+                'category': source.category,
+                'sentiment': rng.choice(SENTIMENTS),
+                'published_date': end - timedelta(seconds=rng.randrange(span)),
+            })
+        # Goes through the article_counts triggers like the scraper's inserts
+        connection.execute(Article.__table__.insert(), rows)
+        session.commit()
+        connection = session.connection()
+    print(f"Inserted {count} articles in {time.perf_counter() - start:.1f}s")
+    session.close()
+
+def scan_metrics(session, **filters):
+    """summary_metrics as computed from the article rows before the rollup, for comparison."""
+    statement = select(func.count(Article.id), func.count(case((Article.sentiment == 'Positive', 1))),
+                       func.count(case((Article.sentiment == 'Negative', 1))), func.count(Article.source_id.distinct()))
+    statement, _ = apply_filters(statement.select_from(Article), **filters)
+    return session.execute(statement).one()
+
+def scan_weekly(session, **filters):
+    """daily_counts per week from the article rows, for comparison."""
+    week = func.date(Article.published_date, '-6 days', 'weekday 1')
+    statement = select(week, Article.sentiment, func.count(Article.id)).select_from(Article).group_by(week, Article.sentiment)
+    statement, _ = apply_filters(statement, **filters)
+    return session.execute(statement).all()
+
+def timed(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard metrics and charts over date windows: rollup vs article scan")
+    parser.add_argument('--articles', type=int, default=1_000_000)
+    parser.add_argument('--years', type=int, default=5, help="History the articles are spread over")
+    parser.add_argument('--db', help="Reuse or create this database file instead of a temporary one")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_date_range.db')
+    Session = init_db(f"sqlite:///{path}")
+    session = Session()
+    existing = session.query(Article).count()
+    session.close()
+    if existing:
+        print(f"Using {existing} existing articles in {path}")
+    else:
+        populate(Session, args.articles, args.years, random.Random(args.seed))
+
+    last = datetime(2024, 6, 30).date()
+    windows = {
+        'week': (last - timedelta(days=6), last),
+        'year': (last - timedelta(days=364), last),
+        'all': None,
+    }
+    session = Session()
+    print(f"{'window':<8} {'filters':<16} {'metrics':>9} {'charts':>9} {'feed':>7} {'scan metrics':>13} {'scan weekly':>12}")
+    for window, date_range in windows.items():
+        for label, extra in (('none', {}), ('source+neg', {'source_filter': ["Source 3"], 'sentiment_filter': ["Negative"]})):
+            filters = dict(extra, date_range=date_range)
+
+            def charts():
+                sentiment_distribution(session, **filters)
+                sentiment_by_source(session, **filters)
+                daily_counts(session, bucket='week', **filters)
+
+            metrics_ms = timed(lambda: summary_metrics(session, **filters), args.repeat)
+            charts_ms = timed(charts, args.repeat)
+            feed_ms = timed(lambda: fetch_feed_page(session, **filters), args.repeat)
+            scan_ms = timed(lambda: scan_metrics(session, **filters), 1)
+            weekly_ms = timed(lambda: scan_weekly(session, **filters), 1)
+            print(f"{window:<8} {label:<16} {metrics_ms:7.1f}ms {charts_ms:7.1f}ms {feed_ms:5.1f}ms "
+                  f"{scan_ms:11.1f}ms {weekly_ms:10.1f}ms")
+    session.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import glob
+import json
+import re
+import time
+from collections import Counter
+from datetime import datetime
+
+from extractors import EXTRACTORS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'articles')
+WORD = re.compile(r"[^\W_]+")
+
+def load_fixtures(directory=FIXTURES):
+    """
+    Saved article pages (name.html) with the expected title, publish date and text (name.json).
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        with open(path[:-len('.html')] + '.json', encoding='utf-8') as f:
+            expected = json.load(f)
+        expected['publish_date'] = datetime.fromisoformat(expected['publish_date']) if expected['publish_date'] else None
+        fixtures.append((os.path.basename(path)[:-len('.html')], html, expected))
+    return fixtures
+
+def text_f1(extracted, expected):
+    """
+    Word-level F1 of the extracted text against the expected text.
+    """
+    got = Counter(WORD.findall(extracted.lower()))
+    want = Counter(WORD.findall(expected.lower()))
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(got.values())
+    recall = overlap / sum(want.values())
+    return 2 * precision * recall / (precision + recall)
+
+def bench(name, extract, fixtures, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [extract(expected['url'], html) for _, html, expected in fixtures]
+    elapsed = (time.perf_counter() - start) / repeat
+    titles = sum(result['title'] == expected['title'] for result, (_, _, expected) in zip(results, fixtures))
+    dates = sum(result['publish_date'] == expected['publish_date'] for result, (_, _, expected) in zip(results, fixtures))
+    f1s = [text_f1(result['text'], expected['text']) for result, (_, _, expected) in zip(results, fixtures)]
+    print(f"{name:<10} {elapsed * 1e3 / len(fixtures):7.2f} ms/page  titles={titles}/{len(fixtures)}  "
+          f"dates={dates}/{len(fixtures)}  text F1 mean={sum(f1s) / len(f1s):.3f} min={min(f1s):.3f}")
+    return results, f1s
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction time and accuracy on saved article pages")
+    parser.add_argument('--fixtures', default=FIXTURES, help="Directory of name.html / name.json pairs")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--verbose', action='store_true', help="Per-page results")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    for name, extract in EXTRACTORS.items():
+        # The first call imports the extractor's dependencies
+        extract(fixtures[0][2]['url'], fixtures[0][1])
+        results, f1s = bench(name, extract, fixtures, args.repeat)
+        if args.verbose:
+            for (page, _, expected), result, f1 in zip(fixtures, results, f1s):
+                print(f"  {page:<20} F1={f1:.3f} title={result['title'] == expected['title']!s:<5} "
+                      f"date={result['publish_date']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import desc
+from database import init_db, Source, Article
+from queries import fetch_feed_page
+
+SYLLABLES = ['ka', 'lu', 'mer', 'ta', 'sin', 'po', 'ra', 'de', 'van', 'bi', 'sol', 'ne', 'gu', 'tri', 'ox', 'em']
+VOCABULARY_SIZE = 20000
+WORDS_PER_ARTICLE = 60
+INSERT_BATCH = 10000
+
+def vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def populate(Session, count, rng):
+    words = vocabulary(rng)
+    # Zipf-like word frequencies, like natural text
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+
+    session = Session()
+    source = Source(name="Bench", url="https://bench.example")
+    session.add(source)
+    session.commit()
+
+    start = time.perf_counter()
+    connection = session.connection()
+    for offset in range(0, count, INSERT_BATCH):
+        rows = []
+        for i in range(offset, min(offset + INSERT_BATCH, count)):
+            text = rng.choices(words, cum_weights=cum_weights, k=WORDS_PER_ARTICLE)
+            rows.append({
+                'title': ' '.join(text[:8]),
+                'url': f"https://bench.example/story/{i}",
+                'summary': ' '.join(text[:20]),
+                'content': ' '.join(text),
+                'source_id': source.id,
+            })
+        # Goes through the articles_fts triggers like the scraper's inserts
+        connection.execute(Article.__table__.insert(), rows)
+        session.commit()
+        connection = session.connection()
+    print(f"Inserted {count} articles in {time.perf_counter() - start:.1f}s")
+    session.close()
+    return words
+
+def timed(run, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard topic search: FTS5 index vs LIKE scan")
+    parser.add_argument('--articles', type=int, default=1_000_000)
+    parser.add_argument('--db', help="Reuse or create this database file instead of a temporary one")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_fts.db')
+    Session = init_db(f"sqlite:///{path}")
+
+    session = Session()
+    existing = session.query(Article).count()
+    session.close()
+    if existing:
+        words = vocabulary(rng)
+        print(f"Using {existing} existing articles in {path}")
+    else:
+        words = populate(Session, args.articles, rng)
+
+    # Frequent, mid-frequency and rare words by Zipf rank. The synthetic vocabulary is
+    # built from few syllables, so short prefixes match far more words than in real text.
+    queries = [
+        words[50],
+        words[2000],
+        words[15000],
+        f'"{words[400]} {words[401]}"',
+        f'"{words[10]} {words[11]}"',
+        f'{words[3000][:6]}*',
+        f'{words[300][:4]}*',
+        f'{words[100]} {words[900]}',
+        f'{words[2000]} OR {words[3000]}',
+    ]
+
+    session = Session()
+    print(f"{'query':<32} {'fts ms':>8} {'hits':>6}")
+    for user_query in queries:
+        # First page of the dashboard feed for this search, with snippets
+        ms, (rows, _, _) = timed(lambda: fetch_feed_page(session, user_query), args.repeat)
+        print(f"{user_query:<32} {ms:8.1f} {len(rows):>6}")
+
+    word = words[2000]
+    def like_scan():
+        return (session.query(Article)
+                .filter(Article.title.contains(word) | Article.content.contains(word))
+                .order_by(desc(Article.published_date))
+                .all())
+    ms, rows = timed(like_scan, 1)
+    print(f"LIKE '%{word}%' (previous search): {ms:.1f} ms, {len(rows)} hits")
+    session.close()
+
+if __name__ == "__main__":
+    main()
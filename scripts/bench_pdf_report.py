@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from database import init_db, Source, Article
+from queries import iter_report_rows
+from report_generator import create_pdf_report, ReportBuilder
+
+WORDS = ("market growth policy model data city energy court report launch network health "
+         "research budget vote climate trade security software company").split()
+INSERT_BATCH = 5000
+
+def populate(Session, count, rng):
+    session = Session()
+    source = Source(name="Bench", url="https://bench.example")
+    session.add(source)
+    session.commit()
+
+    now = datetime.utcnow()
+    connection = session.connection()
+    for offset in range(0, count, INSERT_BATCH):
+        rows = []
+        for i in range(offset, min(offset + INSERT_BATCH, count)):
+            rows.append({
+                'title': ' '.join(rng.choices(WORDS, k=8)).capitalize(),
+                'url': f"https://bench.example/story/{i}",
+                'summary': ' '.join(rng.choices(WORDS, k=rng.randint(40, 120))),
+                'sentiment': rng.choice(["Positive", "Neutral", "Negative"]),
+                'published_date': now - timedelta(minutes=i),
+                'source_id': source.id,
+            })
+        connection.execute(Article.__table__.insert(), rows)
+    session.commit()
+    session.close()
+
+def measure(run):
+    # Timed without tracing, tracemalloc slows allocation-heavy code several times
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, result
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF report: in memory vs streamed to a file")
+    parser.add_argument('--articles', type=int, default=10_000)
+    parser.add_argument('--db', help="Reuse or create this database file instead of a temporary one")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_pdf.db')
+    Session = init_db(f"sqlite:///{path}")
+    session = Session()
+    if not session.query(Article).count():
+        populate(Session, args.articles, random.Random(1))
+    total = session.query(Article).count()
+    session.close()
+    print(f"{total} articles")
+
+    def in_memory():
+        session = Session()
+        try:
+            return len(create_pdf_report(list(iter_report_rows(session)), topic="All Topics"))
+        finally:
+            session.close()
+
+    def streamed():
+        # A new builder each time, so nothing is cached
+        builder = ReportBuilder(Session)
+        return os.path.getsize(builder.submit(ReportBuilder.fingerprint('bench', None, {})).result())
+
+    print(f"{'mode':<12} {'seconds':>8} {'peak MB':>8} {'size MB':>8}")
+    for name, run in (("in memory", in_memory), ("streamed", streamed)):
+        seconds, peak, size = measure(run)
+        print(f"{name:<12} {seconds:8.2f} {peak:8.1f} {size / 2**20:8.1f}")
+
+    # A second request with the same filters and data version is served from the cache
+    builder = ReportBuilder(Session)
+    builder.submit(ReportBuilder.fingerprint('bench', None, {})).result()
+    start = time.perf_counter()
+    builder.submit(ReportBuilder.fingerprint('bench', None, {})).result()
+    print(f"cached       {time.perf_counter() - start:8.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import random
+import time
+
+from url_filter import UrlFilter
+
+def legacy_should_scrape(url):
+    """The substring-based filter UrlFilter replaced, kept for comparison."""
+    skip_extensions = [
+        '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.mp4', '.mp3',
+        '.zip', '.rar', '.exe', '.dmg', '.css', '.js', '.xml', '.json'
+    ]
+    if any(url.lower().endswith(ext) for ext in skip_extensions):
+        return False
+    blocklist = [
+        'login', 'signin', 'signup', 'register', 'auth', 'password',
+        'account', 'profile', 'user', 'settings', 'preferences',
+        'contact', 'about', 'privacy', 'terms', 'tos', 'policy',
+        'search', 'query', 'filter', 'sort', 'order',
+        'cart', 'checkout', 'basket', 'shop',
+        'facebook.com', 'twitter.com', 'linkedin.com', 'instagram.com',
+        'javascript:', 'mailto:', 'tel:',
+        'vote?', 'hide?', 'submit', 'flag', 'reply', 'item?', 'from?', 'format=json'
+    ]
+    if any(keyword in url.lower() for keyword in blocklist):
+        return False
+    return True
+
+SECTIONS = ['news', 'sport', 'business', 'world', 'tech', 'opinion', 'lifestyle', 'metro']
+WORDS = ['council', 'backs', 'transport', 'plan', 'market', 'rally', 'election', 'result',
+         'about', 'town', 'storm', 'warning', 'budget', 'talks', 'stall', 'user', 'growth']
+NOISE = ['/login', '/about-us', '/privacy-policy', '/search?q=ai', '/account/settings',
+         '/cart', '/static/app.js', '/images/hero.jpg', '/news?sort=latest']
+
+def synthetic_links(count, seed=1):
+    rng = random.Random(seed)
+    links = []
+    for i in range(count):
+        if rng.random() < 0.3:
+            path = rng.choice(NOISE)
+        else:
+            slug = '-'.join(rng.choice(WORDS) for _ in range(rng.randint(3, 8)))
+            path = f"/{rng.choice(SECTIONS)}/2024/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{slug}-{i}"
+        if rng.random() < 0.2:
+            path += "?utm_source=newsletter&utm_medium=email"
+        links.append(f"https://www.example.com{path}")
+    return links
+
+def bench(name, check, links):
+    start = time.perf_counter()
+    kept = sum(1 for link in links if check(link))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {elapsed * 1e6 / len(links):6.2f} us/url  total={elapsed:6.3f}s  kept={kept}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-URL cost of the link filter")
+    parser.add_argument('--links', type=int, default=100_000)
+    args = parser.parse_args()
+
+    links = synthetic_links(args.links)
+    url_filter = UrlFilter(site_url="https://www.example.com", deny_patterns="/sponsored/\n/live-blog")
+    bench("legacy should_scrape", legacy_should_scrape, links)
+    bench("UrlFilter.allows", url_filter.allows, links)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import logging
-from database import init_db, Source
+import argparse
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from scraper import NewsScraper
+from database import init_db, Source
+from orchestrator import CrawlOrchestrator, DEFAULT_MAX_PARALLEL_SOURCES
 
 # Configure logging to write to a file
 root_logger = logging.getLogger()
@@ -15,27 +16,40 @@ root_logger.setLevel(logging.INFO)
 
 logger = logging.getLogger(__name__)
 
-def debug_scraper():
+def debug_scraper(parallel_sources=DEFAULT_MAX_PARALLEL_SOURCES, force=False):
     Session = init_db()
     session = Session()
-    
+
     sources = session.query(Source).all()
     if not sources:
         print("No sources found in database.")
         return
 
-    print(f"Found {len(sources)} sources. Starting scrape...")
-    
-    scraper = NewsScraper()
-    for source in sources:
-        print(f"Scraping {source.name} ({source.url})...")
-        try:
-            scraper.scrape_source(source.id)
-        except Exception as e:
-            logger.error(f"CRITICAL FAILURE for {source.name}: {e}", exc_info=True)
-            
-    scraper.close()
+    print(f"Found {len(sources)} sources. Starting scrape ({parallel_sources} in parallel)...")
+
+    orchestrator = CrawlOrchestrator(max_parallel_sources=parallel_sources)
+    try:
+        results = orchestrator.run(force=force)
+    except Exception as e:
+        logger.error(f"CRITICAL FAILURE: {e}", exc_info=True)
+        results = []
+    finally:
+        orchestrator.close()
+
+    for result in results:
+        if result['error']:
+            outcome = f"ERROR: {result['error']}"
+        elif result['unchanged']:
+            outcome = "front page unchanged"
+        else:
+            outcome = f"{result['articles']} new articles, {result['skipped_links']}/{result['links']} links skipped"
+        print(f"{result['name']:<30} {result['seconds']:7.1f}s  {outcome}")
     print("Scraping complete. Check scraper_debug.log for details.")
 
 if __name__ == "__main__":
-    debug_scraper()
+    parser = argparse.ArgumentParser(description="Crawl all sources and log to scraper_debug.log")
+    parser.add_argument('--parallel', type=int, default=DEFAULT_MAX_PARALLEL_SOURCES,
+                        help="Number of sources crawled at once")
+    parser.add_argument('--force', action='store_true', help="Crawl sources whose front page has not changed")
+    args = parser.parse_args()
+    debug_scraper(args.parallel, args.force)
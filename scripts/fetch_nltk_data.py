@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import nltk
+from analyzer import NLTK_DATA_DIR
+
+# punkt_tab is read by NLTK 3.9 and later, punkt by older versions
+RESOURCES = ('punkt_tab', 'punkt')
+
+def fetch_nltk_data():
+    """
+    Downloads the NLTK data the summarizer needs into NLTK_DATA_DIR (nltk_data/,
+    or $NLTK_DATA), where the analyzer finds it without network access. Run once
+    per install (the Docker image runs it at build time).
+    """
+    os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+    for resource in RESOURCES:
+        if not nltk.download(resource, download_dir=NLTK_DATA_DIR, quiet=True):
+            print(f"Failed to download {resource}")
+            return False
+    print(f"NLTK data installed in {NLTK_DATA_DIR}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if fetch_nltk_data() else 1)
@@ -1,23 +1,29 @@
-import sqlite3
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import func
+from database import init_db, Article
+from migrations import SCHEMA_VERSION, get_version
 
 def migrate():
-    import os
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'news_data.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    try:
-        print("Attempting to add 'include_external' column to 'sources' table...")
-        cursor.execute("ALTER TABLE sources ADD COLUMN include_external BOOLEAN DEFAULT 0")
-        conn.commit()
-        print("Migration successful.")
-    except sqlite3.OperationalError as e:
-        if "duplicate column" in str(e):
-            print("Column already exists. Skipping.")
-        else:
-            print(f"Migration failed: {e}")
-    finally:
-        conn.close()
+    # init_db applies any pending migrations, see src/migrations.py
+    Session = init_db()
+    session = Session()
+
+    version = get_version(session.connection())
+    print(f"Database schema is at version {version} (latest {SCHEMA_VERSION}).")
+
+    duplicates = (session.query(Article.canonical_url, func.count(Article.id))
+                  .group_by(Article.canonical_url)
+                  .having(func.count(Article.id) > 1)
+                  .all())
+    if duplicates:
+        print(f"{len(duplicates)} stories are stored more than once under URL variants:")
+        for canonical_url, count in duplicates:
+            print(f"  {count}x {canonical_url}")
+
+    session.close()
 
 if __name__ == "__main__":
     migrate()
@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select, update, func
+from database import init_db, Article, bump_data_version
+from analyzer import score_sentiments, sentiment_label
+
+# Articles read, scored and written per transaction
+CHUNK_SIZE = 2000
+
+def iter_chunks(session, chunk_size):
+    """
+    (ids, texts, labels) of every stored article, chunk_size at a time in id order.
+    """
+    last_id = 0
+    while True:
+        rows = session.execute(select(Article.id, Article.content, Article.sentiment)
+                               .where(Article.id > last_id).order_by(Article.id).limit(chunk_size)).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield [row.id for row in rows], [row.content or '' for row in rows], [row.sentiment for row in rows]
+
+def rescore(db_path=None, chunk_size=CHUNK_SIZE, workers=None, dry_run=False):
+    """
+    Recomputes sentiment and sentiment_score of every article with analyzer.score_sentiments.
+    Chunks are scored by a process pool while the previous ones are written.
+    """
+    workers = workers or os.cpu_count() or 1
+    Session = init_db(db_path)
+    session = Session()
+    total = session.query(func.count(Article.id)).scalar()
+    print(f"Re-scoring {total} articles...")
+
+    start = time.perf_counter()
+    done = changed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounded, so the table is never held in memory at once
+        pending = deque()
+        for chunk in iter_chunks(session, chunk_size):
+            pending.append((chunk, pool.submit(score_sentiments, chunk[1])))
+            if len(pending) < 2 * workers:
+                continue
+            done, changed = _write(session, *pending.popleft(), done, changed, dry_run)
+            print(f"  {done}/{total} articles, {done / (time.perf_counter() - start):.0f}/s")
+        while pending:
+            done, changed = _write(session, *pending.popleft(), done, changed, dry_run)
+
+    elapsed = time.perf_counter() - start
+    print(f"Re-scored {done} articles in {elapsed:.1f}s, {changed} changed label"
+          f"{' (dry run, nothing written)' if dry_run else ''}.")
+    if changed and not dry_run:
+        bump_data_version(session.get_bind())
+    session.close()
+    return changed
+
+def _write(session, chunk, scores, done, changed, dry_run):
+    ids, _, labels = chunk
+    scores = scores.result()
+    rows = [{'id': article_id, 'sentiment': sentiment_label(score), 'sentiment_score': float(score)}
+            for article_id, score in zip(ids, scores)]
+    changed += sum(row['sentiment'] != label for row, label in zip(rows, labels))
+    if not dry_run:
+        session.execute(update(Article), rows)
+        session.commit()
+    return done + len(rows), changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Recomputes the sentiment of every stored article")
+    parser.add_argument('--db', help="Database URL, defaults to data/news_data.db")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, help="Scoring processes, defaults to one per core")
+    parser.add_argument('--dry-run', action='store_true', help="Only count the articles whose label would change")
+    args = parser.parse_args()
+    rescore(args.db, args.chunk_size, args.workers, args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-from app import get_articles
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from database import init_db, Source, Article
+from queries import count_articles, fetch_feed_page
 from datetime import datetime, timedelta
 
 # Initialize DB
@@ -14,27 +14,25 @@ session = Session()
 if session.query(Article).count() == 0:
     print("No articles in DB. Skipping logic test.")
 else:
-    print("Testing get_articles logic...")
+    print("Testing dashboard query logic...")
     
     # Test 1: No filters
-    all_articles = get_articles()
-    print(f"All articles: {len(all_articles)}")
+    print(f"All articles: {count_articles(session)}")
+    rows, _, cursor = fetch_feed_page(session)
+    print(f"First page: {len(rows)} articles, more pages: {cursor is not None}")
     
     # Test 2: Sentiment Filter
-    pos_articles = get_articles(sentiment_filter=["Positive"])
-    print(f"Positive articles: {len(pos_articles)}")
+    print(f"Positive articles: {count_articles(session, sentiment_filter=['Positive'])}")
     
     # Test 3: Source Filter (Mocking if needed, but let's try with existing)
     sources = session.query(Source).all()
     if sources:
         s_name = sources[0].name
-        source_articles = get_articles(source_filter=[s_name])
-        print(f"Articles from {s_name}: {len(source_articles)}")
+        print(f"Articles from {s_name}: {count_articles(session, source_filter=[s_name])}")
 
     # Test 4: Date Range
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
-    date_articles = get_articles(date_range=(start_date, end_date))
-    print(f"Articles in last 30 days: {len(date_articles)}")
+    print(f"Articles in last 30 days: {count_articles(session, date_range=(start_date, end_date))}")
 
 print("UI Logic Verification Complete.")
@@ -0,0 +1,114 @@
+import pandas as pd
+from sqlalchemy import select, func, case
+from database import Article, ArticleCount, Source
+from queries import apply_filters, apply_rollup_filters
+
+# Periods daily_counts groups by, as SQLite date() modifiers from the day. Weeks start on Monday.
+BUCKETS = {
+    'day': (),
+    'week': ('-6 days', 'weekday 1'),
+}
+
+def _frame(session, statement, columns, topic_filter, filters):
+    statement, _ = apply_filters(statement, topic_filter, **filters)
+    if statement is None:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(session.execute(statement).all(), columns=columns)
+
+def _rollup_frame(session, statement, columns, filters=None):
+    if filters is not None:
+        statement = apply_rollup_filters(statement, **filters)
+    frame = pd.DataFrame(session.execute(statement).all(), columns=columns)
+    # The rollup stores a missing sentiment as ''. Queries group by the plain column,
+    # so groups follow the rollup's key order instead of being sorted.
+    if 'Sentiment' in frame:
+        frame['Sentiment'] = frame['Sentiment'].replace('', None)
+    return frame
+
+def summary_metrics(session, topic_filter=None, **filters):
+    """
+    Counts for the metrics row, in one aggregate query:
+    {'total', 'positive', 'negative', 'sources'}.
+    Without a search they are summed from the article_counts rollup.
+    """
+    columns = ['total', 'positive', 'negative', 'sources']
+    if topic_filter:
+        statement = select(
+            func.count(Article.id),
+            func.count(case((Article.sentiment == 'Positive', 1))),
+            func.count(case((Article.sentiment == 'Negative', 1))),
+            func.count(Article.source_id.distinct()),
+        ).select_from(Article)
+        frame = _frame(session, statement, columns, topic_filter, filters)
+    else:
+        statement = select(
+            func.coalesce(func.sum(ArticleCount.count), 0),
+            func.coalesce(func.sum(case((ArticleCount.sentiment == 'Positive', ArticleCount.count))), 0),
+            func.coalesce(func.sum(case((ArticleCount.sentiment == 'Negative', ArticleCount.count))), 0),
+            func.count(func.nullif(ArticleCount.source_id, 0).distinct()),
+        )
+        frame = _rollup_frame(session, statement, columns, filters)
+    if frame.empty:
+        return {'total': 0, 'positive': 0, 'negative': 0, 'sources': 0}
+    return {name: int(value) for name, value in frame.iloc[0].items()}
+
+def sentiment_distribution(session, topic_filter=None, **filters):
+    """
+    One row per sentiment: Sentiment, Count.
+    """
+    if not topic_filter:
+        statement = select(ArticleCount.sentiment, func.sum(ArticleCount.count)).group_by(ArticleCount.sentiment)
+        return _rollup_frame(session, statement, ['Sentiment', 'Count'], filters)
+    statement = (select(Article.sentiment, func.count(Article.id))
+                 .select_from(Article)
+                 .group_by(Article.sentiment))
+    return _frame(session, statement, ['Sentiment', 'Count'], topic_filter, filters)
+
+def sentiment_by_source(session, topic_filter=None, **filters):
+    """
+    One row per source and sentiment: Source, Sentiment, Count.
+    """
+    if not topic_filter:
+        counts = apply_rollup_filters(
+            select(ArticleCount.source_id, func.nullif(ArticleCount.sentiment, '').label('sentiment'),
+                   func.sum(ArticleCount.count).label('count'))
+            .group_by(ArticleCount.source_id, ArticleCount.sentiment), **filters)
+    else:
+        counts = (select(Article.source_id, Article.sentiment, func.count(Article.id).label('count'))
+                  .select_from(Article)
+                  .group_by(Article.source_id, Article.sentiment))
+        counts, _ = apply_filters(counts, topic_filter, **filters)
+        if counts is None:
+            return pd.DataFrame(columns=['Source', 'Sentiment', 'Count'])
+    # Name the sources after grouping, so the join touches one row per group
+    counts = counts.subquery()
+    statement = (select(func.coalesce(Source.name, 'Unknown'), counts.c.sentiment, counts.c.count)
+                 .select_from(counts)
+                 .outerjoin(Source, Source.id == counts.c.source_id))
+    return pd.DataFrame(session.execute(statement).all(), columns=['Source', 'Sentiment', 'Count'])
+
+def daily_counts(session, topic_filter=None, bucket='day', **filters):
+    """
+    Articles per publication day (or week, see BUCKETS) and sentiment: Date, Sentiment, Count.
+    """
+    if not topic_filter:
+        # Days first, in the rollup's key order, so periods are computed once per day
+        days = apply_rollup_filters(
+            select(ArticleCount.day, ArticleCount.sentiment, func.sum(ArticleCount.count).label('count'))
+            .where(ArticleCount.day != '')
+            .group_by(ArticleCount.day, ArticleCount.sentiment), **filters).subquery()
+        period = func.date(days.c.day, *BUCKETS[bucket])
+        statement = (select(period, days.c.sentiment, func.sum(days.c.count))
+                     .group_by(period, days.c.sentiment)
+                     .order_by(period))
+        frame = _rollup_frame(session, statement, ['Date', 'Sentiment', 'Count'])
+    else:
+        period = func.date(Article.published_date, *BUCKETS[bucket])
+        statement = (select(period, Article.sentiment, func.count(Article.id))
+                     .select_from(Article)
+                     .where(Article.published_date.is_not(None))
+                     .group_by(period, Article.sentiment)
+                     .order_by(period))
+        frame = _frame(session, statement, ['Date', 'Sentiment', 'Count'], topic_filter, filters)
+    frame['Date'] = pd.to_datetime(frame['Date'])
+    return frame
@@ -7,47 +7,133 @@ if sys.platform == 'win32':
 
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine, desc
-from sqlalchemy.orm import sessionmaker
-from database import Article, Source, init_db
-from scraper import NewsScraper
+from sqlalchemy import select
+from database import Article, Source, CrawlState, init_db, data_version, bump_data_version
+from jobs import ACTIVE_STATUSES, QUEUED, RUNNING, STALE_AFTER, enqueue_crawl, recent_jobs, live_workers, job_results
+from worker import spawn_worker
+from scheduler import MAX_INTERVAL
+from link_scorer import DEFAULT_MIN_LINK_SCORE
+from queries import fetch_feed_page
+from report_generator import ReportBuilder
+from analytics import summary_metrics, sentiment_distribution, sentiment_by_source, daily_counts
 import plotly.express as px
 from datetime import datetime, timedelta, date
-import time
+from functools import partial
 
 st.set_page_config(page_title="News Scraper & Analyzer", layout="wide", page_icon="📰")
 
 # Database connection
 Session = init_db()
 session = Session()
+engine = session.get_bind()
+
+# Every interaction reruns this script. Reads are cached on the data version and the
+# filters, so an unchanged dashboard renders without querying the database; every
+# write bumps the version (the scraper through ArticleWriter).
+CACHE_ENTRIES = 64
+# Crawl jobs listed in the sidebar and how often their progress is polled
+JOBS_SHOWN = 3
+JOB_POLL_SECONDS = 2
+# Days shown as daily bars, longer spans are charted per week
+MAX_DAILY_BARS = 120
+
+def commit_changes():
+    session.commit()
+    bump_data_version(engine)
+
+def save_source(source_id, **values):
+    session.query(Source).filter_by(id=source_id).update(values)
+    commit_changes()
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_sources(version):
+    return session.execute(select(*Source.__table__.columns).order_by(Source.id)).all()
 
 def get_sources():
-    return session.query(Source).all()
+    return load_sources(data_version(engine))
 
-def get_articles(topic_filter=None, source_filter=None, sentiment_filter=None, date_range=None, category_filter=None):
-    query = session.query(Article).order_by(desc(Article.published_date))
-    
-    if topic_filter:
-        query = query.filter(Article.title.contains(topic_filter) | Article.content.contains(topic_filter))
-    
-    if source_filter:
-        query = query.join(Source).filter(Source.name.in_(source_filter))
-        
-    if category_filter:
-        # Join Source if not already joined (it might be joined by source_filter, but SQLAlchemy handles this usually or we can be explicit)
-        # To be safe and simple, we can filter on Article.category if we trust it, or Source.category
-        # Since we added category to Article, let's use that.
-        query = query.filter(Article.category.in_(category_filter))
-        
-    if sentiment_filter:
-        query = query.filter(Article.sentiment.in_(sentiment_filter))
-        
-    if date_range:
-        # date_range is a tuple (start_date, end_date)
-        if len(date_range) == 2:
-            query = query.filter(Article.published_date >= date_range[0], Article.published_date <= date_range[1])
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_metrics(version, search_query, filters):
+    return summary_metrics(session, search_query, **filters)
 
-    return query.all()
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_feed_page(version, search_query, after, filters):
+    return fetch_feed_page(session, search_query, after=after, **filters)
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_charts(version, search_query, filters):
+    per_period = daily_counts(session, search_query, **filters)
+    bucket = 'day'
+    if not per_period.empty and (per_period['Date'].max() - per_period['Date'].min()).days > MAX_DAILY_BARS:
+        bucket = 'week'
+        per_period = daily_counts(session, search_query, bucket=bucket, **filters)
+    return (sentiment_distribution(session, search_query, **filters),
+            sentiment_by_source(session, search_query, **filters),
+            per_period, bucket)
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_jobs(version):
+    return recent_jobs(session, JOBS_SHOWN)
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_schedule(version):
+    rows = session.execute(select(CrawlState.source_id, CrawlState.interval, CrawlState.next_crawl_at,
+                                  CrawlState.new_per_hour)).all()
+    return {row.source_id: row for row in rows}
+
+def job_label(job):
+    return f"{'Scheduled crawl' if job.scheduled else 'Crawl'} #{job.id}"
+
+def describe_result(result):
+    if result['error']:
+        return f"Error scraping {result['name']}: {result['error']}"
+    if result['unchanged']:
+        return f"{result['name']}: front page unchanged, skipped"
+    return (f"{result['name']}: {result['articles']} new articles in {result['seconds']:.1f}s "
+            + (f"(from {result['links']} feed entries)" if result['from_feeds'] else
+               f"({result['skipped_links']} of {result['links']} links skipped as non-articles)"))
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def crawl_jobs_panel():
+    """
+    Progress of crawl jobs, polled while the rest of the page stays as it is.
+    Reads are keyed on the jobs version, so polling an idle queue costs no queries.
+    """
+    jobs = load_jobs(data_version(engine, 'jobs'))
+    watched = st.session_state.setdefault('watched_jobs', set())
+    for job in jobs:
+        if job.status in ACTIVE_STATUSES:
+            watched.add(job.id)
+        elif job.id in watched:
+            # A crawl finished, reload the dashboard to show its articles
+            watched.discard(job.id)
+            st.rerun()
+
+    for job in jobs:
+        if job.status == QUEUED:
+            st.info(f"{job_label(job)} queued")
+            if datetime.utcnow() - job.created_at > timedelta(seconds=STALE_AFTER):
+                st.warning("No worker has picked this crawl up. Start one with `python src/worker.py`.")
+        elif job.status == RUNNING:
+            total = job.sources_total or 1
+            st.progress(min(job.sources_done / total, 1.0),
+                        text=f"{job_label(job)}: {job.articles} new articles, {job.sources_done} of {job.sources_total} sources done")
+            for result in job_results(job):
+                st.caption(describe_result(result))
+
+    finished = next((job for job in jobs if job.status not in ACTIVE_STATUSES), None)
+    if finished:
+        if finished.error:
+            st.error(f"{job_label(finished)} failed: {finished.error}")
+        else:
+            st.success(f"{job_label(finished)} complete: {finished.articles} new articles.")
+        with st.expander("Crawl details"):
+            for result in job_results(finished):
+                st.caption(describe_result(result))
+
+@st.cache_resource
+def get_report_builder():
+    return ReportBuilder(Session)
 
 # Custom CSS
 st.markdown("""
@@ -82,6 +168,7 @@ st.markdown("""
     .sentiment-positive { background-color: #28a745; }
     .sentiment-negative { background-color: #dc3545; }
     .sentiment-neutral { background-color: #6c757d; }
+    .article-card mark { background-color: #fff3a3; padding: 0 2px; }
 </style>
 """, unsafe_allow_html=True)
 
@@ -101,6 +188,9 @@ with st.sidebar:
         requires_login = st.checkbox("Requires Login")
         include_external = st.checkbox("Include External Links (for aggregators like HN)", value=False)
         category = st.text_input("Category (e.g. Tech, Finance)", placeholder="Optional")
+        max_concurrency = st.number_input("Parallel Article Pages", min_value=1, max_value=16, value=4)
+        per_host_concurrency = st.number_input("Parallel Fetches per Host", min_value=1, max_value=16, value=2)
+        feed_urls = st.text_area("RSS / Sitemap URLs (one per line)", placeholder="Optional, detected automatically")
         
         login_url = ""
         username = ""
@@ -124,6 +214,9 @@ with st.sidebar:
                         requires_login=requires_login,
                         include_external=include_external,
                         category=category,
+                        max_concurrency=max_concurrency,
+                        per_host_concurrency=per_host_concurrency,
+                        feed_urls=feed_urls.strip() or None,
                         login_url=login_url,
                         username=username,
                         password=password,
@@ -131,7 +224,7 @@ with st.sidebar:
                         password_selector=p_selector
                     )
                     session.add(new_source)
-                    session.commit()
+                    commit_changes()
                     st.success(f"Added {new_name}")
                     st.rerun()
                 except Exception as e:
@@ -146,7 +239,7 @@ with st.sidebar:
     st.divider()
 
     with st.expander("Manage Sources"):
-        sources = session.query(Source).all()
+        sources = get_sources()
         if not sources:
             st.info("No sources added yet.")
         else:
@@ -157,62 +250,140 @@ with st.sidebar:
                 # Edit: Category
                 new_cat = st.text_input("Category", value=source.category if source.category else "", key=f"cat_{source.id}")
                 if new_cat != (source.category if source.category else ""):
-                    source.category = new_cat
-                    session.commit()
+                    save_source(source.id, category=new_cat)
                     st.success("Category updated!")
                     st.rerun()
                 
                 # Edit: Toggle External
                 new_ext = st.checkbox("Include External", value=source.include_external, key=f"ext_{source.id}")
                 if new_ext != source.include_external:
-                    source.include_external = new_ext
-                    session.commit()
+                    save_source(source.id, include_external=new_ext)
                     st.success("Updated!")
                     st.rerun()
                 
+                # Edit: Concurrency
+                new_max = st.number_input("Parallel Article Pages", min_value=1, max_value=16,
+                                          value=source.max_concurrency or 4, key=f"conc_{source.id}")
+                new_per_host = st.number_input("Parallel Fetches per Host", min_value=1, max_value=16,
+                                               value=source.per_host_concurrency or 2, key=f"host_conc_{source.id}")
+                if new_max != (source.max_concurrency or 4) or new_per_host != (source.per_host_concurrency or 2):
+                    save_source(source.id, max_concurrency=new_max, per_host_concurrency=new_per_host)
+                    st.success("Updated!")
+                    st.rerun()
+
+                # Edit: Fetch Mode
+                tier_labels = {None: "Auto", "http": "Plain HTTP", "browser": "Browser"}
+                tier_options = list(tier_labels)
+                new_tier = st.selectbox("Fetch Mode", tier_options, format_func=tier_labels.get,
+                                        index=tier_options.index(source.fetch_tier) if source.fetch_tier in tier_labels else 0,
+                                        key=f"tier_{source.id}", help="Learned automatically. Use Browser for sites that need JavaScript.")
+                if new_tier != source.fetch_tier:
+                    save_source(source.id, fetch_tier=new_tier)
+                    st.success("Updated!")
+                    st.rerun()
+
+                # Edit: Link Discovery
+                discovery_labels = {None: "Feeds, else Front Page", "feeds": "Feeds Only", "page": "Front Page Only"}
+                discovery_options = list(discovery_labels)
+                new_discovery = st.selectbox("Link Discovery", discovery_options, format_func=discovery_labels.get,
+                                             index=discovery_options.index(source.discovery) if source.discovery in discovery_labels else 0,
+                                             key=f"discovery_{source.id}")
+                new_feeds = st.text_area("RSS / Sitemap URLs (one per line)", value=source.feed_urls or "",
+                                         key=f"feeds_{source.id}", help="Detected automatically when empty.")
+                if new_discovery != source.discovery or new_feeds.strip() != (source.feed_urls or ""):
+                    save_source(source.id, discovery=new_discovery, feed_urls=new_feeds.strip() or None)
+                    st.success("Updated!")
+                    st.rerun()
+
+                # Edit: Extractor
+                extractor_labels = {None: "Fast (lxml), newspaper3k Fallback", "lxml": "Fast (lxml) Only",
+                                    "newspaper": "newspaper3k Only"}
+                extractor_options = list(extractor_labels)
+                new_extractor = st.selectbox("Article Extractor", extractor_options, format_func=extractor_labels.get,
+                                             index=extractor_options.index(source.extractor) if source.extractor in extractor_labels else 0,
+                                             key=f"extractor_{source.id}",
+                                             help="Use newspaper3k for sites whose article text the fast extractor misses.")
+                if new_extractor != source.extractor:
+                    save_source(source.id, extractor=new_extractor)
+                    st.success("Updated!")
+                    st.rerun()
+
+                # Edit: Page Archive
+                new_archive = st.checkbox("Archive Pages", value=bool(source.archive_pages), key=f"archive_{source.id}",
+                                          help="Keep compressed copies of fetched article pages, so articles can be "
+                                               "extracted again with python src/reprocess.py without re-crawling.")
+                if new_archive != bool(source.archive_pages):
+                    save_source(source.id, archive_pages=new_archive)
+                    st.success("Updated!")
+                    st.rerun()
+
+                # Edit: Link Scoring
+                current_score = source.min_link_score if source.min_link_score is not None else DEFAULT_MIN_LINK_SCORE
+                new_score = st.slider("Article Link Threshold", 0.0, 1.0, value=float(current_score), step=0.05,
+                                      key=f"score_{source.id}", help="Links scored below this are not fetched. 0 fetches everything.")
+                if new_score != current_score:
+                    save_source(source.id, min_link_score=new_score)
+                    st.success("Updated!")
+                    st.rerun()
+
+                # Edit: URL Rules
+                new_allow = st.text_area("Always Allow URLs (regex per line)", value=source.allow_patterns or "",
+                                         key=f"allow_{source.id}", help="Matching links skip the built-in blocklist.")
+                new_deny = st.text_area("Never Scrape URLs (regex per line)", value=source.deny_patterns or "",
+                                        key=f"deny_{source.id}")
+                if new_allow != (source.allow_patterns or "") or new_deny != (source.deny_patterns or ""):
+                    save_source(source.id, allow_patterns=new_allow, deny_patterns=new_deny)
+                    st.success("URL rules updated!")
+                    st.rerun()
+
+                # Edit: Schedule
+                new_interval = st.number_input("Crawl Every (minutes)", min_value=0, max_value=MAX_INTERVAL, step=15,
+                                               value=source.crawl_interval or 0, key=f"interval_{source.id}",
+                                               help="For scheduled crawls (python src/worker.py --schedule). "
+                                                    "0 adapts to how often the source publishes.")
+                if new_interval != (source.crawl_interval or 0):
+                    save_source(source.id, crawl_interval=new_interval or None)
+                    st.success("Updated!")
+                    st.rerun()
+                schedule = load_schedule(data_version(engine, 'jobs')).get(source.id)
+                if schedule and schedule.interval:
+                    rate = f", {schedule.new_per_hour:.1f} new articles/hour" if schedule.new_per_hour is not None else ""
+                    st.caption(f"Next scheduled crawl {schedule.next_crawl_at:%Y-%m-%d %H:%M} UTC "
+                               f"(every {source.crawl_interval or schedule.interval:.0f} min{rate})")
+
                 # Delete
                 if st.button("Delete", key=f"del_src_{source.id}"):
                     # Delete associated articles first
                     session.query(Article).filter_by(source_id=source.id).delete()
-                    session.delete(source)
-                    session.commit()
+                    session.query(CrawlState).filter_by(source_id=source.id).delete()
+                    session.query(Source).filter_by(id=source.id).delete()
+                    commit_changes()
                     st.success(f"Deleted {source.name}")
                     st.rerun()
                 st.divider()
     
     st.header("🚀 Actions")
+    parallel_sources = st.number_input("Sources in Parallel", min_value=1, max_value=10, value=3)
+    force_crawl = st.checkbox("Re-crawl unchanged sources", value=False,
+                              help="By default sources whose front page has not changed since the last run are skipped.")
     if st.button("Run Scraper", type="primary", width="stretch"):
-        sources = get_sources()
-        if not sources:
+        if not get_sources():
             st.warning("No sources configured.")
         else:
-            with st.status("Scraping in progress...", expanded=True) as status:
-                scraper = NewsScraper()
-                progress_bar = st.progress(0)
-                
-                stats = {'count': 0}
-                stats_placeholder = status.empty()
-                
-                def on_progress():
-                    stats['count'] += 1
-                    stats_placeholder.markdown(f"**Found {stats['count']} new articles...**")
-
-                for i, source in enumerate(sources):
-                    status.write(f"Scraping {source.name}...")
-                    try:
-                        scraper.scrape_source(source.id, on_progress=on_progress)
-                    except Exception as e:
-                        status.error(f"Error scraping {source.name}: {e}")
-                    progress_bar.progress((i + 1) / len(sources))
-                
-                status.update(label=f"Scraping Complete! Found {stats['count']} new articles.", state="complete", expanded=False)
-                scraper.close()
-                time.sleep(1)
-                st.rerun()
+            # Crawls run in a worker process, so they survive page reloads and app restarts
+            enqueue_crawl(session, force=force_crawl, max_parallel_sources=parallel_sources)
+            if not live_workers(session):
+                spawn_worker(os.path.join(os.path.dirname(engine.url.database), "worker.log"))
+            st.rerun()
+
+    crawl_jobs_panel()
 
     if st.button("Clear All Data", type="secondary", width="stretch"):
         session.query(Article).delete()
-        session.commit()
+        # Otherwise the next crawl finds every front page unchanged and stores nothing
+        session.query(CrawlState).update({CrawlState.etag: None, CrawlState.last_modified: None,
+                                          CrawlState.links_hash: None, CrawlState.settings_hash: None})
+        commit_changes()
         st.success("Database cleared.")
         st.rerun()
 
@@ -225,33 +396,39 @@ st.subheader("🔍 Filter & Explore")
 c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
 
 with c1:
-    search_query = st.text_input("Search Topics", placeholder="e.g. AI, Crypto, Politics")
+    search_query = st.text_input("Search Topics", placeholder="e.g. AI, Crypto, Politics",
+                                 help='Words must all match. Use "quotes" for phrases, crypt* for prefixes and OR for alternatives.')
 with c2:
     available_sources = [s.name for s in get_sources()]
     source_filter = st.multiselect("Source", available_sources)
 with c3:
     # Get unique categories
-    categories = session.query(Source.category).distinct().all()
-    available_categories = [c[0] for c in categories if c[0]]
+    available_categories = list(dict.fromkeys(s.category for s in get_sources() if s.category))
     category_filter = st.multiselect("Category", available_categories)
     
     sentiment_filter = st.multiselect("Sentiment", ["Positive", "Neutral", "Negative"])
 with c4:
     date_range = st.date_input("Date Range", [])
+    collapse_duplicates = st.checkbox("Collapse duplicates", value=True,
+                                      help="Show stories published under several URLs or by several sources once, "
+                                           "under the first copy stored.")
 
 # Fetch Data (Filtered)
-articles = get_articles(search_query, source_filter, sentiment_filter, date_range, category_filter)
+filters = dict(source_filter=source_filter, sentiment_filter=sentiment_filter,
+               date_range=date_range, category_filter=category_filter, collapse_duplicates=collapse_duplicates)
+version = data_version(engine)
+metrics = load_metrics(version, search_query, filters)
 
 # Top Metrics (Context-Aware)
-total_articles = len(articles)
-positive_count = len([a for a in articles if a.sentiment == 'Positive'])
-negative_count = len([a for a in articles if a.sentiment == 'Negative'])
+total_articles = metrics['total']
+positive_count = metrics['positive']
+negative_count = metrics['negative']
 
 m1, m2, m3, m4 = st.columns(4)
 m1.metric("Articles Found", total_articles)
 m2.metric("Positive", positive_count, delta=f"{positive_count/total_articles*100:.1f}%" if total_articles else "0%")
 m3.metric("Negative", negative_count, delta=f"-{negative_count/total_articles*100:.1f}%" if total_articles else "0%", delta_color="inverse")
-m4.metric("Sources Active", len(set(a.source.name for a in articles if a.source)))
+m4.metric("Sources Active", metrics['sources'])
 
 st.divider()
 
@@ -259,79 +436,91 @@ st.divider()
 col_feed, col_charts = st.columns([2, 1])
 
 with col_feed:
-    st.subheader(f"Latest News ({len(articles)})")
+    st.subheader(f"Latest News ({total_articles})")
     
-    if not articles:
+    if not total_articles:
         st.info("No articles found matching your criteria.")
-    
-    for article in articles:
-        sentiment_color = {
-            "Positive": "sentiment-positive",
-            "Negative": "sentiment-negative",
-            "Neutral": "sentiment-neutral"
-        }.get(article.sentiment, "sentiment-neutral")
-        
-        with st.container():
-            st.markdown(f"""
-            <div class="article-card">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <a href="{article.url}" target="_blank" class="article-title">{article.title}</a>
-                    <span class="sentiment-badge {sentiment_color}">{article.sentiment}</span>
-                </div>
-                <div class="article-meta">
-                    <span>📌 {article.source.name if article.source else 'Unknown'}</span>
-                    <span style="background-color: #eee; padding: 2px 6px; border-radius: 4px; font-size: 0.75rem; margin-left: 5px;">{article.category if article.category else 'Uncategorized'}</span> | 
-                    <span>📅 {article.published_date.strftime('%Y-%m-%d %H:%M')}</span>
-                </div>
-                <p>{article.summary}</p>
-            </div>
-            """, unsafe_allow_html=True)
+
+    # Pages loaded so far, reset whenever the filters change
+    feed_key = repr((search_query, filters))
+    if st.session_state.get('feed_key') != feed_key:
+        st.session_state.feed_key = feed_key
+        st.session_state.feed_pages = 1
+
+    cursor = None
+    for _ in range(st.session_state.feed_pages):
+        articles, snippets, cursor = load_feed_page(version, search_query, cursor, filters)
+        for article in articles:
+            sentiment_color = {
+                "Positive": "sentiment-positive",
+                "Negative": "sentiment-negative",
+                "Neutral": "sentiment-neutral"
+            }.get(article.sentiment, "sentiment-neutral")
+            copies_note = ""
+            if article.copies:
+                copies_note = f" | <span>🔁 {article.copies} more {'copy' if article.copies == 1 else 'copies'}</span>"
             
-            # Delete button (Streamlit button needs to be outside HTML block)
-            if st.button("Delete", key=f"del_{article.id}", help=f"Delete article {article.id}"):
-                session.delete(article)
-                session.commit()
-                st.rerun()
+            with st.container():
+                st.markdown(f"""
+                <div class="article-card">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <a href="{article.url}" target="_blank" class="article-title">{article.title}</a>
+                        <span class="sentiment-badge {sentiment_color}">{article.sentiment}</span>
+                    </div>
+                    <div class="article-meta">
+                        <span>📌 {article.source_name or 'Unknown'}</span>
+                        <span style="background-color: #eee; padding: 2px 6px; border-radius: 4px; font-size: 0.75rem; margin-left: 5px;">{article.category if article.category else 'Uncategorized'}</span> | 
+                        <span>📅 {article.published_date.strftime('%Y-%m-%d %H:%M')}</span>{copies_note}
+                    </div>
+                    <p>{snippets.get(article.id, article.summary)}</p>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Delete button (Streamlit button needs to be outside HTML block)
+                if st.button("Delete", key=f"del_{article.id}", help=f"Delete article {article.id}"):
+                    session.query(Article).filter_by(id=article.id).delete()
+                    commit_changes()
+                    st.rerun()
+        if cursor is None:
+            break
+
+    if cursor is not None and st.button("Load more", width="stretch"):
+        st.session_state.feed_pages += 1
+        st.rerun()
 
 with col_charts:
     st.subheader("📊 Analytics")
     
-    # PDF Export
-    from report_generator import create_pdf_report
-    if articles:
-        try:
-            report_topic = search_query if search_query else "All Topics"
-            pdf_data = create_pdf_report(articles, topic=report_topic)
-            st.download_button(
-                label="📄 Download PDF Report",
-                data=pdf_data,
-                file_name=f"news_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                mime="application/pdf",
-                width="stretch"
-            )
-        except Exception as e:
-            st.error(f"Failed to generate PDF: {e}")
+    # PDF Export, only built when the button is clicked, off the script thread
+    if total_articles:
+        reports = get_report_builder()
+        report_key = ReportBuilder.fingerprint(version, search_query, filters)
+        st.download_button(
+            label="📄 Download PDF Report",
+            data=partial(reports.report, report_key, search_query, **filters),
+            file_name=f"news_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+            mime="application/pdf",
+            width="stretch"
+        )
     
-    if articles:
-        df = pd.DataFrame([{
-            'Sentiment': a.sentiment,
-            'Score': a.sentiment_score,
-            'Source': a.source.name if a.source else 'Unknown',
-            'Date': a.published_date.date()
-        } for a in articles])
-        
+    if total_articles:
+        sentiment_colors = {'Positive':'#28a745', 'Negative':'#dc3545', 'Neutral':'#6c757d'}
+        distribution, by_source, per_period, bucket = load_charts(version, search_query, filters)
+
         # Sentiment Distribution
-        fig_pie = px.pie(df, names='Sentiment', title='Sentiment Distribution', 
-                         color='Sentiment', color_discrete_map={'Positive':'#28a745', 'Negative':'#dc3545', 'Neutral':'#6c757d'},
+        fig_pie = px.pie(distribution, names='Sentiment', values='Count',
+                         title='Sentiment Distribution', color='Sentiment', color_discrete_map=sentiment_colors,
                          hole=0.4)
         st.plotly_chart(fig_pie, use_container_width=True)
         
         # Sentiment by Source
-        if len(df['Source'].unique()) > 1:
-            fig_bar = px.histogram(df, x='Source', color='Sentiment', title='Sentiment by Source',
-                                   color_discrete_map={'Positive':'#28a745', 'Negative':'#dc3545', 'Neutral':'#6c757d'})
+        if by_source['Source'].nunique() > 1:
+            fig_bar = px.bar(by_source, x='Source', y='Count', color='Sentiment', title='Sentiment by Source',
+                             color_discrete_map=sentiment_colors)
             st.plotly_chart(fig_bar, use_container_width=True)
 
-
-
-
+        # Articles per Day (or Week)
+        if per_period['Date'].nunique() > 1:
+            fig_daily = px.bar(per_period, x='Date', y='Count', color='Sentiment', title=f'Articles per {bucket.title()}',
+                               color_discrete_map=sentiment_colors)
+            st.plotly_chart(fig_daily, use_container_width=True)
@@ -0,0 +1,145 @@
+import os
+import re
+import time
+import zlib
+import hashlib
+import tempfile
+import threading
+
+# Pages are appended to a segment file until it holds this many bytes, then a new one is started
+SEGMENT_SIZE = 64 * 1024 * 1024
+COMPRESSION_LEVEL = 9
+# Bytes of a source's first archived page used as zlib's preset dictionary for its other pages.
+# Pages of a site share their template (head, navigation), which then costs almost nothing.
+# zlib only looks 32 KB back, with 16 KB the page's own opening can still reach the dictionary.
+DICTIONARY_SIZE = 16 * 1024
+SEGMENT_SUFFIX = '.seg'
+DICTIONARY_SUFFIX = '.zdict'
+
+# Executable scripts, styles, inline SVG and comments, which no extractor reads and which make up
+# most of a modern page. JSON scripts (JSON-LD, hydration data) are kept, they can hold the article.
+# They are gone for good: an extractor that needs them (text built by inline scripts, dates in
+# comments) cannot be used to reprocess archived pages, only on freshly fetched ones.
+PRUNED = re.compile(
+    r"(<script\b[^>]*\bjson\b[^>]*>.*?</script\s*>)|<script\b.*?</script\s*>|<style\b.*?</style\s*>"
+    r"|<svg\b.*?</svg\s*>|<!--.*?-->",
+    re.IGNORECASE | re.DOTALL
+)
+
+def prune_html(html):
+    """
+    The page without the markup no extractor reads, see PRUNED.
+    """
+    return PRUNED.sub(lambda match: match.group(1) or '', html)
+
+def archive_directory(engine):
+    """
+    Directory of the page archive of the database at engine, beside the database file
+    (data/news_data_archive for data/news_data.db). None for in-memory databases.
+    """
+    database = engine.url.database
+    if database in (None, '', ':memory:'):
+        return None
+    return os.path.splitext(os.path.abspath(database))[0] + '_archive'
+
+def _compressor(dictionary):
+    # Raw deflate, the index already knows the length of every record
+    if dictionary:
+        return zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15, 9, zdict=dictionary)
+    return zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15, 9)
+
+def _decompressor(dictionary):
+    if dictionary:
+        return zlib.decompressobj(-15, zdict=dictionary)
+    return zlib.decompressobj(-15)
+
+class PageArchive:
+    """
+    Append-only store of fetched article pages, so articles can be extracted and
+    analyzed again without crawling (see reprocess.py). Pages are pruned first (see
+    prune_html), so get returns the pruned page, not the response. They are compressed
+    one by one and appended to segment files; where each one is goes into
+    archived_pages (ArchivedPage), keyed by the SHA-256 of the pruned page, and
+    articles reference it by that digest.
+    Every process writes its own segments, so scrapers running side by side never
+    append to the same file. Thread-safe.
+    """
+    def __init__(self, directory, segment_size=SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment = None
+        self._dictionaries = {}
+
+    def put(self, html, dictionary=None):
+        """
+        Appends a page compressed with dictionary (a digest from add_dictionary).
+        Returns its ArchivedPage column values. The same page stored again keeps the
+        index row of its first copy.
+        """
+        data = prune_html(html).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        compressor = _compressor(self.dictionary(dictionary))
+        compressed = compressor.compress(data) + compressor.flush()
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.segment_size:
+                self._open_segment()
+            segment, offset = self._segment, self._file.tell()
+            self._file.write(compressed)
+            # Readable by other processes once the index row is committed
+            self._file.flush()
+        return {'digest': digest, 'segment': segment, 'offset': offset, 'length': len(compressed),
+                'size': len(data), 'dictionary': dictionary}
+
+    def get(self, page):
+        """
+        The stored (pruned) HTML of page, an ArchivedPage or a row or dict of its columns.
+        """
+        if isinstance(page, dict):
+            segment, offset, length, dictionary = page['segment'], page['offset'], page['length'], page['dictionary']
+        else:
+            segment, offset, length, dictionary = page.segment, page.offset, page.length, page.dictionary
+        with open(os.path.join(self.directory, segment), 'rb') as f:
+            f.seek(offset)
+            compressed = f.read(length)
+        decompressor = _decompressor(self.dictionary(dictionary))
+        return (decompressor.decompress(compressed) + decompressor.flush()).decode('utf-8')
+
+    def add_dictionary(self, html):
+        """
+        Stores the opening of a page as a compression dictionary for the pages of its
+        site and returns its digest, to pass to put.
+        """
+        data = prune_html(html).encode('utf-8')[:DICTIONARY_SIZE]
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.directory, digest + DICTIONARY_SUFFIX)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as f:
+                f.write(data)
+            os.replace(f.name, path)
+        self._dictionaries[digest] = data
+        return digest
+
+    def dictionary(self, digest):
+        if digest is None:
+            return None
+        data = self._dictionaries.get(digest)
+        if data is None:
+            with open(os.path.join(self.directory, digest + DICTIONARY_SUFFIX), 'rb') as f:
+                data = self._dictionaries[digest] = f.read()
+        return data
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self._segment = f"{time.time_ns()}-{os.getpid()}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, self._segment), 'ab')
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
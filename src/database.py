@@ -1,7 +1,11 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, Index, Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from datetime import datetime
 import os
+import time
+import tempfile
+from migrations import migrate
 
 Base = declarative_base()
 
@@ -19,6 +23,18 @@ class Source(Base):
     requires_login = Column(Boolean, default=False)
     include_external = Column(Boolean, default=False)
     category = Column(String, nullable=True)
+    max_concurrency = Column(Integer, default=4) # Article pages fetched in parallel
+    per_host_concurrency = Column(Integer, default=2) # Parallel fetches against a single host
+    fetch_tier = Column(String, nullable=True) # 'http' or 'browser', learned per source (None = not known yet)
+    allow_patterns = Column(Text, nullable=True) # Newline separated URL regexes that bypass the built-in blocklist
+    deny_patterns = Column(Text, nullable=True) # Newline separated URL regexes that are never scraped
+    discovery = Column(String, nullable=True) # Link discovery: 'auto' (feeds, else front page), 'feeds' or 'page'
+    feed_urls = Column(Text, nullable=True) # Newline separated RSS/Atom feeds and news sitemaps, auto-detected if empty
+    min_link_score = Column(Float, nullable=True) # LinkScorer threshold, links below it are not fetched (0 disables)
+    crawl_interval = Column(Integer, nullable=True) # Minutes between scheduled crawls, None adapts to the source, see scheduler.py
+    extractor = Column(String, nullable=True) # Article extractor: 'lxml', 'newspaper' or None (lxml, newspaper3k fallback), see extractors.py
+    archive_pages = Column(Boolean, default=False) # Keep the fetched pages for reprocessing, see archive.py
+    archive_dictionary = Column(String, nullable=True) # Digest of the compression dictionary of its archived pages
     articles = relationship("Article", back_populates="source")
 
 class Article(Base):
@@ -26,6 +42,7 @@ class Article(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     url = Column(String, nullable=False, unique=True)
+    canonical_url = Column(String, nullable=True, index=True) # Dedup key, see urls.canonicalize_url
     content = Column(Text, nullable=True)
     summary = Column(Text, nullable=True)
     sentiment = Column(String, nullable=True) # Positive, Neutral, Negative
@@ -34,12 +51,200 @@ class Article(Base):
     published_date = Column(DateTime, default=datetime.utcnow)
     scraped_date = Column(DateTime, default=datetime.utcnow)
     source_id = Column(Integer, ForeignKey('sources.id'))
+    simhash = Column(Integer, nullable=True) # SimHash fingerprint of content, see dedup.py
+    duplicate_of = Column(Integer, ForeignKey('articles.id'), nullable=True) # Canonical article this is a copy of
+    page_digest = Column(String, nullable=True) # The fetched page in the page archive, see ArchivedPage
     source = relationship("Source", back_populates="articles")
 
-_engine = None
+    # Dashboard filters, all sorted by published_date (see migrations._add_dashboard_indexes)
+    __table_args__ = (
+        Index('ix_articles_published_date', 'published_date'),
+        Index('ix_articles_source_published', 'source_id', 'published_date'),
+        Index('ix_articles_category_published', 'category', 'published_date'),
+        Index('ix_articles_sentiment_published', 'sentiment', 'published_date'),
+        Index('ix_articles_source_sentiment', 'source_id', 'sentiment', 'published_date'),
+        Index('ix_articles_duplicate_of', 'duplicate_of'),
+    )
+
+class SimHashBand(Base):
+    """
+    LSH index over the fingerprints of articles that are not duplicates: one row per band,
+    see dedup.py. Kept in sync with articles by triggers, see migrations.DEDUP_SCHEMA.
+    """
+    __tablename__ = 'simhash_bands'
+    key = Column(Integer, primary_key=True) # Band number and the fingerprint's bits in that band
+    article_id = Column(Integer, primary_key=True)
+
+    __table_args__ = {'sqlite_with_rowid': False}
+
+class ArchivedPage(Base):
+    """
+    Where a page kept by PageArchive is stored, see archive.py. Keyed by the SHA-256 of
+    the stored page, which articles reference as page_digest.
+    """
+    __tablename__ = 'archived_pages'
+    digest = Column(String, primary_key=True)
+    segment = Column(String, nullable=False) # Segment file in the archive directory
+    offset = Column(Integer, nullable=False)
+    length = Column(Integer, nullable=False) # Compressed bytes
+    size = Column(Integer, nullable=False) # Bytes of the stored page
+    dictionary = Column(String, nullable=True) # Digest of the compression dictionary, see PageArchive.add_dictionary
+
+    __table_args__ = {'sqlite_with_rowid': False}
+
+class ArticleCount(Base):
+    """
+    Rollup of articles per publication day, source, category, sentiment and whether they
+    are copies, kept in sync with articles by triggers (see migrations.ROLLUP_SCHEMA).
+    Serves the dashboard's counts and charts without reading article rows. Missing
+    values are stored as '' (0 for source_id) so every key is unique.
+    """
+    __tablename__ = 'article_counts'
+    day = Column(String, primary_key=True) # YYYY-MM-DD of published_date
+    sentiment = Column(String, primary_key=True)
+    source_id = Column(Integer, primary_key=True, autoincrement=False)
+    category = Column(String, primary_key=True)
+    is_copy = Column(Boolean, primary_key=True) # duplicate_of is set, see dedup.py
+    count = Column(Integer, nullable=False, default=0)
+
+    # Per-source breakdowns and source filters without a sort or a lookup of the count
+    __table_args__ = (
+        Index('ix_article_counts_source', 'source_id', 'sentiment', 'day', 'count'),
+        {'sqlite_with_rowid': False},
+    )
+
+class CrawlState(Base):
+    """
+    Incremental crawl bookkeeping per source: HTTP validators of the front page
+    and a fingerprint of its links, so unchanged sources are skipped.
+    """
+    __tablename__ = 'crawl_state'
+    source_id = Column(Integer, ForeignKey('sources.id'), primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    links_hash = Column(String, nullable=True)
+    settings_hash = Column(String, nullable=True) # Source settings the links were selected with, see NewsScraper._settings_hash
+    last_crawled_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)
+    feeds_checked_at = Column(DateTime, nullable=True) # Last time feeds were auto-detected
+    # Scheduling, see scheduler.py
+    interval = Column(Float, nullable=True) # Current minutes between scheduled crawls
+    next_crawl_at = Column(DateTime, nullable=True)
+    new_per_hour = Column(Float, nullable=True) # Moving average of new articles found per hour
+    rate_updated_at = Column(DateTime, nullable=True) # Last crawl counted in new_per_hour
+
+class CrawlJob(Base):
+    """
+    A crawl requested from the dashboard and run by a worker process, see jobs.py and worker.py.
+    """
+    __tablename__ = 'crawl_jobs'
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False, default='queued') # queued, running, done or failed
+    source_ids = Column(Text, nullable=True) # Comma separated, None crawls every source
+    force = Column(Boolean, default=False) # Crawl sources whose front page has not changed
+    scheduled = Column(Boolean, default=False) # Queued by the scheduler rather than from the dashboard
+    max_parallel_sources = Column(Integer, nullable=True)
+    worker = Column(String, nullable=True) # Name of the worker that claimed the job
+    attempts = Column(Integer, default=0) # Times claimed, a job is retried if its worker dies
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True) # Written periodically by the worker while running
+    sources_total = Column(Integer, default=0)
+    sources_done = Column(Integer, default=0)
+    articles = Column(Integer, default=0) # New articles stored so far
+    results = Column(Text, nullable=True) # JSON list of per-source results, see CrawlOrchestrator.run_async
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index('ix_crawl_jobs_status', 'status', 'id'),
+    )
+
+class CrawlWorker(Base):
+    """
+    Liveness of worker processes, so the dashboard knows whether queued jobs will be picked up.
+    """
+    __tablename__ = 'crawl_workers'
+    name = Column(String, primary_key=True) # host:pid
+    started_at = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow)
+    job_id = Column(Integer, nullable=True) # Job being run, None when idle
+
+# Applied to every new connection
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'), # Dashboard reads no longer block scraper writes and vice versa
+    ('synchronous', 'NORMAL'), # Durable with WAL, fsync only at checkpoints
+    ('busy_timeout', 15000), # ms to wait for the write lock instead of failing with "database is locked"
+    ('cache_size', -65536), # 64 MB page cache
+    ('mmap_size', 268435456), # 256 MB memory-mapped reads
+    ('temp_store', 'MEMORY'),
+)
+# Connections kept open per engine: Streamlit reruns, scraper workers and the analysis executor
+POOL_SIZE = 5
+POOL_MAX_OVERFLOW = 10
+
+_engines = {}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def create_sqlite_engine(db_path):
+    """
+    SQLite engine with WAL journaling, tuned pragmas and a connection pool.
+    In-memory databases keep SQLAlchemy's default single connection pool.
+    """
+    options = {'connect_args': {'check_same_thread': False}}
+    if make_url(db_path).database not in (None, '', ':memory:'):
+        options.update(pool_size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW)
+    engine = create_engine(db_path, **options)
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
+    return engine
+
+# Versions of in-memory databases, which have no file to keep them beside
+_memory_versions = {}
+
+def _version_file(engine, scope):
+    database = engine.url.database
+    if database in (None, '', ':memory:'):
+        return None
+    return os.path.abspath(database) + ('.version' if scope == 'data' else f'.{scope}.version')
+
+def data_version(engine, scope='data'):
+    """
+    Token that changes whenever articles or sources are written, so cached dashboard
+    reads can be keyed on it. Kept in a file beside the database: reading it is not
+    a query and it is shared by the app and the scraper processes.
+    scope='jobs' is bumped instead on crawl job changes, see jobs.py.
+    """
+    path = _version_file(engine, scope)
+    if path is None:
+        return _memory_versions.get((str(engine.url), scope), '0')
+    try:
+        with open(path) as f:
+            return f.read().strip() or '0'
+    except FileNotFoundError:
+        return '0'
+
+def bump_data_version(engine, scope='data'):
+    """
+    Invalidates cached reads of the database at engine. Call after committing a write.
+    """
+    # A fresh token rather than a counter: two processes bumping at once cannot
+    # both write the same value
+    version = f"{time.time_ns()}-{os.getpid()}"
+    path = _version_file(engine, scope)
+    if path is None:
+        _memory_versions[(str(engine.url), scope)] = version
+        return version
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), suffix='.tmp', delete=False) as f:
+        f.write(version)
+    os.replace(f.name, path)
+    return version
 
 def init_db(db_path=None):
-    global _engine
     if db_path is None:
         # Default to ../data/news_data.db relative to this file
         base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -48,11 +253,13 @@ def init_db(db_path=None):
         db_path = f'sqlite:///{os.path.join(data_dir, "news_data.db")}'
         print(f"DEBUG: Initializing DB at {db_path}")
         
-    if _engine is None:
-        _engine = create_engine(db_path, connect_args={'check_same_thread': False})
-        Base.metadata.create_all(_engine)
+    engine = _engines.get(db_path)
+    if engine is None:
+        engine = create_sqlite_engine(db_path)
+        migrate(engine, Base.metadata.create_all)
+        _engines[db_path] = engine
     
-    return sessionmaker(bind=_engine)
+    return sessionmaker(bind=engine)
 
 if __name__ == "__main__":
     init_db()
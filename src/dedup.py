@@ -0,0 +1,63 @@
+import re
+from hashlib import blake2b
+import numpy as np
+from sqlalchemy import text, bindparam
+
+# 64-bit SimHash fingerprints of the article text, over sets of word shingles
+SHINGLE_SIZE = 3
+# Articles whose fingerprints differ in at most this many bits are the same story
+MAX_DISTANCE = 3
+# The fingerprint is split into MAX_DISTANCE + 1 bands: two fingerprints within
+# MAX_DISTANCE bits are equal in at least one band, so only articles sharing a band
+# key are compared (see simhash_bands)
+BANDS = MAX_DISTANCE + 1
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+WORD = re.compile(r"[^\W_]+")
+_BIT_POSITIONS = np.arange(64, dtype=np.uint64)
+
+def simhash(text):
+    """
+    SimHash fingerprint of text as a signed 64-bit integer (SQLite's INTEGER), or None
+    if it has no words. Near-identical texts get fingerprints a few bits apart.
+    """
+    words = WORD.findall(text.lower()) if text else []
+    if not words:
+        return None
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    hashes = np.fromiter((int.from_bytes(blake2b(shingle.encode(), digest_size=8).digest(), 'little')
+                          for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    # A bit is set when it is set in most of the shingle hashes
+    votes = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).sum(axis=0)
+    fingerprint = 0
+    for bit in np.flatnonzero(votes * 2 > len(hashes)):
+        fingerprint |= 1 << int(bit)
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+def distance(a, b):
+    # int.bit_count() needs Python 3.10
+    return bin((a ^ b) & ((1 << 64) - 1)).count('1')
+
+def band_keys(fingerprint):
+    """
+    The fingerprint's key in every band, the band number in the high bits.
+    Same arithmetic as the SQL in migrations.band_keys_sql.
+    """
+    return [(band << BAND_BITS) | ((fingerprint >> (band * BAND_BITS)) & BAND_MASK) for band in range(BANDS)]
+
+_CANDIDATES = text(
+    "SELECT a.id, a.simhash FROM simhash_bands b JOIN articles a ON a.id = b.article_id "
+    "WHERE b.key IN :keys"
+).bindparams(bindparam('keys', expanding=True))
+
+def find_duplicate(conn, fingerprint):
+    """
+    Id of the oldest stored article, not itself a duplicate, that fingerprint is a near
+    duplicate of, or None. conn is a Session or Connection.
+    """
+    if fingerprint is None:
+        return None
+    matches = [article_id for article_id, other in conn.execute(_CANDIDATES, {'keys': band_keys(fingerprint)})
+               if other is not None and distance(fingerprint, other) <= MAX_DISTANCE]
+    return min(matches) if matches else None
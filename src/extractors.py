@@ -0,0 +1,239 @@
+import re
+import json
+import logging
+from datetime import timezone
+import lxml.html
+from lxml import etree
+from feeds import parse_date
+
+logger = logging.getLogger(__name__)
+
+# Extractors a source can choose (Source.extractor). None uses the lxml extractor and
+# falls back to newspaper3k when it finds no title or too little text.
+EXTRACTOR_NAMES = ('lxml', 'newspaper')
+# Less body text than this from the lxml extractor and the page goes to newspaper3k
+MIN_EXTRACTED_TEXT = 200
+
+# Never article text
+SKIP_TAGS = ('script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form', 'button', 'select',
+             'nav', 'header', 'footer', 'aside', 'figure', 'figcaption')
+# Hints in class and id, as in Readability
+UNLIKELY = re.compile(
+    r"comment|sidebar|footer|header|menu|nav|related|share|social|promo|advert|\bads?\b|banner|"
+    r"cookie|consent|newsletter|subscribe|signup|popup|modal|breadcrumb|byline|caption|tags?\b|"
+    r"author|masthead|skip|outbrain|taboola|sponsor|recommend|trending|most-?read",
+    re.IGNORECASE
+)
+LIKELY = re.compile(r"article|body|content|entry|main|post|story|text|prose", re.IGNORECASE)
+# Paragraph-like blocks whose text is gathered, and the shortest one that counts toward a score
+TEXT_TAGS = ('p', 'pre', 'blockquote', 'h2', 'h3', 'h4', 'li')
+MIN_PARAGRAPH = 25
+# Blocks mostly made of link text are navigation, not prose
+MAX_LINK_DENSITY = 0.5
+# Siblings of the best container scoring at least this share of it are part of the article
+SIBLING_SHARE = 0.2
+UTF8_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+TITLE_SEPARATORS = re.compile(r"\s+(?:[|\-–—:»·]|::)\s+")
+
+DATE_META = ('article:published_time', 'og:published_time', 'article.published', 'datepublished',
+             'publish-date', 'publishdate', 'pubdate', 'date', 'dc.date.issued', 'dc.date', 'sailthru.date',
+             'parsely-pub-date', 'cxenseparse:recs:publishtime')
+URL_DATE = re.compile(r"/((?:19|20)\d{2})[/-](0?[1-9]|1[0-2])[/-](0?[1-9]|[12]\d|3[01])(?:/|$|[^\d])")
+
+def _hints(element):
+    return f"{element.get('class', '')} {element.get('id', '')}"
+
+def _text(element):
+    return ' '.join(element.text_content().split())
+
+def _link_density(element, length):
+    links = sum(len(a.text_content()) for a in element.iter('a'))
+    return links / max(length, 1)
+
+def _meta(doc):
+    values = {}
+    for meta in doc.iter('meta'):
+        key = (meta.get('property') or meta.get('name') or meta.get('itemprop') or '').strip().lower()
+        content = meta.get('content')
+        if key and content and key not in values:
+            values[key] = content.strip()
+    return values
+
+def _json_ld(doc):
+    for script in doc.iter('script'):
+        if (script.get('type') or '').lower() != 'application/ld+json' or not script.text:
+            continue
+        try:
+            data = json.loads(script.text)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                if item.get('datePublished') or item.get('headline'):
+                    yield item
+                stack.extend(value for value in item.values() if isinstance(value, (dict, list)))
+
+def _title(doc, meta, ld, skipped):
+    """
+    The headline h1 (the longest one the page title or og:title repeats, or the only
+    one outside the page's header and navigation), else og:title / JSON-LD headline,
+    else the <title> without the site name.
+    """
+    h1s = [text for text in (_text(h1) for h1 in doc.iter('h1') if h1 not in skipped) if text]
+    candidates = [meta.get('og:title'), meta.get('twitter:title'), ld.get('headline')]
+    title_tag = doc.find('.//title')
+    page_title = _text(title_tag) if title_tag is not None else ''
+    repeated = [h1 for h1 in h1s if any(h1 in candidate for candidate in candidates + [page_title] if candidate)]
+    if repeated or len(h1s) == 1:
+        return max(repeated or h1s, key=len)
+    for candidate in candidates:
+        if candidate:
+            return candidate
+    parts = TITLE_SEPARATORS.split(page_title)
+    return max(parts, key=len) if len(parts) > 1 else page_title
+
+def _publish_date(doc, meta, ld, url):
+    for key in DATE_META:
+        if key in meta:
+            parsed = parse_date(meta[key])
+            if parsed:
+                return parsed
+    parsed = parse_date(ld.get('datePublished'))
+    if parsed:
+        return parsed
+    for time in doc.iter('time'):
+        parsed = parse_date(time.get('datetime'))
+        if parsed:
+            return parsed
+    match = URL_DATE.search(url or '')
+    if match:
+        return parse_date('-'.join(part.zfill(2) for part in match.groups()))
+    return None
+
+def _best_container(doc):
+    """
+    Scores every paragraph into its parent and (half) grandparent, like Readability,
+    in one walk over the tree. Returns the best scoring element and the scores.
+    """
+    scores = {}
+    skipped = set()
+    for element in doc.iter(etree.Element):
+        parent = element.getparent()
+        if parent in skipped or element.tag in SKIP_TAGS or (
+                element.tag not in ('html', 'body', 'article', 'main') and UNLIKELY.search(_hints(element))
+                and not LIKELY.search(_hints(element))):
+            skipped.add(element)
+            continue
+        if element.tag not in ('p', 'pre', 'blockquote'):
+            continue
+        text = _text(element)
+        if len(text) < MIN_PARAGRAPH:
+            continue
+        score = (1 + text.count(',') + min(len(text) // 100, 3)) * (1 - _link_density(element, len(text)))
+        if parent is not None:
+            scores[parent] = scores.get(parent, 0) + score
+            grandparent = parent.getparent()
+            if grandparent is not None:
+                scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    if not scores:
+        return None, scores, skipped
+
+    def weighted(element):
+        hints = _hints(element)
+        bonus = (25 if LIKELY.search(hints) else 0) - (25 if UNLIKELY.search(hints) else 0)
+        if element.tag in ('article', 'main'):
+            bonus += 25
+        text_length = len(element.text_content())
+        return (scores[element] + bonus * (scores[element] > 0)) * (1 - _link_density(element, text_length))
+
+    best = max(scores, key=weighted)
+    return best, {element: weighted(element) for element in scores}, skipped
+
+def _paragraphs(elements, skipped):
+    """
+    Text of the paragraph-like blocks under elements, in document order.
+    """
+    texts = []
+    for root in elements:
+        for element in root.iter(*TEXT_TAGS):
+            # Skipped elements' descendants are skipped too, blocks inside blocks are read with them
+            if element in skipped or any(ancestor.tag in TEXT_TAGS for ancestor in element.iterancestors()):
+                continue
+            text = _text(element)
+            if not text or _link_density(element, len(text)) > MAX_LINK_DENSITY:
+                continue
+            if element.tag in ('h2', 'h3', 'h4', 'li') and len(text) < MIN_PARAGRAPH:
+                continue
+            texts.append(text)
+    return texts
+
+def extract_lxml(url, html):
+    """
+    Single-parse, Readability-style extraction with lxml: scores paragraphs into
+    their containers, takes the best one and its high scoring siblings, and reads
+    the title and publish date from the markup (h1, meta tags, JSON-LD, <time>, URL).
+    """
+    try:
+        if isinstance(html, str) and html.lstrip().startswith('<?xml'):
+            # lxml refuses str with an encoding declaration, as served for XHTML
+            doc = lxml.html.fromstring(html.encode('utf-8'), parser=UTF8_PARSER)
+        else:
+            doc = lxml.html.fromstring(html)
+    except (ValueError, etree.ParserError):
+        return {"title": "", "text": "", "publish_date": None}
+    meta = _meta(doc)
+    ld = next(_json_ld(doc), {})
+
+    container, scores, skipped = _best_container(doc)
+    text = ""
+    if container is not None:
+        parent = container.getparent()
+        threshold = max(10, scores[container] * SIBLING_SHARE)
+        siblings = [sibling for sibling in (parent if parent is not None else [container])
+                    if sibling is container or scores.get(sibling, 0) >= threshold]
+        text = '\n\n'.join(_paragraphs(siblings, skipped))
+    return {
+        "title": _title(doc, meta, ld, skipped),
+        "text": text,
+        "publish_date": _publish_date(doc, meta, ld, url),
+    }
+
+def extract_newspaper(url, html=None):
+    """
+    newspaper3k's extraction, which downloads the page itself when html is None.
+    """
+    from newspaper import Article as NewsArticle
+    article = NewsArticle(url)
+    if html:
+        article.set_html(html)
+    else:
+        article.download()
+    article.parse()
+    published = article.publish_date
+    if published is not None and published.tzinfo is not None:
+        published = published.astimezone(timezone.utc).replace(tzinfo=None)
+    return {"title": article.title, "text": article.text, "publish_date": published}
+
+EXTRACTORS = {
+    'lxml': extract_lxml,
+    'newspaper': extract_newspaper,
+}
+
+def extract(url, html=None, extractor=None):
+    """
+    Title, text and publish date (naive UTC) of an article page with the chosen
+    extractor, see EXTRACTOR_NAMES. Pages without html are downloaded by newspaper3k.
+    """
+    if extractor == 'newspaper' or not html:
+        return extract_newspaper(url, html)
+    extracted = extract_lxml(url, html)
+    if extractor is None and (not extracted['title'] or len(extracted['text']) < MIN_EXTRACTED_TEXT):
+        logger.debug(f"lxml extractor found too little in {url}, trying newspaper3k.")
+        fallback = extract_newspaper(url, html)
+        if len(fallback['text']) > len(extracted['text']):
+            return {**fallback, "publish_date": fallback['publish_date'] or extracted['publish_date']}
+    return extracted
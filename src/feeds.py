@@ -0,0 +1,155 @@
+import io
+import gzip
+import logging
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+import lxml.html
+from lxml import etree
+from dateutil import parser as date_parser
+
+logger = logging.getLogger(__name__)
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/feed+json')
+# Conventional news sitemap locations, probed when a source has no feeds configured
+SITEMAP_PATHS = ('/news-sitemap.xml', '/sitemap_news.xml', '/sitemap-news.xml')
+# Child sitemaps followed from a sitemap index, in document order
+MAX_NESTED_SITEMAPS = 3
+
+DATE_TAGS = ('publication_date', 'published', 'pubDate', 'updated', 'date', 'lastmod')
+
+def parse_date(value):
+    """
+    Parses RFC 822 (RSS) and ISO 8601 (Atom, sitemaps) dates into naive UTC datetimes.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = date_parser.isoparse(value)
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def discover_feed_urls(html, base_url):
+    """
+    Returns the RSS/Atom feeds a page advertises with <link rel="alternate">.
+    """
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, etree.ParserError):
+        return []
+    urls = []
+    for link in doc.xpath('//link[@rel="alternate"][@href]'):
+        if (link.get('type') or '').lower() in FEED_TYPES:
+            urls.append(urljoin(base_url, link.get('href').strip()))
+    return urls
+
+def sitemaps_from_robots(text, base_url):
+    """
+    Returns the news sitemaps listed in a robots.txt.
+    """
+    urls = []
+    for line in (text or '').splitlines():
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'sitemap' and 'news' in value.lower():
+            urls.append(urljoin(base_url, value.strip()))
+    return urls
+
+def _localname(element):
+    return etree.QName(element).localname
+
+def _entry_link(element):
+    for child in element:
+        name = _localname(child)
+        if name == 'loc' and child.text:
+            return child.text.strip()
+        if name == 'link':
+            # Atom: <link rel="alternate" href="..."/>, RSS: <link>...</link>
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                return href.strip()
+            if child.text and child.text.strip():
+                return child.text.strip()
+    for child in element:
+        if _localname(child) == 'guid' and child.get('isPermaLink', 'true') == 'true' and child.text:
+            return child.text.strip()
+    return None
+
+def _entry_date(element):
+    dates = {}
+    for child in element.iter():
+        if not isinstance(child.tag, str):
+            continue
+        name = _localname(child)
+        if name in DATE_TAGS and child.text and name not in dates:
+            dates[name] = child.text
+    for name in DATE_TAGS:
+        if name in dates:
+            parsed = parse_date(dates[name])
+            if parsed:
+                return parsed
+    return None
+
+def parse_feed(data):
+    """
+    Streams an RSS, Atom, sitemap or sitemap index document.
+    Returns {'entries': [(url, published or None)], 'sitemaps': [child sitemap urls]}.
+    Elements are cleared as soon as they are read, so memory stays flat on large sitemaps.
+    """
+    if data[:2] == b'\x1f\x8b':
+        data = gzip.decompress(data)
+
+    result = {'entries': [], 'sitemaps': []}
+    parser = etree.iterparse(io.BytesIO(data), events=('end',), recover=True, resolve_entities=False, no_network=True)
+    try:
+        for _, element in parser:
+            if not isinstance(element.tag, str):
+                continue
+            name = _localname(element)
+            if name in ('item', 'entry', 'url'):
+                link = _entry_link(element)
+                if link:
+                    result['entries'].append((link, _entry_date(element)))
+            elif name == 'sitemap':
+                link = _entry_link(element)
+                if link:
+                    result['sitemaps'].append(link)
+            else:
+                continue
+            element.clear()
+            # Drop already processed siblings as well
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        logger.warning(f"Could not parse feed: {e}")
+    return result
+
+def collect_entries(fetch, feed_urls):
+    """
+    Fetches and parses every feed, following sitemap indexes one level deep.
+    `fetch(url)` returns the raw bytes or None.
+    Returns [(url, published or None)] with duplicates removed, newest feeds first.
+    """
+    entries = []
+    seen = set()
+    for feed_url in feed_urls:
+        data = fetch(feed_url)
+        if not data:
+            continue
+        parsed = parse_feed(data)
+        found = parsed['entries']
+        for sitemap_url in parsed['sitemaps'][:MAX_NESTED_SITEMAPS]:
+            nested = fetch(sitemap_url)
+            if nested:
+                found.extend(parse_feed(nested)['entries'])
+        for url, published in found:
+            if url not in seen:
+                seen.add(url)
+                entries.append((url, published))
+    return entries
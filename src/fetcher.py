@@ -0,0 +1,133 @@
+import re
+import logging
+from urllib.parse import urljoin
+import requests
+import lxml.html
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+# Phrases sites show when they refuse to render without JavaScript
+JS_GATE_MARKERS = re.compile(
+    r"enable javascript|javascript is (?:disabled|required)|turn on javascript|"
+    r"requires javascript|please enable js|browser does not support javascript",
+    re.IGNORECASE
+)
+# Empty single-page-app mount points, e.g. <div id="root"></div>
+EMPTY_APP_ROOT = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt)[\"'][^>]*>\s*</div>",
+    re.IGNORECASE
+)
+MIN_HTML_LENGTH = 2000
+
+def looks_js_gated(html):
+    """
+    Cheap check for pages that only render their content with JavaScript.
+    """
+    if not html or len(html) < MIN_HTML_LENGTH:
+        return True
+    if EMPTY_APP_ROOT.search(html):
+        return True
+    return bool(JS_GATE_MARKERS.search(html))
+
+def extract_links(html, base_url):
+    """
+    Returns the absolute href of every <a> in html, like the browser's e.href.
+    """
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, etree.ParserError):
+        return []
+    return [urljoin(base_url, href.strip()) for href in doc.xpath('//a/@href')]
+
+def choose_tier(current, http_ok, browser_rescued):
+    """
+    Decides which fetch tier to remember for a source after a run.
+    http_ok: articles that worked over plain HTTP.
+    browser_rescued: articles that only worked after falling back to the browser.
+    """
+    if browser_rescued > http_ok:
+        return 'browser'
+    if http_ok:
+        return 'http'
+    return current
+
+class HttpFetcher:
+    """
+    Plain HTTP client with keep-alive connection pools per host.
+    Thread-safe for concurrent GETs, the scraper calls it from an executor.
+    """
+    def __init__(self, pool_size=10, timeout=15):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url):
+        """
+        Returns the HTML of url, or None if it failed or is not an HTML page.
+        """
+        page = self.fetch_page(url)
+        return page['html'] if page else None
+
+    def fetch_page(self, url, etag=None, last_modified=None):
+        """
+        Conditional GET. Returns {'status', 'url', 'html', 'etag', 'last_modified'},
+        with html None on a 304, or None if the request failed or is not an HTML page.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        page = {
+            'status': response.status_code,
+            'url': response.url,
+            'html': None,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        if response.status_code == 304:
+            page['etag'] = page['etag'] or etag
+            page['last_modified'] = page['last_modified'] or last_modified
+            return page
+        if response.status_code >= 400:
+            logger.warning(f"Failed to load {url}: Status {response.status_code}")
+            return None
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        page['html'] = response.text
+        return page
+
+    def fetch_bytes(self, url):
+        """
+        Returns the raw body of url (feeds, sitemaps, robots.txt), or None on failure.
+        """
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None
+        if response.status_code >= 400:
+            return None
+        return response.content
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,128 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import select, text, bindparam, DateTime
+from database import CrawlJob, CrawlWorker, bump_data_version
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Seconds between worker heartbeats, and without one before a worker is presumed dead
+HEARTBEAT_INTERVAL = 5
+STALE_AFTER = 60
+# Claims of a job before it is failed instead of retried, in case it kills its worker
+MAX_ATTEMPTS = 3
+
+def _changed(session):
+    session.commit()
+    bump_data_version(session.get_bind(), 'jobs')
+
+def enqueue_crawl(session, source_ids=None, force=False, max_parallel_sources=None, scheduled=False):
+    """
+    Queues a crawl of source_ids (every source by default) for a worker. Returns the job.
+    """
+    job = CrawlJob(status=QUEUED, force=force, max_parallel_sources=max_parallel_sources, scheduled=scheduled,
+                   source_ids=','.join(str(i) for i in source_ids) if source_ids is not None else None)
+    session.add(job)
+    _changed(session)
+    return job
+
+def job_source_ids(job):
+    if job.source_ids is None:
+        return None
+    return [int(i) for i in job.source_ids.split(',') if i]
+
+def job_results(job):
+    return json.loads(job.results) if job.results else []
+
+def requeue_stale_jobs(session, now=None):
+    """
+    Puts running jobs whose worker stopped sending heartbeats back in the queue,
+    or fails them after MAX_ATTEMPTS. Returns the number of jobs recovered.
+    """
+    now = now or datetime.utcnow()
+    stale = (session.query(CrawlJob)
+             .filter(CrawlJob.status == RUNNING, CrawlJob.heartbeat_at < now - timedelta(seconds=STALE_AFTER))
+             .all())
+    for job in stale:
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = FAILED
+            job.finished_at = now
+            job.error = f"Worker {job.worker} stopped responding"
+        else:
+            job.status = QUEUED
+            job.worker = None
+    if stale:
+        _changed(session)
+    return len(stale)
+
+def claim_next_job(session, worker):
+    """
+    Atomically marks the oldest queued job as running on worker and returns its id,
+    or None if the queue is empty. Safe with any number of worker processes: the
+    single UPDATE takes SQLite's write lock, so one job is never claimed twice.
+    """
+    requeue_stale_jobs(session)
+    now = datetime.utcnow()
+    statement = text(
+        "UPDATE crawl_jobs SET status = :running, worker = :worker, attempts = attempts + 1, "
+        "started_at = :now, heartbeat_at = :now "
+        "WHERE id = (SELECT id FROM crawl_jobs WHERE status = :queued ORDER BY id LIMIT 1) "
+        "RETURNING id"
+    ).bindparams(bindparam('now', type_=DateTime))
+    job_id = session.execute(statement, {'running': RUNNING, 'queued': QUEUED, 'worker': worker, 'now': now}).scalar()
+    if job_id is None:
+        session.rollback()
+        return None
+    _changed(session)
+    return job_id
+
+def update_job(session, job_id, **values):
+    """
+    Records progress of a running job and refreshes its heartbeat.
+    """
+    values['heartbeat_at'] = datetime.utcnow()
+    if 'results' in values:
+        values['results'] = json.dumps(values['results'])
+    session.query(CrawlJob).filter_by(id=job_id).update(values)
+    _changed(session)
+
+def finish_job(session, job_id, results, error=None, **values):
+    """
+    Marks a job done, or failed when error is given.
+    """
+    update_job(session, job_id, status=FAILED if error else DONE, finished_at=datetime.utcnow(),
+               results=results, error=error, **values)
+
+def recent_jobs(session, limit=5):
+    """
+    The newest jobs as rows of CrawlJob's columns, newest first.
+    """
+    return session.execute(select(*CrawlJob.__table__.columns).order_by(CrawlJob.id.desc()).limit(limit)).all()
+
+def worker_heartbeat(session, worker, job_id=None):
+    """
+    Registers worker as alive, running job_id or idle.
+    """
+    now = datetime.utcnow()
+    record = session.get(CrawlWorker, worker)
+    if record is None:
+        record = CrawlWorker(name=worker, started_at=now)
+        session.add(record)
+    record.heartbeat_at = now
+    record.job_id = job_id
+    session.commit()
+
+def remove_worker(session, worker):
+    session.query(CrawlWorker).filter_by(name=worker).delete()
+    session.commit()
+
+def live_workers(session, now=None):
+    """
+    Names of workers that sent a heartbeat within STALE_AFTER seconds.
+    """
+    now = now or datetime.utcnow()
+    return [name for (name,) in session.query(CrawlWorker.name)
+            .filter(CrawlWorker.heartbeat_at >= now - timedelta(seconds=STALE_AFTER))]
@@ -0,0 +1,80 @@
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+DEFAULT_MIN_LINK_SCORE = 0.4
+# Fewer stored articles than this and the learned patterns are not trusted yet
+MIN_LEARNED_SAMPLES = 20
+
+_DATE_IN_PATH = re.compile(r'/(?:19|20)\d{2}/(?:0?[1-9]|1[0-2])(?:/|$)|/(?:19|20)\d{2}-?(?:0[1-9]|1[0-2])-?(?:[0-2]\d|3[01])(?:/|$|[-_])')
+_NUMERIC_ID = re.compile(r'(?:^|[-_/.])\d{5,}(?:$|[-_/.])')
+_SLUG_SEPARATORS = re.compile(r'[-_]')
+_FILE_SUFFIX = re.compile(r'\.(?:s?html?|php|aspx?)$')
+
+def _segments(url):
+    return [segment for segment in urlsplit(url).path.lower().split('/') if segment]
+
+def _is_slug(segment):
+    segment = _FILE_SUFFIX.sub('', segment)
+    return len(_SLUG_SEPARATORS.split(segment)) >= 3 or len(segment) >= 25
+
+def url_shape(url):
+    """
+    Reduces a URL path to a template, e.g.
+    /news/nation/2025/11/20/firms-win-contracts -> news/nation/N/N/N/S
+    Numbers become N, slugs S, other segments with digits X, anything else stays literal.
+    """
+    shape = []
+    for segment in _segments(url):
+        if segment.isdigit():
+            shape.append('N')
+        elif _is_slug(segment):
+            shape.append('S')
+        elif any(char.isdigit() for char in segment):
+            shape.append('X')
+        else:
+            shape.append(segment)
+    return '/'.join(shape)
+
+def _is_template(shape):
+    return any(part in ('N', 'S', 'X') for part in shape.split('/'))
+
+class LinkScorer:
+    """
+    Cheap pre-fetch estimate (0..1) of whether a link is an article rather than a
+    section or index page. Combines URL features with path templates learned from
+    the URLs that previously became stored articles for the same source.
+    """
+    def __init__(self, article_urls=()):
+        shapes = (url_shape(url) for url in article_urls)
+        # Only templates with a variable part are patterns. A fully literal shape is one
+        # specific page, often a section page that slipped through in the past.
+        self.shapes = Counter(shape for shape in shapes if _is_template(shape))
+        self.samples = sum(self.shapes.values())
+
+    def score(self, url):
+        segments = _segments(url)
+        path = '/' + '/'.join(segments)
+        has_date = bool(_DATE_IN_PATH.search(path))
+        has_slug = bool(segments) and _is_slug(segments[-1])
+        has_id = bool(_NUMERIC_ID.search(path))
+
+        score = 0.2
+        if has_date:
+            score += 0.3
+        if has_slug:
+            score += 0.25
+        if has_id:
+            score += 0.25
+        if len(segments) >= 3:
+            score += 0.1
+        if len(segments) <= 1 and not (has_date or has_slug or has_id):
+            score -= 0.3
+
+        if self.samples >= MIN_LEARNED_SAMPLES:
+            if self.shapes.get(url_shape(url)):
+                score += 0.4
+            else:
+                score -= 0.1
+
+        return max(0.0, min(1.0, score))
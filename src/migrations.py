@@ -0,0 +1,309 @@
+import logging
+from sqlalchemy import inspect, text
+from urls import canonicalize_url
+from dedup import BANDS, BAND_BITS, BAND_MASK, simhash, find_duplicate
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE batch in data migrations
+BACKFILL_BATCH_SIZE = 1000
+
+# Columns added after the original schema, previously added by the ad hoc scripts/migrate_*.py
+ADDED_COLUMNS = {
+    'sources': [
+        ('include_external', 'BOOLEAN DEFAULT 0'),
+        ('category', 'VARCHAR'),
+        ('max_concurrency', 'INTEGER'),
+        ('per_host_concurrency', 'INTEGER'),
+        ('fetch_tier', 'VARCHAR'),
+        ('allow_patterns', 'TEXT'),
+        ('deny_patterns', 'TEXT'),
+        ('discovery', 'VARCHAR'),
+        ('feed_urls', 'TEXT'),
+        ('min_link_score', 'FLOAT'),
+    ],
+    'articles': [
+        ('category', 'VARCHAR'),
+        ('canonical_url', 'VARCHAR'),
+    ],
+    'crawl_state': [
+        ('feeds_checked_at', 'DATETIME'),
+    ],
+}
+
+def _add_missing_columns(conn, added_columns):
+    inspector = inspect(conn)
+    for table, columns in added_columns.items():
+        if not inspector.has_table(table):
+            continue
+        existing = {c['name'] for c in inspector.get_columns(table)}
+        for name, sql_type in columns:
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+
+def _add_columns(conn):
+    _add_missing_columns(conn, ADDED_COLUMNS)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_canonical_url ON articles (canonical_url)"))
+
+def _backfill_canonical_url(conn):
+    """
+    Replaces scripts/migrate_canonical_url.py.
+    """
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, url FROM articles WHERE id > :last_id AND canonical_url IS NULL ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        conn.execute(text("UPDATE articles SET canonical_url = :canonical WHERE id = :id"),
+                     [{'id': article_id, 'canonical': canonicalize_url(url)} for article_id, url in rows])
+        last_id = rows[-1][0]
+
+def _add_dashboard_indexes(conn):
+    """
+    Every dashboard filter is combined with ORDER BY published_date DESC.
+    """
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_published_date ON articles (published_date)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_source_published ON articles (source_id, published_date)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_category_published ON articles (category, published_date)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_sentiment_published ON articles (sentiment, published_date)"))
+    conn.execute(text("ANALYZE"))
+
+# External content FTS5 index over articles, kept in sync by triggers, see search.py
+FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, summary, content, content='articles', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, summary, content) VALUES (new.id, new.title, new.summary, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary, content ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO articles_fts(rowid, title, summary, content) VALUES (new.id, new.title, new.summary, new.content);
+    END""",
+)
+
+def _add_fulltext_index(conn):
+    for statement in FTS_SCHEMA:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+def _add_analytics_index(conn):
+    """
+    Covers the per-source sentiment breakdown and the source count without reading
+    article rows, see analytics.py.
+    """
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_source_sentiment ON articles (source_id, sentiment, published_date)"))
+    conn.execute(text("ANALYZE"))
+
+SCHEDULE_COLUMNS = {
+    'sources': [
+        ('crawl_interval', 'INTEGER'),
+    ],
+    'crawl_state': [
+        ('interval', 'FLOAT'),
+        ('next_crawl_at', 'DATETIME'),
+        ('new_per_hour', 'FLOAT'),
+        ('rate_updated_at', 'DATETIME'),
+    ],
+    'crawl_jobs': [
+        ('scheduled', 'BOOLEAN DEFAULT 0'),
+    ],
+}
+
+def _add_schedule_columns(conn):
+    _add_missing_columns(conn, SCHEDULE_COLUMNS)
+
+DEDUP_COLUMNS = {
+    'articles': [
+        ('simhash', 'INTEGER'),
+        ('duplicate_of', 'INTEGER'),
+    ],
+}
+
+def band_keys_sql(row):
+    """
+    SELECT of the band keys of row's fingerprint (row is new or old in a trigger), see dedup.band_keys.
+    """
+    return " UNION ALL ".join(
+        f"SELECT ({band} << {BAND_BITS}) | (({row}.simhash >> {band * BAND_BITS}) & {BAND_MASK}) AS key"
+        for band in range(BANDS)
+    )
+
+# Keeps simhash_bands in sync: articles that are not duplicates are indexed. Deleting an
+# article promotes its oldest copy to canonical article of the others.
+DEDUP_SCHEMA = (
+    f"""CREATE TRIGGER IF NOT EXISTS articles_simhash_insert AFTER INSERT ON articles
+        WHEN new.simhash IS NOT NULL AND new.duplicate_of IS NULL BEGIN
+        INSERT OR IGNORE INTO simhash_bands (key, article_id) SELECT key, new.id FROM ({band_keys_sql('new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS articles_simhash_update AFTER UPDATE OF simhash, duplicate_of ON articles BEGIN
+        DELETE FROM simhash_bands WHERE old.duplicate_of IS NULL AND article_id = old.id
+            AND key IN ({band_keys_sql('old')});
+        INSERT OR IGNORE INTO simhash_bands (key, article_id) SELECT key, new.id FROM ({band_keys_sql('new')})
+            WHERE new.simhash IS NOT NULL AND new.duplicate_of IS NULL;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS articles_simhash_delete AFTER DELETE ON articles BEGIN
+        DELETE FROM simhash_bands WHERE article_id = old.id AND key IN ({band_keys_sql('old')});
+        UPDATE articles SET duplicate_of = (SELECT min(id) FROM articles WHERE duplicate_of = old.id)
+            WHERE duplicate_of = old.id AND id > (SELECT min(id) FROM articles WHERE duplicate_of = old.id);
+        UPDATE articles SET duplicate_of = NULL WHERE duplicate_of = old.id;
+    END""",
+)
+
+def _add_duplicate_detection(conn):
+    """
+    Fingerprints the stored articles in id order, linking copies to the oldest one.
+    """
+    _add_missing_columns(conn, DEDUP_COLUMNS)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_duplicate_of ON articles (duplicate_of)"))
+    for statement in DEDUP_SCHEMA:
+        conn.exec_driver_sql(statement)
+
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, content FROM articles WHERE id > :last_id AND simhash IS NULL ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        # One at a time, each article is compared with the ones before it
+        for article_id, content in rows:
+            fingerprint = simhash(content)
+            conn.execute(text("UPDATE articles SET simhash = :simhash, duplicate_of = :duplicate_of WHERE id = :id"),
+                         {'id': article_id, 'simhash': fingerprint, 'duplicate_of': find_duplicate(conn, fingerprint)})
+        last_id = rows[-1][0]
+
+EXTRACTOR_COLUMNS = {
+    'sources': [
+        ('extractor', 'VARCHAR'),
+    ],
+}
+
+def _add_extractor_column(conn):
+    _add_missing_columns(conn, EXTRACTOR_COLUMNS)
+
+ROLLUP_KEY = ('day', 'sentiment', 'source_id', 'category', 'is_copy')
+
+def rollup_key_sql(row):
+    """
+    The article_counts key of row (an article, or new / old in a trigger), in ROLLUP_KEY order.
+    """
+    return (f"coalesce(date({row}.published_date), ''), coalesce({row}.sentiment, ''), "
+            f"coalesce({row}.source_id, 0), coalesce({row}.category, ''), {row}.duplicate_of IS NOT NULL")
+
+def _rollup_add(row):
+    return (f"INSERT INTO article_counts ({', '.join(ROLLUP_KEY)}, count) VALUES ({rollup_key_sql(row)}, 1) "
+            f"ON CONFLICT ({', '.join(ROLLUP_KEY)}) DO UPDATE SET count = count + 1;")
+
+def _rollup_remove(row):
+    return (f"UPDATE article_counts SET count = count - 1 WHERE ({', '.join(ROLLUP_KEY)}) = ({rollup_key_sql(row)});"
+            f" DELETE FROM article_counts WHERE ({', '.join(ROLLUP_KEY)}) = ({rollup_key_sql(row)}) AND count <= 0;")
+
+# Keeps article_counts in sync: every article is counted once under its current key
+ROLLUP_SCHEMA = (
+    f"""CREATE TRIGGER IF NOT EXISTS articles_rollup_insert AFTER INSERT ON articles BEGIN
+        {_rollup_add('new')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS articles_rollup_delete AFTER DELETE ON articles BEGIN
+        {_rollup_remove('old')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS articles_rollup_update
+        AFTER UPDATE OF published_date, source_id, category, sentiment, duplicate_of ON articles BEGIN
+        {_rollup_remove('old')}
+        {_rollup_add('new')}
+    END""",
+)
+
+def _add_article_rollup(conn):
+    """
+    Counts the stored articles into article_counts (created from the model) and
+    installs the triggers that keep it up to date.
+    """
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_article_counts_source ON article_counts (source_id, sentiment, day, count)"))
+    for statement in ROLLUP_SCHEMA:
+        conn.exec_driver_sql(statement)
+    conn.execute(text("DELETE FROM article_counts"))
+    conn.execute(text(
+        f"INSERT INTO article_counts ({', '.join(ROLLUP_KEY)}, count) "
+        f"SELECT {rollup_key_sql('articles')}, count(*) FROM articles GROUP BY 1, 2, 3, 4, 5"
+    ))
+
+ARCHIVE_COLUMNS = {
+    'sources': [
+        ('archive_pages', 'BOOLEAN DEFAULT 0'),
+        ('archive_dictionary', 'VARCHAR'),
+    ],
+    'articles': [
+        ('page_digest', 'VARCHAR'),
+    ],
+}
+
+def _add_archive_columns(conn):
+    """
+    The archived_pages index itself is created from the model.
+    """
+    _add_missing_columns(conn, ARCHIVE_COLUMNS)
+
+CRAWL_SETTINGS_COLUMNS = {
+    'crawl_state': [
+        ('settings_hash', 'VARCHAR'),
+    ],
+}
+
+def _add_crawl_settings_column(conn):
+    _add_missing_columns(conn, CRAWL_SETTINGS_COLUMNS)
+
+# (version, description, function). Append only, never edit a released step.
+MIGRATIONS = [
+    (1, "add columns introduced after the original schema", _add_columns),
+    (2, "backfill articles.canonical_url", _backfill_canonical_url),
+    (3, "add indexes for the dashboard filters", _add_dashboard_indexes),
+    (4, "add the articles_fts full-text index", _add_fulltext_index),
+    (5, "add a covering index for the dashboard aggregates", _add_analytics_index),
+    (6, "add crawl scheduling columns", _add_schedule_columns),
+    (7, "add near-duplicate detection", _add_duplicate_detection),
+    (8, "add sources.extractor", _add_extractor_column),
+    (9, "add the article_counts rollup", _add_article_rollup),
+    (10, "add the page archive columns", _add_archive_columns),
+    (11, "add crawl_state.settings_hash", _add_crawl_settings_column),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_version(conn):
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+def _set_version(conn, version):
+    # PRAGMA does not take bound parameters
+    conn.execute(text(f"PRAGMA user_version = {int(version)}"))
+
+def migrate(engine, create_all):
+    """
+    Brings the database at engine up to SCHEMA_VERSION, tracked in PRAGMA user_version.
+    create_all(engine) first creates missing tables from the models, then each pending
+    step runs in its own transaction. Steps are idempotent, on a new database they only
+    add what the models cannot declare (full-text index, triggers).
+    Returns the list of versions applied.
+    """
+    create_all(engine)
+    with engine.connect() as conn:
+        version = get_version(conn)
+
+    applied = []
+    for step, description, apply in MIGRATIONS:
+        if step <= version:
+            continue
+        logger.info(f"Migrating database to version {step}: {description}")
+        with engine.begin() as conn:
+            apply(conn)
+            _set_version(conn, step)
+        applied.append(step)
+    return applied
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import logging
+from database import Source
+from scraper import NewsScraper, LazyBrowser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PARALLEL_SOURCES = 3
+
+class CrawlOrchestrator:
+    """
+    Crawls many sources in parallel on one long-lived browser.
+    Every source gets its own browser context, so cookies and logins stay isolated.
+    The browser is only launched once a source actually needs it.
+    """
+    def __init__(self, db_path=None, max_parallel_sources=DEFAULT_MAX_PARALLEL_SOURCES, scraper=None,
+                 analysis_workers=None):
+        self.scraper = scraper or NewsScraper(db_path, analysis_workers=analysis_workers)
+        self.max_parallel_sources = max(1, max_parallel_sources)
+
+    def run(self, source_ids=None, on_progress=None, on_source_done=None, force=False):
+        """
+        Blocking entry point, see run_async.
+        """
+        return asyncio.run(self.run_async(source_ids, on_progress=on_progress,
+                                          on_source_done=on_source_done, force=force))
+
+    async def run_async(self, source_ids=None, on_progress=None, on_source_done=None, browser=None, force=False):
+        """
+        Crawls the given sources (all of them by default) and returns one result per source:
+        {'source_id', 'name', 'articles', 'seconds', 'error', 'links', 'skipped_links', 'unchanged', 'from_feeds'}.
+        on_progress() fires for every new article, on_source_done(result) once a source finishes.
+        force=True crawls sources whose front page has not changed.
+        """
+        query = self.scraper.session.query(Source.id, Source.name).order_by(Source.id)
+        if source_ids is not None:
+            query = query.filter(Source.id.in_(source_ids))
+        sources = query.all()
+        if not sources:
+            return []
+
+        browser = LazyBrowser(browser)
+        try:
+            return await self._crawl_all(sources, browser, on_progress, on_source_done, force)
+        finally:
+            await browser.close()
+
+    async def _crawl_all(self, sources, browser, on_progress, on_source_done, force):
+        semaphore = asyncio.Semaphore(self.max_parallel_sources)
+
+        async def crawl(source_id, name):
+            async with semaphore:
+                logger.info(f"Starting crawl of {name}...")
+                start = time.perf_counter()
+                result = {'source_id': source_id, 'name': name, 'articles': 0, 'seconds': 0.0, 'error': None,
+                          'links': 0, 'skipped_links': 0, 'unchanged': False, 'from_feeds': False}
+                try:
+                    result['articles'] = await self.scraper.scrape_source_async(
+                        source_id, on_progress=on_progress, browser=browser, force=force
+                    ) or 0
+                except Exception as e:
+                    logger.error(f"Crawl of {name} failed: {e}")
+                    result['error'] = str(e)
+                result['seconds'] = time.perf_counter() - start
+                # The scraper reports failures in its run stats, an exception it raised comes first
+                stats = dict(self.scraper.run_stats.get(source_id, {}))
+                if result['error']:
+                    stats.pop('error', None)
+                result.update(stats)
+                logger.info(f"Finished {name}: {result['articles']} new articles in {result['seconds']:.1f}s")
+                if on_source_done:
+                    on_source_done(result)
+                return result
+
+        return await asyncio.gather(*(crawl(source_id, name) for source_id, name in sources))
+
+    def close(self):
+        self.scraper.close()
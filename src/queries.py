@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, tuple_, desc
+from sqlalchemy.orm import aliased
+from database import Article, ArticleCount, Source
+from search import RANK_WINDOW, to_fts_query, fts_matches, ranked_matches, snippets
+
+# Articles per page of the dashboard feed
+PAGE_SIZE = 25
+# Rows fetched at a time while writing the PDF report
+REPORT_CHUNK_SIZE = 500
+
+_Copy = aliased(Article)
+# Copies of the article stored under other URLs, see dedup.py
+COPIES = (select(func.count(_Copy.id)).where(_Copy.duplicate_of == Article.id)
+          .correlate(Article).scalar_subquery().label('copies'))
+
+# Everything an article card shows. content is never loaded for the feed.
+FEED_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.url,
+    Article.summary,
+    Article.sentiment,
+    Article.category,
+    Article.published_date,
+    Source.name.label('source_name'),
+    COPIES,
+)
+
+def apply_filters(statement, topic_filter=None, source_filter=None, sentiment_filter=None, date_range=None, category_filter=None,
+                  collapse_duplicates=False, ranked=False):
+    """
+    Applies the dashboard filters to a statement over articles. collapse_duplicates
+    leaves out copies of stories stored earlier under another URL.
+    Returns (statement, matches), matches being the full-text subquery when searching,
+    or (None, None) if the search box holds no searchable words. Searches match every
+    article; with ranked, only the newest RANK_WINDOW matches that pass the other
+    filters are kept and matches has their bm25 rank, see search.ranked_matches.
+    """
+    conditions = []
+    if source_filter:
+        conditions.append(Article.source_id.in_(select(Source.id).where(Source.name.in_(source_filter))))
+    if category_filter:
+        conditions.append(Article.category.in_(category_filter))
+    if sentiment_filter:
+        conditions.append(Article.sentiment.in_(sentiment_filter))
+    if date_range and len(date_range) == 2:
+        start, end = _days(date_range)
+        # Both days included: published_date holds times
+        conditions.append(Article.published_date >= datetime.combine(start, datetime.min.time()))
+        conditions.append(Article.published_date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    if collapse_duplicates:
+        conditions.append(Article.duplicate_of.is_(None))
+
+    matches = None
+    if topic_filter:
+        fts_query = to_fts_query(topic_filter)
+        if fts_query is None:
+            return None, None
+        matches = fts_matches(fts_query)
+        if ranked:
+            # The window is cut after the filters, so a filtered search is never left empty
+            candidates = (select(matches.c.id).join(Article, Article.id == matches.c.id).where(*conditions)
+                          .order_by(desc(matches.c.id)).limit(RANK_WINDOW))
+            matches = ranked_matches(fts_query, candidates)
+        statement = statement.join(matches, matches.c.id == Article.id)
+    return statement.where(*conditions), matches
+
+def _days(date_range):
+    """
+    date_range, a (start, end) pair of dates or datetimes, as dates.
+    """
+    return tuple(day.date() if isinstance(day, datetime) else day for day in date_range)
+
+def apply_rollup_filters(statement, source_filter=None, sentiment_filter=None, date_range=None, category_filter=None,
+                         collapse_duplicates=False):
+    """
+    apply_filters for a statement over article_counts, the per-day rollup of articles.
+    Only valid without a topic search, which needs the articles themselves.
+    """
+    if source_filter:
+        statement = statement.where(ArticleCount.source_id.in_(select(Source.id).where(Source.name.in_(source_filter))))
+    if category_filter:
+        statement = statement.where(ArticleCount.category.in_(category_filter))
+    if sentiment_filter:
+        statement = statement.where(ArticleCount.sentiment.in_(sentiment_filter))
+    if date_range and len(date_range) == 2:
+        start, end = _days(date_range)
+        statement = statement.where(ArticleCount.day.between(start.isoformat(), end.isoformat()))
+    if collapse_duplicates:
+        statement = statement.where(ArticleCount.is_copy.is_(False))
+    return statement
+
+def count_articles(session, topic_filter=None, **filters):
+    """
+    Number of articles matching the dashboard filters, from the rollup unless searching.
+    """
+    if not topic_filter:
+        statement = apply_rollup_filters(select(func.coalesce(func.sum(ArticleCount.count), 0)), **filters)
+        return session.execute(statement).scalar()
+    statement = select(func.count(Article.id)).select_from(Article)
+    statement, _ = apply_filters(statement, topic_filter, **filters)
+    if statement is None:
+        return 0
+    return session.execute(statement).scalar()
+
+def fetch_feed_page(session, topic_filter=None, after=None, page_size=PAGE_SIZE, **filters):
+    """
+    One page of the article feed, newest first or, when searching, most relevant first.
+    Keyset paginated: pass the returned cursor as `after` for the next page, so every
+    page is an index range scan no matter how deep the user scrolls.
+    Returns (rows, snippets, next_cursor). rows carry FEED_COLUMNS, snippets maps
+    article id to a highlighted excerpt when searching, next_cursor is None on the last page.
+    """
+    columns = FEED_COLUMNS + ((Article.content,) if topic_filter else ())
+    statement = select(*columns).select_from(Article).outerjoin(Source, Article.source_id == Source.id)
+    statement, matches = apply_filters(statement, topic_filter, ranked=True, **filters)
+    if statement is None:
+        return [], {}, None
+
+    if matches is not None:
+        sort_key = (matches.c.rank, Article.id)
+        statement = statement.add_columns(matches.c.rank).order_by(*sort_key)
+        if after:
+            statement = statement.where(tuple_(*sort_key) > tuple_(*after))
+    else:
+        sort_key = (Article.published_date, Article.id)
+        statement = statement.order_by(desc(Article.published_date), desc(Article.id))
+        if after:
+            statement = statement.where(tuple_(*sort_key) < tuple_(*after))
+
+    # One extra row tells whether there is a next page
+    rows = session.execute(statement.limit(page_size + 1)).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = (last.rank, last.id) if matches is not None else (last.published_date, last.id)
+
+    excerpts = snippets(rows, topic_filter) if topic_filter else {}
+    return rows, excerpts, next_cursor
+
+def iter_report_rows(session, topic_filter=None, chunk_size=REPORT_CHUNK_SIZE, **filters):
+    """
+    Every matching article with the feed's display columns, for the PDF report,
+    newest first (searches too: relevance is only ranked for the feed's window).
+    Rows are fetched chunk_size at a time, so any number of articles can be iterated
+    in bounded memory.
+    """
+    statement = select(*FEED_COLUMNS).select_from(Article).outerjoin(Source, Article.source_id == Source.id)
+    statement, _ = apply_filters(statement, topic_filter, **filters)
+    if statement is None:
+        return
+    statement = statement.order_by(desc(Article.published_date), desc(Article.id))
+    yield from session.execute(statement.execution_options(yield_per=chunk_size))
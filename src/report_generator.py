@@ -1,5 +1,22 @@
 from fpdf import FPDF
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import atexit
 import datetime
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from queries import count_articles, iter_report_rows
+
+logger = logging.getLogger(__name__)
+
+# Built reports kept on disk, the least recently requested are deleted first
+MAX_CACHED_REPORTS = 8
 
 class PDFReport(FPDF):
     def header(self):
@@ -10,7 +27,122 @@ class PDFReport(FPDF):
     def footer(self):
         self.set_y(-15)
         self.set_font('Helvetica', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', 0, 0, 'C')
+        self.cell(0, 10, f'Page {self.page_no()}/{self.str_alias_nb_pages}', 0, 0, 'C')
+
+class _FileBuffer:
+    """
+    Stands in for FPDF.buffer, the document built as one string: appends go
+    straight to the file and len() is the number of bytes written so far, which
+    FPDF uses for its cross-reference offsets.
+    """
+    def __init__(self, file):
+        self.file = file
+        self.size = 0
+
+    def __iadd__(self, text):
+        data = text.encode('latin-1')
+        self.file.write(data)
+        self.size += len(data)
+        return self
+
+    def __len__(self):
+        return self.size
+
+class StreamingPDFReport(PDFReport):
+    """
+    PDFReport that writes every page to file as soon as it is finished, where FPDF
+    keeps all pages and the document in memory until output(). The page footer goes
+    in its own uncompressed content stream, so the total page count, unknown until
+    the end, can be patched into a fixed-width placeholder once the document is closed.
+    Only URL links are supported.
+    """
+    # Wide enough for 9,999,999 pages
+    NB_ALIAS = '{pages}'
+
+    def __init__(self, file):
+        super().__init__()
+        self.file = file
+        self.buffer = _FileBuffer(file)
+        self._page_objects = []
+        self._nb_offsets = []
+        self._footer_start = None
+
+    def _putheader(self):
+        # Written when the document is opened, before the first page
+        if not len(self.buffer):
+            super()._putheader()
+
+    def open(self):
+        super().open()
+        self._putheader()
+
+    def footer(self):
+        self._footer_start = len(self.pages[self.page])
+        super().footer()
+
+    def _endpage(self):
+        super()._endpage()
+        self._putpage(self.page)
+        # Keep the key, FPDF checks pages by number
+        self.pages[self.page] = ''
+        self.page_links.pop(self.page, None)
+
+    def _putpage(self, n):
+        content = self.pages[n]
+        body, footer = content[:self._footer_start], content[self._footer_start:]
+        self._footer_start = None
+
+        self._newobj()
+        self._page_objects.append(self.n)
+        self._out('<</Type /Page')
+        self._out('/Parent 1 0 R')
+        self._out('/Resources 2 0 R')
+        if n in self.page_links:
+            annots = '/Annots ['
+            for x, y, w, h, link in self.page_links[n]:
+                rect = '%.2f %.2f %.2f %.2f' % (x, y, x + w, y - h)
+                annots += '<</Type /Annot /Subtype /Link /Rect [' + rect + '] /Border [0 0 0] '
+                annots += '/A <</S /URI /URI ' + self._textstring(link) + '>>>>'
+            self._out(annots + ']')
+        self._out(f'/Contents [{self.n + 1} 0 R {self.n + 2} 0 R]>>')
+        self._out('endobj')
+
+        data = zlib.compress(body.encode('latin-1')) if self.compress else body
+        self._newobj()
+        self._out('<<' + ('/Filter /FlateDecode ' if self.compress else '') + f'/Length {len(data)}>>')
+        self._putstream(data)
+        self._out('endobj')
+
+        self._newobj()
+        self._out(f'<</Length {len(footer.encode("latin-1"))}>>')
+        self._out('stream')
+        start = len(self.buffer)
+        position = footer.find(self.NB_ALIAS)
+        while position != -1:
+            self._nb_offsets.append(start + position)
+            position = footer.find(self.NB_ALIAS, position + 1)
+        self._out(footer)
+        self._out('endstream')
+        self._out('endobj')
+
+    def _putpages(self):
+        # Pages are already written, only the page tree is left
+        self.offsets[1] = len(self.buffer)
+        self._out('1 0 obj')
+        self._out('<</Type /Pages')
+        self._out('/Kids [' + ' '.join(f'{n} 0 R' for n in self._page_objects) + ']')
+        self._out(f'/Count {len(self._page_objects)}')
+        self._out('/MediaBox [0 0 %.2f %.2f]' % (self.fw_pt, self.fh_pt))
+        self._out('>>')
+        self._out('endobj')
+
+    def close(self):
+        super().close()
+        total = str(self.page).ljust(len(self.NB_ALIAS)).encode('latin-1')
+        for offset in self._nb_offsets:
+            self.file.seek(offset)
+            self.file.write(total)
+        self.file.seek(0, io.SEEK_END)
 
 def clean_text(text):
     if not text:
@@ -27,16 +159,22 @@ def clean_text(text):
     # Encode to latin-1 with replacement for anything else
     return text.encode('latin-1', 'ignore').decode('latin-1')
 
-def create_pdf_report(articles, topic="General"):
-    pdf = PDFReport()
-    pdf.alias_nb_pages()
+def write_pdf_report(articles, file, total, topic="General"):
+    """
+    Writes the report to file (a binary file open for writing and seeking).
+    articles is any iterable of rows with the feed's display columns, see
+    queries.iter_report_rows, total is the number of rows it yields.
+    Pages are written as they are completed, so memory does not grow with the report.
+    """
+    pdf = StreamingPDFReport(file)
+    pdf.alias_nb_pages(StreamingPDFReport.NB_ALIAS)
     pdf.add_page()
     
     # Title and Metadata
     pdf.set_font('Helvetica', 'B', 12)
     pdf.cell(0, 10, clean_text(f'Topic: {topic}'), 0, 1, 'L')
     pdf.cell(0, 10, f'Date: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M")}', 0, 1, 'L')
-    pdf.cell(0, 10, f'Total Articles: {len(articles)}', 0, 1, 'L')
+    pdf.cell(0, 10, f'Total Articles: {total}', 0, 1, 'L')
     pdf.ln(10)
     
     # Articles
@@ -47,7 +185,7 @@ def create_pdf_report(articles, topic="General"):
         
         # Metadata
         pdf.set_font('Helvetica', 'I', 9)
-        source_name = clean_text(article.source.name if article.source else "Unknown")
+        source_name = clean_text(article.source_name or "Unknown")
         date_str = article.published_date.strftime('%Y-%m-%d')
         pdf.cell(0, 5, clean_text(f"Source: {source_name} | Date: {date_str} | Sentiment: {article.sentiment}"), 0, 1)
         
@@ -67,4 +205,82 @@ def create_pdf_report(articles, topic="General"):
         pdf.line(10, pdf.get_y(), 200, pdf.get_y())
         pdf.ln(5)
 
-    return pdf.output(dest='S').encode('latin-1')
+    pdf.close()
+
+def create_pdf_report(articles, topic="General"):
+    """
+    Returns the report for a list of rows as bytes, see write_pdf_report.
+    """
+    buffer = io.BytesIO()
+    write_pdf_report(articles, buffer, len(articles), topic=topic)
+    return buffer.getvalue()
+
+class ReportBuilder:
+    """
+    Builds PDF reports on a background thread into temporary files, cached by query
+    fingerprint, so a report is built once per filter combination and data version.
+    One report is built at a time, which also bounds the memory reports can take.
+    """
+    def __init__(self, Session, max_reports=MAX_CACHED_REPORTS):
+        self.Session = Session
+        self.max_reports = max_reports
+        self.directory = tempfile.mkdtemp(prefix='news_reports_')
+        atexit.register(shutil.rmtree, self.directory, True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(version, topic_filter, filters):
+        key = repr((version, topic_filter or '', sorted(filters.items())))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def submit(self, key, topic_filter=None, **filters):
+        """
+        Returns a Future of the report file's path, starting the build unless the
+        report for key is already built or being built.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or (job.done() and job.exception()):
+                job = self._executor.submit(self._build, key, topic_filter, filters)
+                self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._evict()
+            return job
+
+    def report(self, key, topic_filter=None, **filters):
+        """
+        The report's bytes, waiting for the build if needed, for st.download_button.
+        The whole file is read into memory: Streamlit keeps a download's bytes in its
+        in-memory media storage whatever it is given, a file object would only be read
+        there. Callers that can stream should open the path from submit() instead.
+        """
+        with open(self.submit(key, topic_filter, **filters).result(), 'rb') as f:
+            return f.read()
+
+    def _evict(self):
+        while len(self._jobs) > self.max_reports:
+            key, job = next(iter(self._jobs.items()))
+            if not job.done():
+                break
+            del self._jobs[key]
+            if not job.exception():
+                os.remove(job.result())
+
+    def _build(self, key, topic_filter, filters):
+        path = os.path.join(self.directory, f"{key}.pdf")
+        session = self.Session()
+        try:
+            total = count_articles(session, topic_filter, **filters)
+            with open(path, 'w+b') as file:
+                write_pdf_report(iter_report_rows(session, topic_filter, **filters), file, total,
+                                 topic=topic_filter or "All Topics")
+        except Exception as e:
+            logger.error(f"Failed to build PDF report: {e}")
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        finally:
+            session.close()
+        return path
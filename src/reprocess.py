@@ -0,0 +1,147 @@
+import os
+import time
+import logging
+import argparse
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select, update
+from database import init_db, Article, ArchivedPage, Source, bump_data_version
+from analyzer import analyze_article, warm_up
+from archive import PageArchive, archive_directory
+from extractors import EXTRACTOR_NAMES
+from scraper import MIN_ARTICLE_TEXT, MAX_FUTURE_PUBLISH_DATE
+
+logger = logging.getLogger(__name__)
+
+# Articles read, analyzed and written per transaction
+CHUNK_SIZE = 200
+
+# The archive of each analysis process, see analyze_pages
+_archives = {}
+
+def analyze_pages(directory, pages):
+    """
+    Runs in the process pool: reads each page from the archive and analyzes it.
+    pages are (article id, url, extractor, ArchivedPage column values), returns
+    (article id, analysis) pairs, with None for pages that failed.
+    """
+    archive = _archives.get(directory)
+    if archive is None:
+        archive = _archives[directory] = PageArchive(directory)
+    results = []
+    for article_id, url, extractor, page in pages:
+        try:
+            results.append((article_id, analyze_article(url, archive.get(page), extractor)))
+        except Exception as e:
+            logger.error(f"Failed to reprocess article {article_id} ({url}): {e}")
+            results.append((article_id, None))
+    return results
+
+def iter_chunks(session, chunk_size, source_ids=None, extractor=None):
+    """
+    (articles, pages) of the articles with an archived page, chunk_size at a time in
+    id order. articles maps ids to their current values, pages are analyze_pages' input.
+    """
+    columns = (Article.id, Article.url, Article.title, Article.sentiment, Article.published_date,
+               Article.scraped_date, Source.extractor, ArchivedPage.segment, ArchivedPage.offset,
+               ArchivedPage.length, ArchivedPage.dictionary)
+    statement = (select(*columns).join(ArchivedPage, ArchivedPage.digest == Article.page_digest)
+                 .outerjoin(Source, Source.id == Article.source_id))
+    if source_ids:
+        statement = statement.where(Article.source_id.in_(source_ids))
+    last_id = 0
+    while True:
+        rows = session.execute(statement.where(Article.id > last_id).order_by(Article.id).limit(chunk_size)).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        pages = [(row.id, row.url, extractor or row.extractor,
+                  {'segment': row.segment, 'offset': row.offset, 'length': row.length, 'dictionary': row.dictionary})
+                 for row in rows]
+        yield {row.id: row for row in rows}, pages
+
+def reprocess(db_path=None, source_ids=None, extractor=None, chunk_size=CHUNK_SIZE, workers=None, dry_run=False):
+    """
+    Extracts and analyzes every article with an archived page again, from the page
+    archive (see archive.py), without fetching anything. Chunks are analyzed by a
+    process pool while the previous ones are written. extractor overrides the sources'
+    extractors. Pages that no longer look like articles keep their stored values.
+    The archive holds pruned pages (see archive.PRUNED), so this suits extractors that
+    read the page's markup and JSON, not its scripts, styles or comments.
+    Returns the stats of the run.
+    """
+    workers = workers or os.cpu_count() or 1
+    Session = init_db(db_path)
+    session = Session()
+    directory = archive_directory(session.get_bind())
+    stats = {'articles': 0, 'changed': 0, 'skipped': 0, 'failed': 0}
+    if directory is None or not os.path.isdir(directory):
+        print("This database has no page archive.")
+        session.close()
+        return stats
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=warm_up) as pool:
+        # Bounded, so the archive is never held in memory at once
+        pending = deque()
+        for articles, pages in iter_chunks(session, chunk_size, source_ids, extractor):
+            pending.append((articles, pool.submit(analyze_pages, directory, pages)))
+            if len(pending) < 2 * workers:
+                continue
+            _write(session, *pending.popleft(), stats, dry_run)
+            print(f"  {stats['articles']} articles, {stats['articles'] / (time.perf_counter() - start):.0f}/s")
+        while pending:
+            _write(session, *pending.popleft(), stats, dry_run)
+
+    elapsed = time.perf_counter() - start
+    print(f"Reprocessed {stats['articles']} articles in {elapsed:.1f}s: {stats['changed']} changed title, "
+          f"sentiment or publish date, {stats['skipped']} no longer articles, {stats['failed']} failed"
+          f"{' (dry run, nothing written)' if dry_run else ''}.")
+    if stats['articles'] and not dry_run:
+        bump_data_version(session.get_bind())
+    session.close()
+    return stats
+
+def _write(session, articles, results, stats, dry_run):
+    rows = []
+    for article_id, analysis in results.result():
+        stats['articles'] += 1
+        if analysis is None:
+            stats['failed'] += 1
+            continue
+        if not analysis['title'] or len(analysis['text']) < MIN_ARTICLE_TEXT:
+            stats['skipped'] += 1
+            continue
+        stored = articles[article_id]
+        published = analysis.get('publish_date')
+        # As in NewsScraper._article_row, the crawl time stands in for a missing or bad date
+        if published is None or published > (stored.scraped_date or datetime.utcnow()) + MAX_FUTURE_PUBLISH_DATE:
+            published = stored.published_date
+        row = {'id': article_id, 'title': analysis['title'], 'content': analysis['text'],
+               'summary': analysis['summary'], 'sentiment': analysis['sentiment'],
+               'sentiment_score': analysis['sentiment_score'], 'simhash': analysis['simhash'],
+               'published_date': published}
+        stats['changed'] += (row['title'] != stored.title or row['sentiment'] != stored.sentiment
+                             or row['published_date'] != stored.published_date)
+        rows.append(row)
+    if rows and not dry_run:
+        session.execute(update(Article), rows)
+        session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Extracts and analyzes archived article pages again, without crawling")
+    parser.add_argument('--db', help="Database URL, defaults to data/news_data.db")
+    parser.add_argument('--source', type=int, action='append', dest='source_ids',
+                        help="Only this source's articles, can be repeated")
+    parser.add_argument('--extractor', choices=EXTRACTOR_NAMES, help="Instead of each source's extractor")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, help="Analysis processes, defaults to one per core")
+    parser.add_argument('--dry-run', action='store_true', help="Only count the articles that would change")
+    args = parser.parse_args()
+    reprocess(args.db, args.source_ids, args.extractor, args.chunk_size, args.workers, args.dry_run)
+
+if __name__ == "__main__":
+    main()
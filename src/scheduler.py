@@ -0,0 +1,122 @@
+import random
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam, DateTime
+from database import Source, CrawlState, CrawlJob
+from jobs import ACTIVE_STATUSES, enqueue_crawl, job_source_ids
+
+logger = logging.getLogger(__name__)
+
+# Bounds of the adaptive crawl interval and where new sources start, in minutes
+MIN_INTERVAL = 15
+MAX_INTERVAL = 24 * 60
+DEFAULT_INTERVAL = 60
+# New articles a scheduled crawl should find on average, the interval is sized to reach it
+TARGET_NEW_ARTICLES = 5
+# Weight of the latest crawl in the new-articles-per-hour average
+RATE_SMOOTHING = 0.3
+# The interval grows or shrinks by at most this factor per crawl
+MAX_STEP = 2.0
+# Next crawl times are spread by up to this fraction of the interval, so sources
+# added together do not stay in lockstep
+JITTER = 0.1
+# Sources queued or crawling at once on behalf of the scheduler, across all workers
+CRAWL_BUDGET = 6
+
+def next_interval(interval, new_per_hour):
+    """
+    Minutes until the next crawl of a source that finds new_per_hour new articles:
+    long enough to find TARGET_NEW_ARTICLES, moving at most MAX_STEP from interval.
+    """
+    target = TARGET_NEW_ARTICLES / new_per_hour * 60 if new_per_hour > 0 else MAX_INTERVAL
+    target = min(max(target, interval / MAX_STEP), interval * MAX_STEP)
+    return min(max(target, MIN_INTERVAL), MAX_INTERVAL)
+
+def record_crawl(session, source_id, new_articles, failed=False, now=None, rng=random):
+    """
+    Updates the source's yield statistics after a crawl and schedules the next one.
+    Failed crawls back off without counting as a quiet period.
+    """
+    now = now or datetime.utcnow()
+    source = session.get(Source, source_id)
+    if source is None:
+        return
+    state = session.get(CrawlState, source_id)
+    if state is None:
+        state = CrawlState(source_id=source_id)
+        session.add(state)
+    interval = state.interval or DEFAULT_INTERVAL
+
+    if failed:
+        interval = min(interval * MAX_STEP, MAX_INTERVAL)
+    else:
+        if state.rate_updated_at is not None:
+            # The first crawl of a source finds its backlog, not its rate
+            hours = max((now - state.rate_updated_at).total_seconds() / 3600, MIN_INTERVAL / 60)
+            rate = new_articles / hours
+            state.new_per_hour = rate if state.new_per_hour is None else (
+                RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * state.new_per_hour)
+            interval = next_interval(interval, state.new_per_hour)
+        state.rate_updated_at = now
+
+    state.interval = interval
+    minutes = source.crawl_interval or interval
+    state.next_crawl_at = now + timedelta(minutes=minutes * rng.uniform(1 - JITTER, 1 + JITTER))
+    session.commit()
+
+def sources_in_flight(session):
+    """
+    Sources waiting in or being crawled by active jobs.
+    """
+    all_sources = None
+    count = 0
+    for job in session.query(CrawlJob).filter(CrawlJob.status.in_(ACTIVE_STATUSES)):
+        source_ids = job_source_ids(job)
+        if source_ids is not None:
+            size = len(source_ids)
+        else:
+            if all_sources is None:
+                all_sources = session.query(Source).count()
+            size = all_sources
+        count += max(size - (job.sources_done or 0), 0)
+    return count
+
+def schedule_due_crawls(session, now=None, budget=CRAWL_BUDGET):
+    """
+    Queues one crawl job for the sources whose next crawl is due, most overdue first,
+    as far as the budget allows. Sources never crawled are due immediately.
+    Returns the job or None. Safe to call from several workers at once: sources are
+    leased with a single UPDATE, so each is queued only once.
+    """
+    now = now or datetime.utcnow()
+    session.execute(text(
+        "INSERT INTO crawl_state (source_id, next_crawl_at) "
+        "SELECT id, :now FROM sources WHERE id NOT IN (SELECT source_id FROM crawl_state)"
+    ).bindparams(bindparam('now', type_=DateTime)), {'now': now})
+    session.query(CrawlState).filter(CrawlState.next_crawl_at.is_(None)).update({'next_crawl_at': now})
+    session.commit()
+
+    slots = budget - sources_in_flight(session)
+    if slots <= 0:
+        return None
+    due = [source_id for (source_id,) in session.query(CrawlState.source_id)
+           .filter(CrawlState.next_crawl_at <= now)
+           .order_by(CrawlState.next_crawl_at)
+           .limit(slots)]
+    if not due:
+        return None
+
+    # Until record_crawl sets the real next crawl, in case the job is lost
+    lease = now + timedelta(minutes=MAX_INTERVAL)
+    statement = text(
+        "UPDATE crawl_state SET next_crawl_at = :lease "
+        "WHERE source_id IN :due AND next_crawl_at <= :now RETURNING source_id"
+    ).bindparams(bindparam('due', expanding=True), bindparam('now', type_=DateTime),
+                 bindparam('lease', type_=DateTime))
+    claimed = sorted(session.execute(statement, {'due': due, 'now': now, 'lease': lease}).scalars())
+    if not claimed:
+        session.rollback()
+        return None
+    job = enqueue_crawl(session, source_ids=claimed, scheduled=True)
+    logger.info(f"Scheduled crawl job {job.id} for {len(claimed)} sources.")
+    return job
@@ -1,55 +1,232 @@
-import time
-from playwright.sync_api import sync_playwright, TimeoutError
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from database import Article, Source, init_db
-from analyzer import analyze_article
+import os
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse, urlsplit, urljoin
+from playwright.async_api import async_playwright, TimeoutError
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from database import Article, Source, CrawlState, init_db, bump_data_version
+from analyzer import extract_article, summarize_article, warm_up
+from archive import PageArchive, archive_directory
+from dedup import find_duplicate
+from fetcher import HttpFetcher, looks_js_gated, choose_tier, extract_links
+from urls import canonicalize_url, link_set_hash
+from feeds import discover_feed_urls, sitemaps_from_robots, parse_feed, collect_entries, SITEMAP_PATHS
+from url_filter import UrlFilter
+from writer import ArticleWriter, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+from link_scorer import LinkScorer, DEFAULT_MIN_LINK_SCORE
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage', # Essential for Docker/Cloud Run
+    '--single-process' # Helps in resource-constrained envs
+]
+
+# Fallbacks for sources that predate the per-source concurrency columns
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_PER_HOST_CONCURRENCY = 2
+
+# Extracted text shorter than this is treated as a non-article (section page, paywall stub, ...)
+MIN_ARTICLE_TEXT = 200
+
+# Publish dates later than this past the crawl are bad metadata and ignored
+MAX_FUTURE_PUBLISH_DATE = timedelta(days=1)
+
+# Fewer links than this in the plain HTML of a front page and it is rendered in the browser instead
+MIN_FRONT_PAGE_LINKS = 10
+
+# Source settings that decide which links are crawled. Changing any of them makes the next
+# crawl ignore the unchanged front page check, see _settings_hash.
+CRAWL_SETTINGS = ('url', 'requires_login', 'include_external', 'allow_patterns', 'deny_patterns', 'discovery',
+                  'feed_urls', 'min_link_score')
+
+# Sources without feeds are probed for new ones this often
+FEED_RECHECK_DAYS = 7
+
+# URLs per IN (...) lookup, stays well below SQLite's bound parameter limit
+URL_QUERY_CHUNK = 500
+
+# Most recent stored articles per source that LinkScorer learns URL patterns from
+LEARN_FROM_LAST = 2000
+
+# Processes extracting and summarizing articles, shared by every source of a scraper
+DEFAULT_ANALYSIS_WORKERS = os.cpu_count() or 1
+# Fetched pages waiting for analysis per analysis worker, fetching pauses beyond that
+ANALYSIS_QUEUE_PER_WORKER = 2
+
+class HostLimiter:
+    """
+    Caps how many fetches run against the same host at once.
+    The global cap is the number of workers and pages, see _fetch_articles.
+    """
+    def __init__(self, per_host):
+        self.per_host = max(1, per_host)
+        self._semaphores = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        async with semaphore:
+            yield
+
+class LazyBrowser:
+    """
+    Launches Chromium on first use, so crawls that only need plain HTTP never start it.
+    One instance can be shared by every source of a run, see CrawlOrchestrator.
+    """
+    def __init__(self, browser=None):
+        self._browser = browser
+        self._playwright = None
+        self._owned = browser is None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self._browser is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        return self._browser
+
+    async def close(self):
+        if not self._owned:
+            return
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+class SourceBrowser:
+    """
+    Isolated browser context of one source, opened (and logged in) on first use.
+    """
+    def __init__(self, scraper, source, browser):
+        self.scraper = scraper
+        self.source = source
+        self.browser = browser
+        self.context = None
+        self._error = None
+        self._lock = asyncio.Lock()
+
+    async def new_page(self):
+        async with self._lock:
+            if self._error is not None:
+                raise self._error
+            if self.context is None:
+                try:
+                    self.context = await self._open()
+                except Exception as e:
+                    # Don't retry the launch or login for every remaining link
+                    self._error = e
+                    raise
+        return await self.context.new_page()
+
+    async def _open(self):
+        browser = await self.browser.get()
+        context = await browser.new_context()
+        # Set a default timeout for the context
+        context.set_default_timeout(60000)
+        await context.route("**/*", _route_intercept)
+
+        # Login if required
+        if self.source.requires_login and self.source.login_url:
+            page = await context.new_page()
+            try:
+                await self.scraper._login(page, self.source)
+            except Exception:
+                await context.close()
+                raise
+            await page.close()
+        return context
+
+    async def close(self):
+        if self.context is not None:
+            await self.context.close()
+            self.context = None
+
+class PagePool:
+    """
+    Hands out at most `size` pages of a source's browser context.
+    Pages are only opened when a fetch actually needs the browser.
+    """
+    def __init__(self, site, size):
+        self.site = site
+        self.size = max(1, size)
+        self._idle = asyncio.Queue()
+        self._created = 0
+
+    @asynccontextmanager
+    async def page(self):
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            try:
+                page = await self.site.new_page()
+            except Exception:
+                self._created -= 1
+                raise
+        else:
+            page = await self._idle.get()
+        try:
+            yield page
+        finally:
+            self._idle.put_nowait(page)
+
+async def _route_intercept(route):
+    # Block unnecessary resources to speed up loading
+    if route.request.resource_type in ["image", "stylesheet", "font", "media"]:
+        await route.abort()
+    else:
+        await route.continue_()
+
 class NewsScraper:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 analysis_workers=None):
         self.Session = init_db(db_path)
         self.session = self.Session()
+        self.http = HttpFetcher()
+        self._default_filter = UrlFilter()
+        # Link statistics of the last run per source id, see _drop_unlikely_articles
+        self.run_stats = {}
+        # Canonical URLs currently being fetched, so parallel workers never scrape the same story twice
+        self._claimed = set()
+        # New articles are written in batches, see ArticleWriter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Parsing, summarizing and sentiment are CPU-bound, they run in a process pool
+        # started on first use, see _fetch_articles
+        self.analysis_workers = max(1, analysis_workers or DEFAULT_ANALYSIS_WORKERS)
+        self._analysis_pool = None
+        # Pages of sources with archive_pages set are kept beside the database, see archive.py
+        directory = archive_directory(self.session.get_bind())
+        self.archive = PageArchive(directory) if directory else None
 
     def should_scrape(self, url):
         """
-        Decides if a URL should be scraped based on a blocklist and extensions.
-        """
-        # 1. Extension Filter
-        skip_extensions = [
-            '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.mp4', '.mp3', 
-            '.zip', '.rar', '.exe', '.dmg', '.css', '.js', '.xml', '.json'
-        ]
-        if any(url.lower().endswith(ext) for ext in skip_extensions):
-            return False
-
-        # 2. Blocklist Filter
-        blocklist = [
-            'login', 'signin', 'signup', 'register', 'auth', 'password', 
-            'account', 'profile', 'user', 'settings', 'preferences',
-            'contact', 'about', 'privacy', 'terms', 'tos', 'policy',
-            'search', 'query', 'filter', 'sort', 'order',
-            'cart', 'checkout', 'basket', 'shop',
-            'facebook.com', 'twitter.com', 'linkedin.com', 'instagram.com', # Social media
-            'javascript:', 'mailto:', 'tel:',
-            # Hacker News specific
-            'vote?', 'hide?', 'submit', 'flag', 'reply', 'item?', 'from?', 'format=json'
-        ]
-        if any(keyword in url.lower() for keyword in blocklist):
-            return False
-
-        return True
-
-    def _navigate(self, page, url, retries=3, timeout=30000):
+        Decides if a URL should be scraped based on the built-in blocklist and extensions.
+        Crawls use a UrlFilter built for the source instead, see _select_candidates.
+        """
+        return self._default_filter.allows(url)
+
+    async def _navigate(self, page, url, retries=3, timeout=30000):
         """
         Navigates to a URL with retry logic.
         """
         for i in range(retries):
             try:
-                response = page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+                response = await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
                 if response and response.status >= 400:
                     logger.warning(f"Failed to load {url}: Status {response.status}")
                     return False
@@ -63,127 +240,554 @@ class NewsScraper:
         logger.error(f"Failed to navigate to {url} after {retries} retries.")
         return False
 
-    def scrape_source(self, source_id, on_progress=None):
-        source = self.session.query(Source).filter_by(id=source_id).first()
-        if not source:
-            logger.error(f"Source with ID {source_id} not found.")
+    def scrape_source(self, source_id, on_progress=None, force=False):
+        """
+        Blocking entry point, runs scrape_source_async on a fresh event loop.
+        Returns the number of new articles stored.
+        """
+        return asyncio.run(self.scrape_source_async(source_id, on_progress=on_progress, force=force))
+
+    async def scrape_source_async(self, source_id, on_progress=None, browser=None, force=False):
+        """
+        Scrapes a single source. `browser` is a LazyBrowser (or a Playwright browser) to
+        share between sources, otherwise one is launched if and when it is needed.
+        force=True crawls even if the front page has not changed since the last run.
+        Every crawl has a session of its own, so sources crawled side by side commit and
+        roll back only their own changes. Nothing is flushed before a commit: a source
+        never holds SQLite's write lock while it waits on the network, which would block
+        the others' writes.
+        """
+        session = self.Session(autoflush=False)
+        try:
+            source = session.get(Source, source_id)
+            if not source:
+                logger.error(f"Source with ID {source_id} not found.")
+                return 0
+
+            if isinstance(browser, LazyBrowser):
+                return await self._scrape(session, source, browser, on_progress, force)
+
+            browser = LazyBrowser(browser)
+            try:
+                return await self._scrape(session, source, browser, on_progress, force)
+            finally:
+                await browser.close()
+        finally:
+            session.close()
+
+    async def _login(self, page, source):
+        logger.info(f"Logging in to {source.name}...")
+        if not await self._navigate(page, source.login_url):
             return
+        try:
+            await page.fill(source.username_selector, source.username)
+            await page.fill(source.password_selector, source.password)
+            if source.submit_selector:
+                await page.click(source.submit_selector)
+            else:
+                await page.keyboard.press('Enter')
+            await page.wait_for_load_state('networkidle', timeout=30000)
+            logger.info("Login submitted.")
+        except Exception as e:
+            # Login is likely critical, give up on the source
+            raise RuntimeError(f"Login failed for {source.name}: {e}") from e
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-dev-shm-usage', # Essential for Docker/Cloud Run
-                    '--single-process' # Helps in resource-constrained envs
-                ]
-            )
-            context = browser.new_context()
-            # Set a default timeout for the context
-            context.set_default_timeout(60000)
-            
-            # Block unnecessary resources to speed up loading
-            def route_intercept(route):
-                if route.request.resource_type in ["image", "stylesheet", "font", "media"]:
-                    route.abort()
-                else:
-                    route.continue_()
-            
-            context.route("**/*", route_intercept)
-            
-            page = context.new_page()
+    def _crawl_state(self, session, source):
+        state = session.get(CrawlState, source.id)
+        if state is None:
+            state = CrawlState(source_id=source.id)
+            session.add(state)
+        return state
+
+    def _settings_hash(self, source):
+        settings = '\n'.join(f"{name}={getattr(source, name)!r}" for name in CRAWL_SETTINGS)
+        return hashlib.sha1(settings.encode('utf-8')).hexdigest()
+
+    def _must_recrawl(self, session, source, state):
+        """
+        Whether the front page must be crawled even if it has not changed: the source's
+        link settings changed since the last crawl, or it has no stored articles (they
+        were cleared or deleted).
+        """
+        if state.settings_hash != self._settings_hash(source):
+            return True
+        return session.query(Article.id).filter_by(source_id=source.id).first() is None
+
+    async def _scrape(self, session, source, browser, on_progress, force):
+        site = SourceBrowser(self, source, browser)
+        pages = PagePool(site, source.max_concurrency or DEFAULT_MAX_CONCURRENCY)
+        state = self._crawl_state(session, source)
+        # error is set when the crawl failed, so the orchestrator reports it and the scheduler backs off
+        self.run_stats[source.id] = {'links': 0, 'skipped_links': 0, 'unchanged': False, 'from_feeds': False,
+                                     'error': None}
+
+        try:
+            if not force and self._must_recrawl(session, source, state):
+                logger.info(f"{source.name} changed or has no stored articles, crawling it in full.")
+                force = True
+            front_page = None
+            if source.discovery != 'page':
+                front_page = await self._fetch_feeds(source, state, force)
+            if front_page is None:
+                if source.discovery == 'feeds':
+                    logger.warning(f"No feed entries found for {source.name}.")
+                    self.run_stats[source.id]['error'] = "No feed entries found"
+                    session.commit()
+                    return 0
+                front_page = await self._fetch_front_page(source, state, pages, force)
+            if front_page is None:
+                self.run_stats[source.id]['error'] = f"Could not load {source.url}"
+                return 0
+            self.run_stats[source.id]['from_feeds'] = front_page['from_feeds']
+            if front_page['unchanged']:
+                logger.info(f"Front page of {source.name} has not changed since the last crawl, skipping.")
+                self.run_stats[source.id]['unchanged'] = True
+                state.last_crawled_at = datetime.utcnow()
+                session.commit()
+                return 0
+
+            unique_links = set(front_page['links'])
+            logger.info(f"Found {len(unique_links)} links.")
+
+            candidates = self._select_candidates(session, source, unique_links)
+            skipped = 0
+            if not front_page['from_feeds']:
+                # Feed and sitemap entries are articles by definition
+                candidates, skipped = self._drop_unlikely_articles(session, source, candidates)
+            self.run_stats[source.id].update({'links': len(unique_links), 'skipped_links': skipped})
+            if skipped:
+                logger.info(f"Skipped {skipped} of {len(candidates) + skipped} new links as unlikely articles "
+                            f"({skipped / (len(candidates) + skipped):.0%}).")
+            self._claimed.update(candidates)
 
             try:
-                # Login if required
-                if source.requires_login and source.login_url:
-                    logger.info(f"Logging in to {source.name}...")
-                    if self._navigate(page, source.login_url):
-                        try:
-                            page.fill(source.username_selector, source.username)
-                            page.fill(source.password_selector, source.password)
-                            if source.submit_selector:
-                                page.click(source.submit_selector)
-                            else:
-                                page.keyboard.press('Enter')
-                            page.wait_for_load_state('networkidle', timeout=30000)
-                            logger.info("Login submitted.")
-                        except Exception as e:
-                            logger.error(f"Login failed for {source.name}: {e}")
-                            # Continue anyway? Or return? Let's return as login is likely critical
-                            return
-
-                # Go to main page
-                logger.info(f"Navigating to {source.url}...")
-                if not self._navigate(page, source.url):
-                    return
+                new_articles_count = await self._fetch_articles(session, source, pages, list(candidates.values()),
+                                                                on_progress, front_page['published'])
+            finally:
+                self._claimed.difference_update(candidates)
+
+            # Only remember the front page once it has been fully processed
+            now = datetime.utcnow()
+            state.etag = front_page['etag']
+            state.last_modified = front_page['last_modified']
+            state.links_hash = front_page['links_hash']
+            state.settings_hash = self._settings_hash(source)
+            state.last_crawled_at = now
+            state.last_changed_at = now
+            session.commit()
+
+            logger.info(f"Scraping finished for {source.name}. Added {new_articles_count} new articles.")
+            return new_articles_count
+
+        except Exception as e:
+            logger.error(f"Error scraping {source.name}: {e}")
+            self.run_stats[source.id]['error'] = str(e)
+            session.rollback()
+            return 0
+        finally:
+            await site.close()
+
+    async def _fetch_front_page(self, source, state, pages, force):
+        """
+        Collects the links of the source's front page.
+        A conditional GET (ETag / Last-Modified) comes first: a 304, or a link set identical
+        to the last crawl, marks the page unchanged. The page is rendered in the browser
+        only when the plain HTML is JS-gated, has too few links or the source needs a login.
+        Returns {'links', 'links_hash', 'etag', 'last_modified', 'unchanged', 'from_feeds', 'published'},
+        or None on failure. published maps links to the publish date their feed entry gave.
+        """
+        front_page = {'links': [], 'links_hash': None, 'etag': None, 'last_modified': None,
+                      'unchanged': False, 'from_feeds': False, 'published': {}}
+        html = None
+        base_url = source.url
+
+        if not source.requires_login:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                None, self.http.fetch_page, source.url,
+                None if force else state.etag, None if force else state.last_modified
+            )
+            if response is not None:
+                front_page['etag'] = response['etag']
+                front_page['last_modified'] = response['last_modified']
+                if response['status'] == 304:
+                    front_page['unchanged'] = True
+                    return front_page
+                html = response['html']
+                base_url = response['url']
+
+        links = []
+        if html and source.fetch_tier != 'browser' and not looks_js_gated(html):
+            links = [link for link in extract_links(html, base_url) if link.startswith('http')]
+
+        if len(links) < MIN_FRONT_PAGE_LINKS:
+            # Go to main page
+            logger.info(f"Navigating to {source.url}...")
+            async with pages.page() as page:
+                if not await self._navigate(page, source.url):
+                    return None
 
                 # Find article links
                 try:
-                    links = page.eval_on_selector_all("a", "elements => elements.map(e => e.href)")
+                    links = await page.eval_on_selector_all("a", "elements => elements.map(e => e.href)")
                 except Exception as e:
                     logger.error(f"Failed to extract links from {source.url}: {e}")
                     links = []
-                
-                unique_links = set(links)
-                logger.info(f"Found {len(unique_links)} links.")
-
-                new_articles_count = 0
-                for link in unique_links:
-                    if not link.startswith("http"): continue
-                    
-                    # Domain check
-                    if not source.include_external:
-                        if source.url not in link: continue 
-                    
-                    if not self.should_scrape(link):
-                        # logger.info(f"Skipping filtered URL: {link}") # Reduce noise
-                        continue
-                    
-                    if self.session.query(Article).filter_by(url=link).first():
-                        continue
 
-                    try:
-                        # Visit article page
-                        logger.info(f"Scraping article: {link}")
-                        if not self._navigate(page, link, retries=2, timeout=20000):
-                            continue
-                            
-                        content = page.content()
-                        
-                        # Analyze
-                        analysis = analyze_article(link, html_content=content)
-                        
-                        if not analysis['title'] or len(analysis['text']) < 200:
-                            continue
-
-                        # Save to DB
-                        new_article = Article(
-                            title=analysis['title'],
-                            url=link,
-                            content=analysis['text'],
-                            summary=analysis['summary'],
-                            sentiment=analysis['sentiment'],
-                            sentiment_score=analysis['sentiment_score'],
-                            category=source.category,
-                            source_id=source.id
-                        )
-                        self.session.add(new_article)
-                        self.session.commit()
-                        new_articles_count += 1
-                        if on_progress:
-                            on_progress()
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to scrape {link}: {e}")
+        front_page['links'] = links
+        front_page['links_hash'] = link_set_hash(links)
+        front_page['unchanged'] = bool(links) and not force and front_page['links_hash'] == state.links_hash
+        return front_page
+
+    async def _fetch_feeds(self, source, state, force):
+        """
+        Collects article links from the source's RSS/Atom feeds and news sitemaps.
+        Without configured feed_urls they are auto-detected (robots.txt, <link rel="alternate">,
+        conventional sitemap paths) and saved on the source; a source without feeds is
+        probed again after FEED_RECHECK_DAYS.
+        Returns the same shape as _fetch_front_page, or None if no feed entries were found.
+        """
+        loop = asyncio.get_running_loop()
+        feed_urls = (source.feed_urls or '').split()
+        recheck = state.feeds_checked_at is None or datetime.utcnow() - state.feeds_checked_at > timedelta(days=FEED_RECHECK_DAYS)
+        if not feed_urls and recheck:
+            feed_urls = await loop.run_in_executor(None, self._probe_feeds, source)
+            state.feeds_checked_at = datetime.utcnow()
+            if feed_urls:
+                logger.info(f"Detected feeds for {source.name}: {', '.join(feed_urls)}")
+                source.feed_urls = '\n'.join(feed_urls)
+        if not feed_urls:
+            return None
+
+        entries = await loop.run_in_executor(None, collect_entries, self.http.fetch_bytes, feed_urls)
+        if not entries:
+            return None
+
+        links = [url for url, _ in entries]
+        links_hash = link_set_hash(links)
+        logger.info(f"Found {len(links)} links in the feeds of {source.name}.")
+        return {
+            'links': links,
+            'links_hash': links_hash,
+            'etag': state.etag,
+            'last_modified': state.last_modified,
+            'unchanged': not force and links_hash == state.links_hash,
+            'from_feeds': True,
+            'published': {url: published for url, published in entries if published is not None},
+        }
+
+    def _probe_feeds(self, source):
+        """
+        Looks for feeds and news sitemaps of a source. Runs in an executor.
+        """
+        candidates = []
+        robots = self.http.fetch_bytes(urljoin(source.url, '/robots.txt'))
+        if robots:
+            candidates.extend(sitemaps_from_robots(robots.decode('utf-8', 'ignore'), source.url))
+        html = self.http.fetch(source.url)
+        if html:
+            candidates.extend(discover_feed_urls(html, source.url))
+        candidates.extend(urljoin(source.url, path) for path in SITEMAP_PATHS)
+
+        found = []
+        for url in dict.fromkeys(candidates):
+            data = self.http.fetch_bytes(url)
+            if not data:
+                continue
+            parsed = parse_feed(data)
+            if parsed['entries'] or parsed['sitemaps']:
+                found.append(url)
+        return found
+
+    def _select_candidates(self, session, source, links):
+        """
+        Filters the links found on a source page down to new article URLs.
+        Returns {canonical_url: link}, so tracking-parameter and slash variants
+        of one story are fetched once. Known URLs are looked up in bulk.
+        """
+        url_filter = UrlFilter.for_source(source)
+        filtered = {}
+        for link in links:
+            if not link.startswith("http"): continue
+
+            # Domain, extension and blocklist checks
+            if not url_filter.allows(link):
+                # logger.info(f"Skipping filtered URL: {link}") # Reduce noise
+                continue
+
+            canonical = canonicalize_url(link)
+            if canonical in self._claimed or canonical in filtered:
+                continue
+
+            filtered[canonical] = link
+
+        known = self._known_urls(session, list(filtered))
+        return {canonical: link for canonical, link in filtered.items() if canonical not in known}
+
+    def _known_urls(self, session, canonical_urls):
+        """
+        Returns the subset of canonical_urls that are already stored, one query per chunk.
+        """
+        known = set()
+        for i in range(0, len(canonical_urls), URL_QUERY_CHUNK):
+            chunk = canonical_urls[i:i + URL_QUERY_CHUNK]
+            known.update(url for (url,) in session.query(Article.canonical_url).filter(Article.canonical_url.in_(chunk)))
+        return known
+
+    def _drop_unlikely_articles(self, session, source, candidates):
+        """
+        Drops same-site links that LinkScorer rates below the source's threshold,
+        so section and index pages are never fetched. Links to other sites
+        (aggregators with include_external) are kept as they are.
+        Returns (kept candidates, number skipped).
+        """
+        threshold = DEFAULT_MIN_LINK_SCORE if source.min_link_score is None else source.min_link_score
+        if threshold <= 0 or not candidates:
+            return candidates, 0
+
+        recent = (session.query(Article.url)
+                  .filter(Article.source_id == source.id)
+                  .order_by(Article.id.desc())
+                  .limit(LEARN_FROM_LAST))
+        scorer = LinkScorer(url for (url,) in recent)
+        site = urlsplit(canonicalize_url(source.url)).netloc
+
+        kept = {}
+        for canonical, link in candidates.items():
+            if urlsplit(canonical).netloc == site and scorer.score(link) < threshold:
+                continue
+            kept[canonical] = link
+        return kept, len(candidates) - len(kept)
+
+    async def _fetch_articles(self, session, source, pages, links, on_progress, published=None):
+        """
+        Fetches and analyzes article pages in two overlapping stages. A bounded pool of
+        fetch workers puts downloaded pages on a queue, analysis workers hand them to the
+        process pool and pass the articles on to the writer. The fetch pool size is the
+        source's global cap, HostLimiter enforces the per-host cap.
+        published maps links to the publish date of their feed entry, see _article_row.
+        """
+        published = published or {}
+        if not links:
+            return 0
+
+        # Items are (link, browser_only)
+        fetch_queue = asyncio.Queue()
+        for link in links:
+            fetch_queue.put_nowait((link, False))
+        # Items are (link, content, via), bounded so fetching pauses when analysis falls behind
+        analysis_queue = asyncio.Queue(maxsize=self.analysis_workers * ANALYSIS_QUEUE_PER_WORKER)
+
+        limiter = HostLimiter(source.per_host_concurrency or DEFAULT_PER_HOST_CONCURRENCY)
+        pool_size = min(pages.size, len(links))
+
+        stats = {'http': 0, 'browser': 0}
+        # Progress is reported as batches are committed
+        writer = ArticleWriter(session, self.batch_size, self.flush_interval, on_insert=on_progress)
+        # Links go back to the fetch stage when the plain HTML was not an article,
+        # so the run ends once every link is finished rather than when a queue is empty
+        remaining = len(links)
+        finished = asyncio.Event()
+
+        def link_done():
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+        async def fetch_worker():
+            while True:
+                link, browser_only = await fetch_queue.get()
+                try:
+                    fetched = await self._fetch_article(source, pages, link, limiter, browser_only)
+                except Exception as e:
+                    logger.error(f"Failed to scrape {link}: {e}")
+                    fetched = None
+                if fetched is None:
+                    link_done()
+                else:
+                    await analysis_queue.put((link, *fetched))
+
+        async def analysis_worker():
+            while True:
+                link, content, via = await analysis_queue.get()
+                try:
+                    analysis = await self._analyze(session, link, content, source.extractor)
+                    if self._is_article(analysis):
+                        if via in stats:
+                            stats[via] += 1
+                        page = await self._archive_page(source, content) if source.archive_pages else None
+                        writer.add(self._article_row(source, link, analysis, published.get(link)), page)
+                    elif via == 'http':
+                        # Too little text in the plain HTML, try the browser
+                        fetch_queue.put_nowait((link, True))
                         continue
-                
-                logger.info(f"Scraping finished for {source.name}. Added {new_articles_count} new articles.")
+                    writer.flush_if_due()
+                except Exception as e:
+                    logger.error(f"Failed to scrape {link}: {e}")
+                link_done()
 
-            except Exception as e:
-                logger.error(f"Error scraping {source.name}: {e}")
-            finally:
-                browser.close()
+        workers = [asyncio.create_task(fetch_worker()) for _ in range(pool_size)]
+        workers += [asyncio.create_task(analysis_worker()) for _ in range(self.analysis_workers)]
+        try:
+            while not finished.is_set():
+                # Rows are written on time even while every fetch is stalled
+                try:
+                    await asyncio.wait_for(finished.wait(), writer.due_in())
+                except asyncio.TimeoutError:
+                    writer.flush_if_due()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            writer.flush()
+
+        tier = choose_tier(source.fetch_tier, stats['http'], stats['browser'])
+        if tier != source.fetch_tier:
+            logger.info(f"Remembering '{tier}' fetch tier for {source.name}.")
+            source.fetch_tier = tier
+            session.commit()
+            bump_data_version(session.get_bind())
+        return writer.inserted
+
+    async def _fetch_article(self, source, pages, link, limiter, browser_only=False):
+        """
+        Tries a plain HTTP fetch first and only falls back to the browser when the page
+        looks JS-gated. Returns (content, via) or None if the page could not be loaded.
+        via is 'http', 'browser' for a fallback after trying HTTP, or None when the
+        source always uses the browser.
+        """
+        logger.info(f"Scraping article: {link}")
+        # Logged-in sessions only live in the browser context
+        try_http = source.fetch_tier != 'browser' and not source.requires_login
+
+        if try_http and not browser_only:
+            async with limiter.slot(link):
+                content = await asyncio.get_running_loop().run_in_executor(None, self.http.fetch, link)
+            if content and not looks_js_gated(content):
+                return content, 'http'
+
+        # Visit article page
+        async with pages.page() as page:
+            async with limiter.slot(link):
+                if not await self._navigate(page, link, retries=2, timeout=20000):
+                    return None
+                content = await page.content()
+        return content, 'browser' if try_http else None
+
+    def _get_analysis_pool(self):
+        if self._analysis_pool is None:
+            # Spawned rather than forked, the scraper runs next to other threads
+            # (heartbeats, the HTTP client) whose locks a fork would copy. Each process
+            # loads the NLP stack as it starts, while the first pages are still fetched.
+            self._analysis_pool = ProcessPoolExecutor(max_workers=self.analysis_workers,
+                                                      mp_context=multiprocessing.get_context('spawn'),
+                                                      initializer=warm_up)
+        return self._analysis_pool
+
+    async def _analyze(self, session, link, content, extractor=None):
+        """
+        Extracts the article in the process pool with the source's extractor (see
+        extractors.py) and summarizes it there too, unless it is a copy of a stored
+        story: copies take the stored article's summary and sentiment and are linked
+        to it, see dedup.py. Raises BrokenProcessPool if the page kept killing the
+        analysis process, see _in_pool.
+        """
+        extracted = await self._in_pool(link, extract_article, link, content, extractor)
+        if not self._is_article(extracted):
+            return extracted
+        original = find_duplicate(session, extracted['simhash'])
+        if original is not None:
+            stored = (session.query(Article.summary, Article.sentiment, Article.sentiment_score)
+                      .filter_by(id=original).first())
+            if stored is not None:
+                logger.info(f"{link} is a copy of article {original}, skipping its analysis.")
+                return {**extracted, **stored._asdict(), 'duplicate_of': original}
+        summary = await self._in_pool(link, summarize_article, extracted['title'], extracted['text'])
+        return {**extracted, **summary}
+
+    async def _in_pool(self, link, function, *args):
+        """
+        Runs function in the process pool, off the event loop and the GIL.
+        A dying process breaks the whole pool, failing every page in flight: the pool
+        is restarted and the page analyzed once more. BrokenProcessPool is raised if
+        that fails too, a page that crashes the analysis is not worth another fetch.
+        """
+        for attempt in range(2):
+            pool = self._get_analysis_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, function, *args)
+            except BrokenProcessPool:
+                if self._analysis_pool is pool:
+                    self._analysis_pool = None
+                    pool.shutdown(wait=False, cancel_futures=True)
+                if attempt:
+                    raise
+                logger.error(f"Analysis process died while analyzing {link}, restarting the pool.")
+
+    async def _archive_page(self, source, content):
+        """
+        Compresses the page into the archive, off the event loop. The source's first
+        archived page becomes the compression dictionary of its pages. Returns the
+        ArchivedPage column values, see ArticleWriter.add, or None if it was not stored.
+        """
+        if self.archive is None:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            if source.archive_dictionary is None:
+                digest = await loop.run_in_executor(None, self.archive.add_dictionary, content)
+                self._save_archive_dictionary(source, digest)
+            return await loop.run_in_executor(None, self.archive.put, content, source.archive_dictionary)
+        except OSError as e:
+            logger.error(f"Failed to archive the page of a {source.name} article: {e}")
+            return None
+
+    def _save_archive_dictionary(self, source, digest):
+        """
+        Stores digest as the source's dictionary in a session of its own, so the crawl's
+        pending changes are not committed halfway. A dictionary saved first, by a page
+        analyzed alongside, is kept.
+        """
+        with self.Session() as session:
+            session.execute(update(Source).where(Source.id == source.id, Source.archive_dictionary.is_(None))
+                            .values(archive_dictionary=digest))
+            session.commit()
+            digest = session.scalar(select(Source.archive_dictionary).where(Source.id == source.id))
+        # Already in the database, the crawl's session must not write it again
+        set_committed_value(source, 'archive_dictionary', digest)
+
+    def _is_article(self, analysis):
+        return bool(analysis['title']) and len(analysis['text']) >= MIN_ARTICLE_TEXT
+
+    def _article_row(self, source, link, analysis, feed_date=None):
+        """
+        Column values of a new article, see ArticleWriter. The publish date is the one
+        on the page, else the one in the feed entry, else the time of the crawl.
+        """
+        now = datetime.utcnow()
+        dates = [date for date in (analysis.get('publish_date'), feed_date)
+                 if isinstance(date, datetime) and date <= now + MAX_FUTURE_PUBLISH_DATE]
+        return {
+            'title': analysis['title'],
+            'url': link,
+            'canonical_url': canonicalize_url(link),
+            'content': analysis['text'],
+            'summary': analysis['summary'],
+            'sentiment': analysis['sentiment'],
+            'sentiment_score': analysis['sentiment_score'],
+            'category': source.category,
+            'published_date': dates[0] if dates else now,
+            'source_id': source.id,
+            'simhash': analysis.get('simhash'),
+            'duplicate_of': analysis.get('duplicate_of'),
+        }
 
     def close(self):
+        if self._analysis_pool is not None:
+            self._analysis_pool.shutdown(cancel_futures=True)
+            self._analysis_pool = None
+        if self.archive is not None:
+            self.archive.close()
+        self.http.close()
         self.session.close()
@@ -0,0 +1,136 @@
+import re
+import html
+import unicodedata
+from sqlalchemy import select, table, column, literal_column, func, Integer, Float
+
+# The feed ranks by relevance among the newest matches that pass the other filters, so a
+# word found in half of all articles costs about as much as a rare one. Counts and
+# charts cover every match.
+RANK_WINDOW = 2000
+# Words of context shown around the first match in a snippet
+SNIPPET_WORDS = 24
+
+_FTS = table('articles_fts', column('rowid', Integer))
+# The table name stands for the whole row in MATCH and bm25()
+_FTS_ROW = literal_column('articles_fts')
+
+_TERM = re.compile(r'"([^"]*)"?|(\S+)')
+_WORD = re.compile(r'\w+')
+
+def parse_query(user_query):
+    """
+    Splits search box input into terms: (words, is_prefix) tuples and 'OR'.
+    Words are ANDed, "quoted text" is a phrase, a trailing * makes a prefix query
+    and OR between terms matches either. Other FTS5 syntax is treated as text.
+    """
+    terms = []
+    for phrase, word in _TERM.findall(user_query or ''):
+        if word == 'OR':
+            if terms and terms[-1] != 'OR':
+                terms.append('OR')
+            continue
+        words = _WORD.findall(phrase or word)
+        if words:
+            terms.append((words, word.endswith('*')))
+    while terms and terms[-1] == 'OR':
+        terms.pop()
+    return terms
+
+def to_fts_query(user_query):
+    """
+    Turns search box input into a safe FTS5 MATCH expression, see parse_query.
+    Returns None if the input contains no searchable words.
+    """
+    parts = []
+    for term in parse_query(user_query):
+        if term == 'OR':
+            parts.append('OR')
+            continue
+        words, is_prefix = term
+        parts.append('"' + ' '.join(words) + '"' + ('*' if is_prefix else ''))
+    return ' '.join(parts) or None
+
+def fts_matches(fts_query):
+    """
+    Subquery of the ids of every article matching fts_query, join it on Article.id.
+    Newest first when its ids are ordered by, without a sort.
+    """
+    return select(_FTS.c.rowid.label('id')).where(_FTS_ROW.op('MATCH')(fts_query)).subquery('matches')
+
+def ranked_matches(fts_query, candidates):
+    """
+    Subquery of (id, rank) of the articles in candidates, a select of article ids,
+    that match fts_query. Lower rank is more relevant (bm25), which is only computed
+    for those articles. Join it on Article.id and order by rank.
+    """
+    return (select(_FTS.c.rowid.label('id'), func.bm25(_FTS_ROW, type_=Float).label('rank'))
+            .where(_FTS_ROW.op('MATCH')(fts_query), _FTS.c.rowid.in_(candidates))
+            .subquery('ranked'))
+
+def _fold(word):
+    # Same normalization as the index's unicode61 tokenizer with remove_diacritics
+    if word.isascii():
+        return word.lower()
+    decomposed = unicodedata.normalize('NFKD', word)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def highlight(content, user_query, words=SNIPPET_WORDS):
+    """
+    HTML excerpt of content around the first matched search term, with every
+    match wrapped in <mark>. Built in Python from the loaded article, which is far
+    cheaper than FTS5's snippet() for prefix queries. Returns None without a match.
+    """
+    exact, prefixes = set(), []
+    for term in parse_query(user_query):
+        if term == 'OR':
+            continue
+        term_words, is_prefix = term
+        folded = [_fold(word) for word in term_words]
+        if is_prefix:
+            prefixes.append(folded.pop())
+        exact.update(folded)
+    prefixes = tuple(prefixes)
+
+    def is_match(word):
+        word = _fold(word)
+        return word in exact or bool(prefixes and word.startswith(prefixes))
+
+    # Only tokenize up to the end of the excerpt
+    content = content or ''
+    lead = words // 4
+    window, first, dropped, more = [], None, False, False
+    for token in _WORD.finditer(content):
+        if first is not None and len(window) >= words:
+            more = True
+            break
+        window.append(token)
+        if first is None:
+            if is_match(token.group()):
+                first = len(window) - 1
+            elif len(window) > lead:
+                window.pop(0)
+                dropped = True
+    if first is None:
+        return None
+
+    parts = ['…' if dropped else html.escape(content[:window[0].start()])]
+    position = window[0].start()
+    for token in window:
+        parts.append(html.escape(content[position:token.start()]))
+        word = html.escape(token.group())
+        parts.append(f'<mark>{word}</mark>' if is_match(token.group()) else word)
+        position = token.end()
+    parts.append('…' if more else html.escape(content[position:]))
+    return ''.join(parts)
+
+def snippets(articles, user_query):
+    """
+    Returns {article id: highlighted excerpt} for the articles whose summary or
+    content contains a search term.
+    """
+    result = {}
+    for article in articles:
+        excerpt = highlight(article.content, user_query) or highlight(article.summary, user_query)
+        if excerpt:
+            result[article.id] = excerpt
+    return result
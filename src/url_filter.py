@@ -0,0 +1,138 @@
+import re
+import logging
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+SKIP_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.mp4', '.mp3',
+    '.zip', '.rar', '.exe', '.dmg', '.css', '.js', '.xml', '.json'
+)
+BLOCKED_SCHEMES = {'javascript', 'mailto', 'tel'}
+# Social media
+BLOCKED_HOSTS = ('facebook.com', 'twitter.com', 'linkedin.com', 'instagram.com')
+
+# Path words that mark account, legal and shop pages. A path segment is blocked when it
+# consists only of these words and FILLER_WORDS ("about-us", "privacy-policy"), so
+# "/news/about-town-story" is still allowed.
+BLOCKED_PATH_WORDS = {
+    'login', 'signin', 'signup', 'register', 'auth', 'password',
+    'account', 'profile', 'user', 'settings', 'preferences',
+    'contact', 'about', 'privacy', 'terms', 'tos', 'policy',
+    'search', 'query', 'filter', 'sort', 'order',
+    'cart', 'checkout', 'basket', 'shop',
+    # Hacker News specific
+    'submit', 'flag', 'reply',
+}
+FILLER_WORDS = {'us', 'me', 'my', 'of', 'and', 'use', 'service', 'conditions', 'page', 'php', 'html', 'htm', 'aspx'}
+# Endpoints that are only blocked when called with a query string (Hacker News "vote?id=...")
+BLOCKED_QUERY_ENDPOINTS = {'vote', 'hide', 'item', 'from'}
+BLOCKED_QUERY_KEYS = {'search', 'query', 'filter', 'sort', 'order'}
+
+# Precompiled matchers, so a check is a handful of regex scans instead of ~45 substring searches
+_URL_PARTS = re.compile(r'^([a-z][a-z0-9+.-]*):(?://([^/?#]*))?([^?#]*)(?:\?([^#]*))?')
+_BLOCKED_WORD = re.compile(r'(?<![a-z])(?:%s)s?(?![a-z])' % '|'.join(sorted(BLOCKED_PATH_WORDS)))
+_BLOCKED_QUERY = re.compile(r'(?:^|[&;])(?:(?:%s)=|format=json(?:[&;]|$))' % '|'.join(sorted(BLOCKED_QUERY_KEYS)))
+_SEGMENT_WORDS = re.compile(r'[a-z]+')
+
+def _segment_is_blocked(segment):
+    words = _SEGMENT_WORDS.findall(segment)
+    if not words:
+        return False
+    blocked = False
+    for word in words:
+        if word in BLOCKED_PATH_WORDS or (word.endswith('s') and word[:-1] in BLOCKED_PATH_WORDS):
+            blocked = True
+        elif word not in FILLER_WORDS:
+            return False
+    return blocked
+
+def compile_patterns(patterns):
+    """
+    Compiles newline separated regular expressions into a single alternation.
+    Invalid patterns are logged and skipped. Returns None when nothing is left.
+    """
+    valid = []
+    for pattern in (patterns or '').splitlines():
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            logger.warning(f"Ignoring invalid URL pattern {pattern!r}: {e}")
+            continue
+        valid.append(f"(?:{pattern})")
+    return re.compile('|'.join(valid), re.IGNORECASE) if valid else None
+
+class UrlFilter:
+    """
+    Decides which links are worth fetching. Build it once per source and reuse it for
+    every link: all rules are precompiled and URLs are parsed once per check.
+
+    Order of rules:
+      1. scheme, file extension, social hosts and (optionally) same-site checks always apply
+      2. deny patterns reject the URL
+      3. allow patterns accept the URL, skipping the built-in keyword rules
+      4. built-in path and query keyword rules
+    """
+    def __init__(self, site_url=None, allow_patterns=None, deny_patterns=None):
+        self.site_host = None
+        self.site_path = ''
+        if site_url:
+            parts = urlsplit(site_url)
+            self.site_host = self._strip_www(parts.hostname or '')
+            self.site_path = parts.path.rstrip('/').lower()
+        self.allow = compile_patterns(allow_patterns)
+        self.deny = compile_patterns(deny_patterns)
+
+    @classmethod
+    def for_source(cls, source):
+        return cls(
+            site_url=None if source.include_external else source.url,
+            allow_patterns=source.allow_patterns,
+            deny_patterns=source.deny_patterns,
+        )
+
+    @staticmethod
+    def _strip_www(host):
+        return host[4:] if host.startswith('www.') else host
+
+    def allows(self, url):
+        lowered = url.lower()
+        if lowered.endswith(SKIP_EXTENSIONS):
+            return False
+
+        match = _URL_PARTS.match(lowered)
+        if not match:
+            return False
+        scheme, netloc, path, query = match.groups()
+        if scheme in BLOCKED_SCHEMES:
+            return False
+        host = (netloc or '').rpartition('@')[2].split(':')[0]
+        if host.endswith(BLOCKED_HOSTS) and any(host == h or host.endswith('.' + h) for h in BLOCKED_HOSTS):
+            return False
+
+        if self.site_host is not None:
+            if self._strip_www(host) != self.site_host:
+                return False
+            if self.site_path and not (path == self.site_path or path.startswith(self.site_path + '/')):
+                return False
+
+        if self.deny is not None and self.deny.search(url):
+            return False
+        if self.allow is not None and self.allow.search(url):
+            return True
+
+        # Only split the path into segments when a blocked word appears in it at all
+        if _BLOCKED_WORD.search(path):
+            if any(_segment_is_blocked(segment) for segment in path.split('/') if segment):
+                return False
+
+        if query:
+            if path.rstrip('/').rpartition('/')[2] in BLOCKED_QUERY_ENDPOINTS:
+                return False
+            if _BLOCKED_QUERY.search(query):
+                return False
+
+        return True
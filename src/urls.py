@@ -0,0 +1,55 @@
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'ref_url', 'cmpid', 'ocid', 'ito', 'ns_mchannel',
+    'ns_source', 'ns_campaign', 'ns_linkname', 'ns_fee', 'smid', 'xtor',
+}
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'mtm_', 'hsa_', 'ga_')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+_MULTIPLE_SLASHES = re.compile(r'/{2,}')
+
+def canonicalize_url(url):
+    """
+    Normalizes a URL into the key used to detect the same story under different links.
+    Drops tracking parameters and the fragment, sorts the remaining query, lowercases
+    scheme and host, folds http/https and "www.", and strips default ports and trailing slashes.
+    The key is only used for deduplication, pages are still fetched from the original link.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url.strip()
+
+    host = (parts.hostname or '').rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = _MULTIPLE_SLASHES.sub('/', parts.path)
+    if path != '/':
+        path = path.rstrip('/')
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit(('https', host, path or '/', urlencode(query), ''))
+
+def link_set_hash(links):
+    """
+    Order-independent fingerprint of a page's links, compared on their canonical form
+    so rotating tracking parameters do not count as a change.
+    """
+    canonical = sorted({canonicalize_url(link) for link in links if link.startswith('http')})
+    return hashlib.sha1('\n'.join(canonical).encode('utf-8')).hexdigest()
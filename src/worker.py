@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import socket
+import signal
+import logging
+import argparse
+import threading
+import subprocess
+from database import init_db, Source, CrawlJob
+from orchestrator import CrawlOrchestrator, DEFAULT_MAX_PARALLEL_SOURCES
+from jobs import (HEARTBEAT_INTERVAL, claim_next_job, update_job, finish_job, job_source_ids,
+                  worker_heartbeat, remove_worker)
+from scheduler import schedule_due_crawls, record_crawl
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of an empty queue
+POLL_INTERVAL = 2.0
+# Seconds a worker started by the dashboard waits for more jobs before exiting
+SPAWNED_WORKER_IDLE_EXIT = 300
+# Seconds between checks for sources due for a scheduled crawl
+SCHEDULE_CHECK_INTERVAL = 30
+
+class JobWorker:
+    """
+    Runs queued crawl jobs one at a time until stopped. Any number of workers can run,
+    as separate processes or containers sharing the database, see jobs.claim_next_job.
+    Progress is written to the job every HEARTBEAT_INTERVAL seconds, so the dashboard
+    can follow it, and a job whose worker dies is picked up again by another worker.
+    With schedule=True the worker also queues crawls of sources that are due, see scheduler.py.
+    """
+    def __init__(self, db_path=None, poll_interval=POLL_INTERVAL, idle_exit=None, scraper=None, schedule=False,
+                 analysis_workers=None):
+        self.db_path = db_path
+        self.schedule = schedule
+        # Processes analyzing articles, one per core by default
+        self.analysis_workers = analysis_workers
+        # Shared by all jobs if given, otherwise every job gets a fresh NewsScraper
+        self.scraper = scraper
+        self.Session = init_db(db_path)
+        self.session = self.Session()
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.idle_exit = idle_exit
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        """
+        Exits after the current job, if any. Usable as a signal handler.
+        """
+        self._stop.set()
+
+    def run(self):
+        logger.info(f"Worker {self.name} waiting for crawl jobs.")
+        idle_since = time.monotonic()
+        last_heartbeat = last_schedule = 0
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                    worker_heartbeat(self.session, self.name)
+                    last_heartbeat = time.monotonic()
+                if self.schedule and time.monotonic() - last_schedule >= SCHEDULE_CHECK_INTERVAL:
+                    schedule_due_crawls(self.session)
+                    last_schedule = time.monotonic()
+                job_id = claim_next_job(self.session, self.name)
+                if job_id is None:
+                    if self.idle_exit is not None and time.monotonic() - idle_since >= self.idle_exit:
+                        logger.info(f"No jobs for {self.idle_exit:.0f}s, worker {self.name} exiting.")
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+                self.run_job(job_id)
+                idle_since = last_heartbeat = time.monotonic()
+        finally:
+            remove_worker(self.session, self.name)
+            self.session.close()
+
+    def run_job(self, job_id):
+        """
+        Crawls the job's sources with a CrawlOrchestrator and records the results.
+        """
+        job = self.session.get(CrawlJob, job_id)
+        source_ids = job_source_ids(job)
+        query = self.session.query(Source.id)
+        if source_ids is not None:
+            query = query.filter(Source.id.in_(source_ids))
+        job_sources = [source_id for (source_id,) in query]
+        update_job(self.session, job_id, sources_total=len(job_sources))
+        logger.info(f"Running crawl job {job_id} (attempt {job.attempts}).")
+
+        # Updated by the crawl's callbacks, written by the heartbeat thread
+        progress = {'articles': 0, 'sources_done': 0, 'results': []}
+        finished = threading.Event()
+
+        def heartbeat():
+            session = self.Session()
+            try:
+                while not finished.wait(HEARTBEAT_INTERVAL):
+                    try:
+                        update_job(session, job_id, articles=progress['articles'], sources_done=progress['sources_done'],
+                                   results=list(progress['results']))
+                        worker_heartbeat(session, self.name, job_id)
+                    except Exception as e:
+                        logger.warning(f"Failed to record progress of job {job_id}: {e}")
+                        session.rollback()
+            finally:
+                session.close()
+
+        def on_progress():
+            progress['articles'] += 1
+
+        def on_source_done(result):
+            progress['sources_done'] += 1
+            progress['results'].append(result)
+
+        thread = threading.Thread(target=heartbeat, name=f"job-{job_id}-heartbeat", daemon=True)
+        thread.start()
+        orchestrator = CrawlOrchestrator(self.db_path, job.max_parallel_sources or DEFAULT_MAX_PARALLEL_SOURCES,
+                                         scraper=self.scraper, analysis_workers=self.analysis_workers)
+        error = None
+        try:
+            orchestrator.run(source_ids, on_progress=on_progress, on_source_done=on_source_done, force=bool(job.force))
+        except Exception as e:
+            logger.error(f"Crawl job {job_id} failed: {e}")
+            error = str(e)
+        finally:
+            finished.set()
+            thread.join()
+            if self.scraper is None:
+                orchestrator.close()
+
+        # Sources without a result were not crawled, back off on them like on failed ones
+        crawled = {result['source_id']: result for result in progress['results']}
+        for source_id in job_sources:
+            result = crawled.get(source_id)
+            record_crawl(self.session, source_id, result['articles'] if result else 0,
+                         failed=result is None or bool(result['error']))
+
+        finish_job(self.session, job_id, progress['results'], error=error,
+                   articles=progress['articles'], sources_done=progress['sources_done'])
+        logger.info(f"Finished crawl job {job_id}: {progress['articles']} new articles.")
+
+def spawn_worker(log_path, idle_exit=SPAWNED_WORKER_IDLE_EXIT):
+    """
+    Starts a worker process on the default database, logging to log_path. It runs in
+    its own session, so it outlives the process that started it.
+    """
+    with open(log_path, 'a') as log:
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__), '--idle-exit', str(idle_exit)],
+                                stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs crawl jobs queued from the dashboard")
+    parser.add_argument('--db', help="Database URL, defaults to data/news_data.db")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL)
+    parser.add_argument('--idle-exit', type=float, help="Exit after this many seconds without jobs")
+    parser.add_argument('--schedule', action='store_true', help="Also queue crawls of sources that are due")
+    parser.add_argument('--analysis-workers', type=int, help="Processes analyzing articles, defaults to one per core")
+    args = parser.parse_args()
+
+    worker = JobWorker(args.db, args.poll_interval, args.idle_exit, schedule=args.schedule,
+                       analysis_workers=args.analysis_workers)
+    signal.signal(signal.SIGTERM, worker.stop)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
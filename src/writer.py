@@ -0,0 +1,136 @@
+import time
+import logging
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from database import Article, ArchivedPage, bump_data_version
+from dedup import MAX_DISTANCE, distance, find_duplicate
+
+logger = logging.getLogger(__name__)
+
+# Rows per transaction and the longest a row waits in the buffer
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+class ArticleWriter:
+    """
+    Buffers new articles and inserts them in one transaction per batch, with
+    INSERT ... ON CONFLICT(url) DO NOTHING so URLs stored by another run are skipped.
+    A batch is written once it holds batch_size rows or its oldest row is older than
+    flush_interval seconds (checked on add, flush_if_due and by callers waiting on
+    due_in), so a crash loses at most one batch and the SQLite write
+    lock is taken once per batch instead of once per article.
+    on_insert is called once per row that was actually inserted. Batches that insert
+    anything bump the data version, invalidating the dashboard's cached reads.
+    Rows whose simhash matches a stored article, or an earlier row of the batch, are
+    stored with duplicate_of pointing at it, see dedup.py.
+    Archived pages of the rows that were inserted (see archive.py) are indexed in the
+    same transaction. A row whose URL was already stored leaves no index row; the page
+    bytes already appended to a segment stay unreferenced, the archive never rewrites.
+    """
+    def __init__(self, session, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, on_insert=None):
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_insert = on_insert
+        self.inserted = 0
+        self._rows = []
+        # Archived pages of the buffered rows by URL
+        self._pages = {}
+        self._oldest = None
+
+    def add(self, row, page=None):
+        """
+        Buffers a dict of Article column values, and of ArchivedPage column values of
+        its page if it was archived, and flushes if the batch is due.
+        """
+        if not self._rows:
+            self._oldest = time.monotonic()
+        self._rows.append(row)
+        if page is not None:
+            row['page_digest'] = page['digest']
+            self._pages[row['url']] = page
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        if not self._rows:
+            return 0
+        if len(self._rows) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_interval:
+            return self.flush()
+        return 0
+
+    def due_in(self):
+        """
+        Seconds until the buffered rows are due, or flush_interval when nothing is
+        buffered. Callers that may not add a row for a while call flush_if_due then.
+        """
+        if not self._rows:
+            return self.flush_interval
+        return max(self.flush_interval - (time.monotonic() - self._oldest), 0)
+
+    def flush(self):
+        """
+        Writes the buffered rows in a single transaction. Returns the number inserted.
+        """
+        rows, self._rows = self._rows, []
+        pages, self._pages = self._pages, {}
+        if not rows:
+            return 0
+
+        statement = insert(Article).on_conflict_do_nothing(index_elements=['url']).returning(Article.url, Article.id)
+        try:
+            stories, copies = self._split_copies(rows)
+            stored = dict(self.session.execute(statement, stories).all()) if stories else {}
+            for row, original_url in copies:
+                if original_url is not None:
+                    # A copy of a row above that was already stored under its URL stays a story of its own
+                    row['duplicate_of'] = stored.get(original_url)
+            if copies:
+                stored.update(self.session.execute(statement, [row for row, _ in copies]).all())
+            inserted = len(stored)
+            # Only the pages of the inserted articles, nothing else would reference them
+            pages = [pages[url] for url in stored if url in pages]
+            if pages:
+                self.session.execute(insert(ArchivedPage).on_conflict_do_nothing(index_elements=['digest']), pages)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to write {len(rows)} articles: {e}")
+            self.session.rollback()
+            return 0
+
+        if inserted:
+            bump_data_version(self.session.get_bind())
+        if inserted < len(rows):
+            logger.info(f"{len(rows) - inserted} articles were already stored by another run.")
+        self.inserted += inserted
+        if self.on_insert:
+            for _ in range(inserted):
+                self.on_insert()
+        return inserted
+
+    def _split_copies(self, rows):
+        """
+        Splits rows into new stories and copies, (row, url of the original row in this
+        batch or None). Copies of stored articles get their duplicate_of here, copies of
+        rows in the batch once the original is inserted.
+        """
+        stories, copies = [], []
+        for row in rows:
+            row.setdefault('simhash', None)
+            row.setdefault('duplicate_of', None)
+            row.setdefault('page_digest', None)
+            fingerprint = row['simhash']
+            if row['duplicate_of'] is None and fingerprint is not None:
+                # Stored since the row was analyzed, by this or another crawl
+                row['duplicate_of'] = find_duplicate(self.session, fingerprint)
+            if row['duplicate_of'] is not None:
+                copies.append((row, None))
+                continue
+            original = None
+            if fingerprint is not None:
+                original = next((story['url'] for story in stories if story['simhash'] is not None
+                                 and distance(story['simhash'], fingerprint) <= MAX_DISTANCE), None)
+            if original is None:
+                stories.append(row)
+            else:
+                copies.append((row, original))
+        return stories, copies
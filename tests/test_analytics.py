@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import event, text
+from database import init_db, Source, Article
+from analytics import summary_metrics, sentiment_distribution, sentiment_by_source, daily_counts
+from queries import count_articles
+
+def make_session(tmp_path):
+    session = init_db(f"sqlite:///{tmp_path / 'news.db'}")()
+    tech = Source(name="Tech Daily", url="https://tech.example", category="Tech")
+    world = Source(name="World Wire", url="https://world.example", category="World")
+    session.add_all([tech, world])
+    session.flush()
+    sentiments = ["Positive", "Neutral", "Negative", "Positive"]
+    for i in range(40):
+        source = tech if i % 2 else world
+        session.add(Article(
+            title=f"Story {i}", url=f"https://example.com/{i}", source_id=source.id, category=source.category,
+            content="election results" if i < 10 else "market update",
+            sentiment=sentiments[i % 4], published_date=datetime(2024, 5, 1) + timedelta(days=i // 10),
+        ))
+    session.commit()
+    return session
+
+def test_aggregates_match_the_rows(tmp_path):
+    session = make_session(tmp_path)
+    statements = []
+    event.listen(session.bind, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    assert summary_metrics(session) == {'total': 40, 'positive': 20, 'negative': 10, 'sources': 2}
+    assert dict(sentiment_distribution(session).values.tolist()) == {"Positive": 20, "Neutral": 10, "Negative": 10}
+
+    by_source = sentiment_by_source(session, sentiment_filter=["Positive"])
+    assert sorted(by_source.values.tolist()) == [["Tech Daily", "Positive", 10], ["World Wire", "Positive", 10]]
+
+    per_day = daily_counts(session, source_filter=["World Wire"])
+    assert per_day.groupby('Date')['Count'].sum().tolist() == [5, 5, 5, 5]
+    assert str(per_day['Date'].dtype).startswith('datetime64')
+
+    # One GROUP BY query per frame, no per-article rows
+    assert len(statements) == 4
+
+def test_aggregates_follow_the_search(tmp_path):
+    session = make_session(tmp_path)
+    assert summary_metrics(session, "election") == {'total': 10, 'positive': 5, 'negative': 2, 'sources': 2}
+    assert daily_counts(session, "election")['Count'].sum() == 10
+    assert summary_metrics(session, "***")['total'] == 0
+    assert sentiment_by_source(session, "***").empty
+
+def test_rollup_follows_article_writes(tmp_path):
+    session = make_session(tmp_path)
+    moved = session.query(Article).filter_by(url="https://example.com/0").one()
+    moved.sentiment, moved.published_date = "Negative", datetime(2024, 6, 3, 23, 30)
+    session.query(Article).filter_by(url="https://example.com/1").one().duplicate_of = moved.id
+    session.delete(session.query(Article).filter_by(url="https://example.com/2").one())
+    session.commit()
+
+    rollup = session.execute(text("SELECT day, sentiment, source_id, is_copy, count FROM article_counts")).all()
+    rows = session.execute(text(
+        "SELECT date(published_date), coalesce(sentiment, ''), source_id, duplicate_of IS NOT NULL, count(*) "
+        "FROM articles GROUP BY 1, 2, 3, 4")).all()
+    assert sorted(rollup) == sorted(rows)
+
+    # Both ends of a date range are whole days, with or without a search
+    june = (date(2024, 6, 3), date(2024, 6, 3))
+    assert summary_metrics(session, date_range=june)['total'] == 1
+    assert count_articles(session, "election", date_range=june) == 1
+    assert summary_metrics(session, collapse_duplicates=True)['total'] == 38
+
+    weekly = daily_counts(session, bucket='week').groupby('Date')['Count'].sum()
+    assert weekly.to_dict() == {datetime(2024, 4, 29): 38, datetime(2024, 6, 3): 1}
@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import subprocess
+import pytest
+from textblob import TextBlob
+from analyzer import score_sentiments, sentiment_label, summarize_article, warm_up
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+NLP_PACKAGES = ('newspaper', 'nltk', 'textblob')
+
+SENTENCES = [
+    "The launch was a great success.",
+    "This is very good news for the city.",
+    "The plan is not good.",
+    "It was not a bad result, but not very exciting either.",
+    "Officials were really not happy with the terrible outcome!",
+    "What an amazing win!!! The fans celebrated.",
+    "I don't like the new rules, they are horrible.",
+    "Shares rose 3.5% on Tuesday.\n\nNot surprising, analysts said.",
+    "The council met on Tuesday.",
+    "",
+]
+
+def test_scores_match_textblob():
+    scores = score_sentiments(SENTENCES, batch_size=4)
+    assert scores == pytest.approx([TextBlob(text).sentiment.polarity for text in SENTENCES], abs=1e-9)
+
+def test_labels_use_thresholds():
+    assert [sentiment_label(score) for score in (0.5, 0.1, 0.0, -0.1, -0.11)] == [
+        "Positive", "Neutral", "Neutral", "Neutral", "Negative"]
+
+def test_dashboard_imports_skip_nlp():
+    # What app.py imports, timed by the interpreter in a fresh process
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import worker, scraper, queries, analytics, report_generator'],
+        cwd=SRC, capture_output=True, text=True, check=True)
+    imported = {line.split('|')[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+    assert 'analyzer' in imported
+    assert not {name for name in imported if name.split('.')[0] in NLP_PACKAGES}
+
+def test_warm_up_then_summarize():
+    warm_up()
+    assert all(name in sys.modules for name in NLP_PACKAGES)
+    text = "The council approved the new transport plan. " * 30
+    result = summarize_article("Transport plan approved", text)
+    assert result['summary'].startswith("The council approved")
+    assert result['sentiment_score'] == pytest.approx(TextBlob(text).sentiment.polarity, abs=1e-9)
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import asyncio
+import json
+from datetime import datetime
+from archive import PageArchive, prune_html, archive_directory
+from database import init_db, Source, Article, ArchivedPage
+from reprocess import reprocess
+from scraper import NewsScraper
+from writer import ArticleWriter
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'articles')
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, f"{name}.html"), encoding='utf-8') as f:
+        html = f.read()
+    with open(os.path.join(FIXTURES, f"{name}.json"), encoding='utf-8') as f:
+        return html, json.load(f)
+
+def test_pages_round_trip_through_segments(tmp_path):
+    html, _ = load_fixture('jsonld_story_body')
+    page = ('<html><head><style>body { color: red }</style><script>track("view")</script>'
+            '<script type="application/ld+json">{"headline": "Kept"}</script></head>'
+            '<body><!-- ad slot --><p>Story text.</p></body></html>')
+    assert prune_html(page) == ('<html><head><script type="application/ld+json">{"headline": "Kept"}</script>'
+                                '</head><body><p>Story text.</p></body></html>')
+
+    # Every page starts a new segment
+    archive = PageArchive(str(tmp_path / 'archive'), segment_size=1)
+    dictionary = archive.add_dictionary(html)
+    stored = [archive.put(html, dictionary), archive.put(page), archive.put(html.replace("2024", "2025"), dictionary)]
+    archive.close()
+    assert len({row['segment'] for row in stored}) == 3
+    # The dictionary holds the page itself, what is left costs next to nothing
+    assert stored[0]['length'] < stored[2]['length'] < stored[0]['size'] / 3
+
+    reader = PageArchive(str(tmp_path / 'archive'))
+    assert reader.get(stored[0]) == prune_html(html)
+    assert reader.get(stored[1]) == prune_html(page)
+    assert reader.get(stored[2]) == prune_html(html).replace("2024", "2025")
+
+def test_archived_pages_are_reprocessed_offline(tmp_path):
+    db_path = f"sqlite:///{tmp_path / 'news.db'}"
+    scraper = NewsScraper(db_path)
+    assert scraper.archive.directory == archive_directory(scraper.session.get_bind()) == str(tmp_path / 'news_archive')
+    source = Source(name="Example", url="https://news.example.com", archive_pages=True)
+    scraper.session.add(source)
+    scraper.session.commit()
+
+    html, expected = load_fixture('semantic_article')
+    # Stored by an older extractor, before the page's date was read
+    analysis = {'title': "Old title", 'text': "Old text", 'summary': "Old summary", 'sentiment': "Neutral",
+                'sentiment_score': 0.0}
+    page = asyncio.run(scraper._archive_page(source, html))
+    # The dictionary is saved on its own, nothing of the crawl's session is committed
+    assert not scraper.session.dirty
+    with init_db(db_path)() as session:
+        assert session.get(Source, source.id).archive_dictionary == page['dictionary']
+    writer = ArticleWriter(scraper.session)
+    writer.add(scraper._article_row(source, expected['url'], analysis), page)
+    writer.flush()
+    assert source.archive_dictionary == page['dictionary']
+    assert scraper.session.query(Article).one().page_digest == scraper.session.query(ArchivedPage).one().digest
+    # Stored already, the page of the URL's second copy is not indexed
+    again = asyncio.run(scraper._archive_page(source, html + "<p>Fetched again.</p>"))
+    writer.add(scraper._article_row(source, expected['url'], analysis), again)
+    assert writer.flush() == 0
+    assert scraper.session.query(ArchivedPage).count() == 1
+    scraper.close()
+
+    stats = reprocess(db_path, workers=1)
+    assert stats == {'articles': 1, 'changed': 1, 'skipped': 0, 'failed': 0}
+    session = init_db(db_path)()
+    article = session.query(Article).one()
+    assert article.title == expected['title'] and article.content == expected['text']
+    assert article.published_date == datetime.fromisoformat(expected['publish_date'])
+    session.close()
@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import event
+from database import init_db, Source, Article, data_version
+from writer import ArticleWriter
+
+def make_row(source, i):
+    return {'title': f"Story {i}", 'url': f"https://example.com/story-{i}", 'content': "Body", 'source_id': source.id}
+
+def test_writer_commits_once_per_batch(tmp_path):
+    Session = init_db(f"sqlite:///{tmp_path / 'news.db'}")
+    session = Session()
+    source = Source(name="Example", url="https://example.com")
+    session.add(source)
+    session.commit()
+
+    commits = []
+    event.listen(session, 'after_commit', lambda s: commits.append(1))
+    progress = []
+    writer = ArticleWriter(session, batch_size=10, flush_interval=60, on_insert=lambda: progress.append(1))
+
+    for i in range(25):
+        writer.add(make_row(source, i))
+    # Two full batches are written, the remaining five wait in the buffer
+    assert len(commits) == 2
+    assert session.query(Article).count() == 20
+    assert len(progress) == 20
+
+    writer.add(make_row(source, 0)) # Already stored
+    assert writer.flush() == 5
+    assert writer.inserted == 25
+    assert len(progress) == 25
+    assert len(commits) == 3
+    assert session.query(Article).count() == 25
+    session.close()
+
+def test_writer_flushes_after_interval(tmp_path):
+    Session = init_db(f"sqlite:///{tmp_path / 'news.db'}")
+    session = Session()
+    source = Source(name="Example", url="https://example.com")
+    session.add(source)
+    session.commit()
+
+    writer = ArticleWriter(session, batch_size=100, flush_interval=0)
+    writer.add(make_row(source, 1))
+    assert session.query(Article).count() == 1
+    assert writer.flush_if_due() == 0
+    session.close()
+
+def test_writer_bumps_data_version_only_on_insert(tmp_path):
+    Session = init_db(f"sqlite:///{tmp_path / 'news.db'}")
+    session = Session()
+    source = Source(name="Example", url="https://example.com")
+    session.add(source)
+    session.commit()
+    engine = session.get_bind()
+
+    writer = ArticleWriter(session, batch_size=1)
+    before = data_version(engine)
+    writer.add(make_row(source, 1))
+    after_insert = data_version(engine)
+    assert after_insert != before
+    assert os.path.exists(tmp_path / 'news.db.version')
+
+    writer.add(make_row(source, 1)) # Duplicate, nothing changes
+    assert data_version(engine) == after_insert
+    session.close()
@@ -0,0 +1,158 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from database import Source, Article
+from scraper import NewsScraper, HostLimiter, PagePool
+from writer import ArticleWriter
+
+def test_host_limiter_caps_parallel_fetches_per_host():
+    limiter = HostLimiter(per_host=2)
+    active = {}
+    peak = {}
+
+    async def fetch(url, host):
+        async with limiter.slot(url):
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    async def main():
+        jobs = [fetch(f"https://a.example/{i}", 'a') for i in range(10)]
+        jobs += [fetch(f"https://b.example/{i}", 'b') for i in range(10)]
+        await asyncio.gather(*jobs)
+
+    asyncio.run(main())
+    assert peak == {'a': 2, 'b': 2}
+
+def test_writer_ignores_duplicate_url(tmp_path):
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Example", url="https://example.com")
+    scraper.session.add(source)
+    scraper.session.commit()
+
+    analysis = {
+        'title': "Title", 'text': "Body", 'summary': "Summary",
+        'sentiment': "Neutral", 'sentiment_score': 0.0
+    }
+    writer = ArticleWriter(scraper.session)
+    writer.add(scraper._article_row(source, "https://example.com/story", analysis))
+    assert writer.flush() == 1
+    writer.add(scraper._article_row(source, "https://example.com/story", analysis))
+    assert writer.flush() == 0
+    assert scraper.session.query(Article).count() == 1
+    scraper.close()
+
+def test_publish_date_falls_back_to_feed_then_crawl_time(tmp_path):
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Example", url="https://example.com")
+    link = "https://example.com/story"
+    analysis = {'title': "Title", 'text': "Body", 'summary': "Summary", 'sentiment': "Neutral",
+                'sentiment_score': 0.0, 'publish_date': datetime(2024, 3, 5, 14, 30)}
+    feed_date = datetime(2024, 3, 6)
+
+    assert scraper._article_row(source, link, analysis, feed_date)['published_date'] == datetime(2024, 3, 5, 14, 30)
+    # A date in the future is bad page metadata
+    analysis['publish_date'] = datetime.utcnow() + timedelta(days=30)
+    assert scraper._article_row(source, link, analysis, feed_date)['published_date'] == feed_date
+    published = scraper._article_row(source, link, analysis)['published_date']
+    assert abs(published - datetime.utcnow()) < timedelta(minutes=1)
+    scraper.close()
+
+def test_thin_pages_are_analyzed_again_from_the_browser(tmp_path):
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}", analysis_workers=2)
+    source = Source(name="Example", url="https://example.com")
+    scraper.session.add(source)
+    scraper.session.commit()
+    fetched = []
+
+    async def fetch_article(source, pages, link, limiter, browser_only=False):
+        fetched.append((link, browser_only))
+        await asyncio.sleep(0)
+        if browser_only:
+            return "rendered", 'browser'
+        return ("full" if link.endswith(('0', '2', '4')) else "thin"), 'http'
+
+    async def analyze(session, link, content, extractor=None):
+        await asyncio.sleep(0)
+        text = "Body " * 100 if content != "thin" else "Enable JavaScript"
+        return {'title': link, 'text': text, 'summary': "Summary", 'sentiment': "Neutral", 'sentiment_score': 0.0}
+
+    scraper._fetch_article = fetch_article
+    scraper._analyze = analyze
+    links = [f"https://example.com/story-{i}" for i in range(6)]
+    assert asyncio.run(scraper._fetch_articles(scraper.session, source, PagePool(None, 3), links, None)) == 6
+    assert sorted(link for link, browser_only in fetched if browser_only) == links[1::2]
+    assert scraper.session.query(Article).count() == 6
+    scraper.close()
+
+class FakePool:
+    """Runs submitted calls in-process, or fails them like a pool whose process died."""
+    def __init__(self, broken):
+        self.broken = broken
+
+    def submit(self, function, *args):
+        if self.broken:
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+def test_broken_analysis_pool_is_restarted_without_refetching(tmp_path):
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Example", url="https://example.com")
+    scraper.session.add(source)
+    scraper.session.commit()
+
+    # The page is analyzed again in a new pool
+    pools = [FakePool(broken=True), FakePool(broken=False)]
+    scraper._get_analysis_pool = lambda: scraper._analysis_pool or pools.pop(0)
+    assert asyncio.run(scraper._in_pool("https://example.com/story", len, "text")) == 4
+    assert not pools
+
+    # A page that keeps killing the pool is dropped, not fetched again from the browser
+    fetched = []
+
+    async def fetch_article(source, pages, link, limiter, browser_only=False):
+        fetched.append(browser_only)
+        return "<html></html>", 'http'
+
+    scraper._fetch_article = fetch_article
+    scraper._get_analysis_pool = lambda: FakePool(broken=True)
+    links = ["https://example.com/story"]
+    assert asyncio.run(scraper._fetch_articles(scraper.session, source, PagePool(None, 1), links, None)) == 0
+    assert fetched == [False]
+    scraper.close()
+
+def test_rows_are_written_while_fetches_stall(tmp_path):
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}", batch_size=10, flush_interval=0.05)
+    source = Source(name="Example", url="https://example.com")
+    scraper.session.add(source)
+    scraper.session.commit()
+    stored_while_stalled = []
+
+    async def fetch_article(source, pages, link, limiter, browser_only=False):
+        if link.endswith('slow'):
+            await asyncio.sleep(0.5)
+            stored_while_stalled.append(scraper.session.query(Article).count())
+        return "full", 'http'
+
+    async def analyze(session, link, content, extractor=None):
+        return {'title': link, 'text': "Body " * 100, 'summary': "Summary", 'sentiment': "Neutral",
+                'sentiment_score': 0.0}
+
+    scraper._fetch_article = fetch_article
+    scraper._analyze = analyze
+    links = ["https://example.com/story-fast", "https://example.com/story-slow"]
+    assert asyncio.run(scraper._fetch_articles(scraper.session, source, PagePool(None, 2), links, None)) == 2
+    # The fast story was written long before the slow one came in
+    assert stored_while_stalled == [1]
+    scraper.close()
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import random
+from sqlalchemy import select, func
+from database import init_db, Source, Article, SimHashBand
+from dedup import MAX_DISTANCE, simhash, distance, find_duplicate
+from queries import count_articles
+from writer import ArticleWriter
+
+WORDS = ("council transport plan bus routes cycle lanes parking charges centre market growth policy "
+         "energy court report launch network health research budget vote climate trade security").split()
+
+def make_story(seed, words=600):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+def test_fingerprints_of_copies_are_close():
+    story = make_story(2)
+    # A republished copy with a byline
+    copy = "By Staff Reporter. " + story
+    assert distance(simhash(story), simhash(copy)) <= MAX_DISTANCE
+    assert distance(simhash(story), simhash(make_story(3))) > MAX_DISTANCE
+    assert simhash("") is None
+
+def test_copies_are_linked_and_promoted(tmp_path):
+    Session = init_db(f"sqlite:///{tmp_path / 'news.db'}")
+    session = Session()
+    source = Source(name="Example", url="https://example.com")
+    session.add(source)
+    session.commit()
+
+    def row(i, text):
+        return {'title': f"Story {i}", 'url': f"https://example.com/{i}", 'content': text,
+                'source_id': source.id, 'simhash': simhash(text)}
+
+    story, other = make_story(2), make_story(3)
+    writer = ArticleWriter(session, batch_size=10)
+    writer.add(row(1, story))
+    writer.add(row(2, other))
+    # A copy in the same batch as its original
+    writer.add(row(3, story + " Copyright Wire Service."))
+    assert writer.flush() == 3
+    # A copy of a stored story
+    writer.add(row(4, "Updated: " + story))
+    assert writer.flush() == 1
+
+    first = session.query(Article).filter_by(url="https://example.com/1").one()
+    copies = [article.url for article in session.query(Article).filter_by(duplicate_of=first.id).order_by(Article.id)]
+    assert copies == ["https://example.com/3", "https://example.com/4"]
+    assert count_articles(session) == 4 and count_articles(session, collapse_duplicates=True) == 2
+    # Only stories are indexed
+    assert session.scalar(select(func.count()).select_from(SimHashBand)) == 2 * 4
+
+    # Deleting the original makes the oldest copy the story
+    session.delete(first)
+    session.commit()
+    promoted = session.query(Article).filter_by(url="https://example.com/3").one()
+    assert promoted.duplicate_of is None
+    assert session.query(Article).filter_by(url="https://example.com/4").one().duplicate_of == promoted.id
+    assert find_duplicate(session, simhash(story)) == promoted.id
+    session.close()
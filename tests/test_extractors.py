@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import glob
+import json
+from datetime import datetime
+import pytest
+from extractors import extract, extract_lxml
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'articles')
+PAGES = sorted(os.path.basename(path)[:-len('.html')] for path in glob.glob(os.path.join(FIXTURES, '*.html')))
+
+# Text in <br> separated lines rather than paragraphs, which only newspaper3k reads
+LINE = "The harbour authority said the new ferry terminal would open in the spring, after delays caused by storms."
+BR_PAGE = (f"<html><head><title>Ferry terminal to open in spring</title></head>"
+           f"<body><div class='content'>{'<br><br>'.join([LINE] * 5)}</div></body></html>")
+
+@pytest.mark.parametrize('page', PAGES)
+def test_lxml_extractor_reads_saved_pages(page):
+    with open(os.path.join(FIXTURES, page + '.html'), encoding='utf-8') as f:
+        html = f.read()
+    with open(os.path.join(FIXTURES, page + '.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    result = extract_lxml(expected['url'], html)
+    assert result['title'] == expected['title']
+    assert result['publish_date'] == datetime.fromisoformat(expected['publish_date'])
+    assert result['text'] == expected['text']
+
+def test_newspaper_is_the_fallback():
+    url = "https://example.com/news/ferry-terminal"
+    assert extract(url, BR_PAGE, 'lxml')['text'] == ""
+    # The default tries newspaper3k when the lxml extractor finds too little
+    assert extract(url, BR_PAGE)['text'].startswith(LINE)
+    assert extract(url, BR_PAGE, 'newspaper')['title'] == "Ferry terminal to open in spring"
@@ -0,0 +1,132 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import gzip
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from database import Source, Article, CrawlState
+from scraper import NewsScraper
+from feeds import parse_feed, parse_date, discover_feed_urls, sitemaps_from_robots, collect_entries
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Example</title>
+  <item><title>One</title><link>https://example.com/news/one</link><pubDate>Tue, 14 May 2024 08:30:00 +0200</pubDate></item>
+  <item><title>Two</title><guid isPermaLink="true">https://example.com/news/two</guid></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Example</title>
+  <entry><title>One</title><link rel="alternate" href="https://example.com/a/one"/><link rel="edit" href="https://example.com/edit/1"/>
+    <published>2024-05-14T06:30:00Z</published></entry>
+</feed>"""
+
+NEWS_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url><loc>https://example.com/2024/05/14/story</loc>
+    <news:news><news:publication_date>2024-05-14T10:00:00+02:00</news:publication_date></news:news></url>
+</urlset>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/news-1.xml</loc></sitemap>
+</sitemapindex>"""
+
+def test_parse_rss_and_atom():
+    assert parse_feed(RSS)['entries'] == [
+        ('https://example.com/news/one', datetime(2024, 5, 14, 6, 30)),
+        ('https://example.com/news/two', None),
+    ]
+    assert parse_feed(ATOM)['entries'] == [('https://example.com/a/one', datetime(2024, 5, 14, 6, 30))]
+
+def test_parse_news_sitemap_and_index():
+    assert parse_feed(gzip.compress(NEWS_SITEMAP))['entries'] == [
+        ('https://example.com/2024/05/14/story', datetime(2024, 5, 14, 8, 0)),
+    ]
+    parsed = parse_feed(SITEMAP_INDEX)
+    assert parsed == {'entries': [], 'sitemaps': ['https://example.com/news-1.xml']}
+
+    documents = {'https://example.com/index.xml': SITEMAP_INDEX, 'https://example.com/news-1.xml': NEWS_SITEMAP}
+    assert collect_entries(documents.get, ['https://example.com/index.xml', 'https://example.com/missing.xml']) == [
+        ('https://example.com/2024/05/14/story', datetime(2024, 5, 14, 8, 0)),
+    ]
+
+def test_parse_feed_tolerates_garbage():
+    assert parse_feed(b"<html><body><p>Not a feed</body></html>")['entries'] == []
+    assert parse_date("not a date") is None
+
+def test_discovery_helpers():
+    html = ('<html><head><link rel="alternate" type="application/rss+xml" href="/feed.xml">'
+            '<link rel="alternate" hreflang="de" href="/de/"></head><body></body></html>')
+    assert discover_feed_urls(html, "https://example.com/news/") == ["https://example.com/feed.xml"]
+
+    robots = "User-agent: *\nDisallow: /admin\nSitemap: https://example.com/sitemap.xml\nSitemap: https://example.com/news-sitemap.xml\n"
+    assert sitemaps_from_robots(robots, "https://example.com") == ["https://example.com/news-sitemap.xml"]
+
+PARAGRAPH = ("The city council met on Tuesday to discuss the new transport plan, which proposes "
+             "additional bus routes, wider cycle lanes and a review of parking charges. ")
+
+def start_fixture_server(hits):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            hits.append(self.path)
+            base = f"http://127.0.0.1:{self.server.server_address[1]}"
+            if self.path == '/robots.txt':
+                body, content_type = f"User-agent: *\nSitemap: {base}/news-sitemap.xml\n", 'text/plain'
+            elif self.path == '/news-sitemap.xml':
+                urls = "".join(f"<url><loc>{base}/topics/{i}</loc></url>" for i in range(5))
+                body = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+                content_type = 'application/xml'
+            elif self.path.startswith('/topics/'):
+                # Short URLs the link scorer would reject on a front page
+                paragraphs = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(20))
+                body = f"<html><head><title>Story {self.path}</title></head><body><article>{paragraphs}</article></body></html>"
+                content_type = 'text/html'
+            else:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_scrape_from_detected_sitemap(tmp_path):
+    hits = []
+    server = start_fixture_server(hits)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Fixture", url=base_url)
+    scraper.session.add(source)
+    scraper.session.commit()
+    try:
+        assert scraper.scrape_source(source.id) == 5
+        # Saved by the crawl's own session
+        scraper.session.refresh(source)
+        assert source.feed_urls == f"{base_url}/news-sitemap.xml"
+        assert scraper.run_stats[source.id]['from_feeds']
+        assert scraper.session.get(CrawlState, source.id).feeds_checked_at is not None
+
+        # Known feeds: no probing and no front page, only the sitemap is read
+        hits.clear()
+        assert scraper.scrape_source(source.id) == 0
+        assert hits == ['/news-sitemap.xml']
+        assert scraper.run_stats[source.id]['unchanged']
+        assert scraper.session.query(Article).count() == 5
+    finally:
+        scraper.close()
+        server.shutdown()
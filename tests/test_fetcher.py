@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from fetcher import HttpFetcher, looks_js_gated, choose_tier
+
+ARTICLE_HTML = "<html><body><article>" + "<p>Plain server-rendered paragraph.</p>" * 100 + "</article></body></html>"
+
+def test_looks_js_gated():
+    assert not looks_js_gated(ARTICLE_HTML)
+    assert looks_js_gated("")
+    assert looks_js_gated("<html><body>tiny</body></html>")
+    assert looks_js_gated(ARTICLE_HTML.replace("<article>", '<div id="root"></div><article>'))
+    assert looks_js_gated(ARTICLE_HTML.replace("<article>", "<noscript>Please enable JavaScript</noscript><article>"))
+
+def test_choose_tier():
+    assert choose_tier(None, http_ok=5, browser_rescued=1) == 'http'
+    assert choose_tier(None, http_ok=0, browser_rescued=3) == 'browser'
+    assert choose_tier('browser', http_ok=0, browser_rescued=0) == 'browser'
+    assert choose_tier(None, http_ok=0, browser_rescued=0) is None
+
+def test_http_fetcher_reuses_connections():
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            if self.path == '/missing':
+                body, status, content_type = b"", 404, 'text/html'
+            elif self.path == '/data.json':
+                body, status, content_type = b"{}", 200, 'application/json'
+            else:
+                body, status, content_type = ARTICLE_HTML.encode(), 200, 'text/html; charset=utf-8'
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    fetcher = HttpFetcher()
+    try:
+        for i in range(5):
+            assert fetcher.fetch(f"{base}/story-{i}") == ARTICLE_HTML
+        assert fetcher.fetch(f"{base}/missing") is None
+        assert fetcher.fetch(f"{base}/data.json") is None
+        assert len(connections) == 1
+    finally:
+        fetcher.close()
+        server.shutdown()
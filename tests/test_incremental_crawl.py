@@ -0,0 +1,144 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from database import Source, Article, CrawlState
+from orchestrator import CrawlOrchestrator
+from scraper import NewsScraper
+
+PARAGRAPH = ("The city council met on Tuesday to discuss the new transport plan, which proposes "
+             "additional bus routes, wider cycle lanes and a review of parking charges. ")
+
+def start_fixture_server(config, hits):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path == '/':
+                if self.headers.get('If-None-Match') == config['etag']:
+                    self.send_response(304)
+                    self.send_header('ETag', config['etag'])
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                links = "".join(f'<a href="/news/2024/05/council-story-number-{i}?utm_source={config["etag"]}">Story</a>'
+                                for i in range(12))
+                body = f"<html><body><nav>{PARAGRAPH * 20}</nav>{links}</body></html>"
+            else:
+                paragraphs = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(20))
+                body = f"<html><head><title>Story {self.path}</title></head><body><article>{paragraphs}</article></body></html>"
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('ETag', config['etag'])
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_unchanged_front_page_short_circuits(tmp_path):
+    config = {'etag': '"v1"'}
+    hits = []
+    server = start_fixture_server(config, hits)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Fixture", url=base_url)
+    scraper.session.add(source)
+    scraper.session.commit()
+    try:
+        # First run: everything is new, no browser is needed for server-rendered pages
+        assert scraper.scrape_source(source.id) == 12
+        state = scraper.session.get(CrawlState, source.id)
+        assert state.etag == '"v1"' and state.links_hash
+
+        # Same ETag: a single conditional request answered with 304
+        hits.clear()
+        assert scraper.scrape_source(source.id) == 0
+        assert hits == ['/']
+        assert scraper.run_stats[source.id]['unchanged']
+
+        # New ETag but the same stories (only tracking parameters differ): link set is unchanged
+        config['etag'] = '"v2"'
+        hits.clear()
+        assert scraper.scrape_source(source.id) == 0
+        assert hits == ['/']
+        assert scraper.run_stats[source.id]['unchanged']
+
+        # force=True ignores the crawl state
+        assert scraper.scrape_source(source.id, force=True) == 0
+        assert not scraper.run_stats[source.id]['unchanged']
+        assert scraper.session.query(Article).count() == 12
+    finally:
+        scraper.close()
+        server.shutdown()
+
+def test_cleared_or_reconfigured_sources_are_crawled_again(tmp_path):
+    config = {'etag': '"v1"'}
+    hits = []
+    server = start_fixture_server(config, hits)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Fixture", url=base_url)
+    scraper.session.add(source)
+    scraper.session.commit()
+    try:
+        assert scraper.scrape_source(source.id) == 12
+
+        # Changed link rules: the 304 is not trusted, the stories are fetched again
+        source.deny_patterns = r"number-1\d"
+        scraper.session.commit()
+        assert scraper.scrape_source(source.id) == 0
+        assert not scraper.run_stats[source.id]['unchanged']
+        assert scraper.run_stats[source.id]['links'] == 12
+        assert scraper.scrape_source(source.id) == 0
+        assert scraper.run_stats[source.id]['unchanged']
+
+        # Articles cleared with the crawl state left in place
+        scraper.session.query(Article).delete()
+        scraper.session.commit()
+        assert scraper.scrape_source(source.id) == 10
+    finally:
+        scraper.close()
+        server.shutdown()
+
+def test_a_failing_source_does_not_roll_back_the_others(tmp_path):
+    hits = []
+    servers = [start_fixture_server({'etag': '"v1"'}, hits) for _ in range(2)]
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    working = Source(name="Working", url=f"http://127.0.0.1:{servers[0].server_address[1]}")
+    broken = Source(name="Broken", url=f"http://127.0.0.1:{servers[1].server_address[1]}")
+    scraper.session.add_all([working, broken])
+    scraper.session.commit()
+    fetch_articles = scraper._fetch_articles
+
+    async def fail_broken_source(session, source, *args):
+        if source.name == "Broken":
+            # While the other source is still crawling
+            await asyncio.sleep(0.05)
+            raise RuntimeError("boom")
+        return await fetch_articles(session, source, *args)
+
+    scraper._fetch_articles = fail_broken_source
+    try:
+        results = CrawlOrchestrator(scraper=scraper).run()
+        assert [result['articles'] for result in results] == [12, 0]
+        assert results[0]['error'] is None and results[1]['error'] == "boom"
+        assert scraper.session.get(CrawlState, working.id).etag == '"v1"'
+        assert scraper.session.get(CrawlState, broken.id) is None
+        assert scraper.session.query(Article).count() == 12
+    finally:
+        scraper.close()
+        for server in servers:
+            server.shutdown()
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import asyncio
+import socket
+from datetime import datetime, timedelta
+from database import init_db, Source, CrawlJob, CrawlState
+from jobs import (MAX_ATTEMPTS, STALE_AFTER, enqueue_crawl, claim_next_job, job_results, recent_jobs,
+                  worker_heartbeat, live_workers)
+from scheduler import DEFAULT_INTERVAL
+from scraper import NewsScraper
+from worker import JobWorker
+
+class StubScraper:
+    """Stands in for NewsScraper, every source yields as many articles as its id."""
+    def __init__(self, session):
+        self.session = session
+        self.run_stats = {}
+        self.forced = []
+
+    async def scrape_source_async(self, source_id, on_progress=None, browser=None, force=False):
+        await asyncio.sleep(0)
+        self.forced.append(force)
+        for _ in range(source_id):
+            on_progress()
+        return source_id
+
+def test_jobs_are_claimed_once_and_recovered_from_dead_workers(tmp_path):
+    session = init_db(f"sqlite:///{tmp_path / 'news.db'}")()
+    first = enqueue_crawl(session).id
+    second = enqueue_crawl(session, source_ids=[2, 3], force=True).id
+
+    assert claim_next_job(session, "a:1") == first
+    assert claim_next_job(session, "b:2") == second
+    assert claim_next_job(session, "c:3") is None
+
+    # Worker a stops sending heartbeats, its job goes to the next worker
+    stale = datetime.utcnow() - timedelta(seconds=STALE_AFTER + 1)
+    session.query(CrawlJob).filter_by(id=first).update({'heartbeat_at': stale})
+    session.commit()
+    assert claim_next_job(session, "c:3") == first
+    job = session.get(CrawlJob, first)
+    session.refresh(job)
+    assert (job.worker, job.attempts) == ("c:3", 2)
+
+    # Until it has been tried too often
+    session.query(CrawlJob).filter_by(id=first).update({'heartbeat_at': stale, 'attempts': MAX_ATTEMPTS})
+    session.commit()
+    assert claim_next_job(session, "d:4") is None
+    assert [(row.id, row.status) for row in recent_jobs(session)] == [(second, 'running'), (first, 'failed')]
+
+    worker_heartbeat(session, "d:4")
+    assert live_workers(session) == ["d:4"]
+    assert live_workers(session, now=datetime.utcnow() + timedelta(seconds=STALE_AFTER + 1)) == []
+    session.close()
+
+def test_worker_runs_job_and_records_results(tmp_path):
+    db_path = f"sqlite:///{tmp_path / 'news.db'}"
+    session = init_db(db_path)()
+    for i in range(1, 4):
+        session.add(Source(name=f"Source {i}", url=f"https://s{i}.example"))
+    session.commit()
+    job_id = enqueue_crawl(session, source_ids=[1, 3], force=True, max_parallel_sources=2).id
+
+    scraper = StubScraper(session)
+    worker = JobWorker(db_path, poll_interval=0, idle_exit=0, scraper=scraper)
+    worker.run()
+
+    job = session.get(CrawlJob, job_id)
+    assert job.status == 'done'
+    assert (job.sources_total, job.sources_done, job.articles) == (2, 2, 4)
+    assert sorted(result['name'] for result in job_results(job)) == ["Source 1", "Source 3"]
+    assert scraper.forced == [True, True]
+    assert live_workers(session) == []
+    session.close()
+
+def test_unreachable_source_is_reported_and_backs_off(tmp_path):
+    # A port nothing listens on
+    with socket.socket() as listener:
+        listener.bind(('127.0.0.1', 0))
+        port = listener.getsockname()[1]
+    db_path = f"sqlite:///{tmp_path / 'news.db'}"
+    session = init_db(db_path)()
+    session.add(Source(name="Down", url=f"http://127.0.0.1:{port}", discovery='page'))
+    session.commit()
+    job_id = enqueue_crawl(session, source_ids=[1]).id
+
+    scraper = NewsScraper(db_path)
+    try:
+        JobWorker(db_path, poll_interval=0, idle_exit=0, scraper=scraper).run()
+    finally:
+        scraper.close()
+
+    [result] = job_results(session.get(CrawlJob, job_id))
+    assert result['articles'] == 0 and result['error']
+    # A failure, not a quiet crawl: the interval doubles and the yield is left alone
+    state = session.get(CrawlState, 1)
+    assert state.interval == 2 * DEFAULT_INTERVAL and state.new_per_hour is None
+    session.close()
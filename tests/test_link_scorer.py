@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from link_scorer import LinkScorer, url_shape, DEFAULT_MIN_LINK_SCORE
+
+def test_url_shape():
+    assert url_shape("https://www.thestar.com.my/news/nation/2025/11/20/firms-win-contracts") == "news/nation/N/N/N/S"
+    assert url_shape("https://theedgemalaysia.com/node/781381") == "node/N"
+    assert url_shape("https://www.thestar.com.my/sport/football") == "sport/football"
+
+def test_section_pages_score_below_threshold():
+    scorer = LinkScorer()
+    for url in ["https://www.thestar.com.my/business", "https://www.thestar.com.my/sport/football",
+                "https://www.thestar.com.my/starplus", "https://www.scoop.my/sections/news/"]:
+        assert scorer.score(url) < DEFAULT_MIN_LINK_SCORE, url
+    for url in ["https://www.thestar.com.my/news/nation/2025/11/20/bumiputera-firms-win-56-of-uem-edgenta-contracts",
+                "https://theedgemalaysia.com/node/781381",
+                "https://www.scoop.my/news/254120/council-approves-new-transport-plan/"]:
+        assert scorer.score(url) >= DEFAULT_MIN_LINK_SCORE, url
+
+def test_learned_templates_boost_matching_links():
+    history = [f"https://example.com/story/{word}" for word in ["budget", "floods", "rally"] * 10]
+    history += ["https://example.com/world"]
+    untrained = LinkScorer()
+    trained = LinkScorer(history)
+    # Literal shapes such as "story/budget" or "world" are not templates, so nothing is learned
+    assert trained.samples == 0
+
+    history = [f"https://example.com/story/{i}x" for i in range(30)]
+    trained = LinkScorer(history)
+    assert trained.score("https://example.com/story/99x") > untrained.score("https://example.com/story/99x")
+    assert trained.score("https://example.com/story/99x") >= DEFAULT_MIN_LINK_SCORE
+    assert trained.score("https://example.com/world/99x") < trained.score("https://example.com/story/99x")
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import sqlite3
+from sqlalchemy import inspect, text
+from database import init_db, Article
+from migrations import SCHEMA_VERSION
+
+# Schema of the first release, before any migration existed
+LEGACY_SCHEMA = """
+CREATE TABLE sources (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, url VARCHAR NOT NULL, login_url VARCHAR,
+    username_selector VARCHAR, password_selector VARCHAR, submit_selector VARCHAR,
+    username VARCHAR, password VARCHAR, requires_login BOOLEAN,
+    PRIMARY KEY (id), UNIQUE (url)
+);
+CREATE TABLE articles (
+    id INTEGER NOT NULL, title VARCHAR NOT NULL, url VARCHAR NOT NULL, content TEXT, summary TEXT,
+    sentiment VARCHAR, sentiment_score INTEGER, published_date DATETIME, scraped_date DATETIME,
+    source_id INTEGER, PRIMARY KEY (id), UNIQUE (url), FOREIGN KEY(source_id) REFERENCES sources (id)
+);
+INSERT INTO sources (id, name, url) VALUES (1, 'Example', 'https://example.com');
+INSERT INTO articles (id, title, url, source_id) VALUES (1, 'Story', 'https://www.example.com/story/?utm_source=x', 1);
+"""
+
+def test_new_database_is_created_at_latest_version(tmp_path):
+    Session = init_db(f"sqlite:///{tmp_path / 'news.db'}")
+    session = Session()
+    assert session.execute(text("PRAGMA user_version")).scalar() == SCHEMA_VERSION
+    assert session.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+    assert session.execute(text("PRAGMA synchronous")).scalar() == 1 # NORMAL
+    session.close()
+
+def test_legacy_database_is_migrated(tmp_path):
+    path = tmp_path / 'legacy.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+
+    Session = init_db(f"sqlite:///{path}")
+    session = Session()
+    assert session.execute(text("PRAGMA user_version")).scalar() == SCHEMA_VERSION
+    columns = {c['name'] for c in inspect(session.bind).get_columns('sources')}
+    assert {'category', 'include_external', 'max_concurrency', 'feed_urls', 'crawl_interval'} <= columns
+    assert inspect(session.bind).has_table('crawl_state')
+    assert session.query(Article).one().canonical_url == "https://example.com/story"
+    # Stored articles are counted into the rollup
+    assert session.execute(text("SELECT sum(count) FROM article_counts")).scalar() == 1
+
+    # The dashboard's category filter is served by the composite index, sorted by it as well
+    plan = " ".join(row[-1] for row in session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT * FROM articles WHERE category = 'Tech' ORDER BY published_date DESC"
+    )))
+    assert 'ix_articles_category_published' in plan
+    assert 'TEMP B-TREE' not in plan
+    session.close()
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import asyncio
+from database import init_db, Source
+from orchestrator import CrawlOrchestrator
+
+class StubScraper:
+    """Stands in for NewsScraper and records how many sources run at once."""
+    def __init__(self, session):
+        self.session = session
+        self.active = 0
+        self.peak = 0
+        self.browsers = set()
+        self.run_stats = {}
+
+    async def scrape_source_async(self, source_id, on_progress=None, browser=None, force=False):
+        self.browsers.add(id(await browser.get()))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if source_id == 3:
+            raise RuntimeError("boom")
+        on_progress()
+        return source_id
+
+def test_orchestrator_limits_parallel_sources_and_reports_results(tmp_path):
+    session = init_db(f"sqlite:///{tmp_path / 'news.db'}")()
+    for i in range(1, 6):
+        session.add(Source(name=f"Source {i}", url=f"https://s{i}.example"))
+    session.commit()
+
+    scraper = StubScraper(session)
+    orchestrator = CrawlOrchestrator(max_parallel_sources=2, scraper=scraper)
+    progress = []
+    done = []
+    browser = object()
+    results = asyncio.run(orchestrator.run_async(
+        on_progress=lambda: progress.append(1), on_source_done=done.append, browser=browser
+    ))
+
+    assert scraper.peak == 2
+    assert scraper.browsers == {id(browser)}
+    assert [r['articles'] for r in results] == [1, 2, 0, 4, 5]
+    assert results[2]['error'] == "boom"
+    assert all(r['seconds'] > 0 for r in results)
+    assert len(progress) == 4
+    assert len(done) == 5
+    session.close()
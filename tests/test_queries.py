@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from database import init_db, Source, Article
+import queries
+from analytics import summary_metrics
+from queries import fetch_feed_page, count_articles
+
+def make_session(tmp_path, count=60):
+    session = init_db(f"sqlite:///{tmp_path / 'news.db'}")()
+    tech = Source(name="Tech Daily", url="https://tech.example", category="Tech")
+    world = Source(name="World Wire", url="https://world.example", category="World")
+    session.add_all([tech, world])
+    session.flush()
+    start = datetime(2024, 5, 1)
+    for i in range(count):
+        source = tech if i % 2 else world
+        session.add(Article(
+            title=f"Story {i}", url=f"https://example.com/{i}", source_id=source.id, category=source.category,
+            summary=f"Summary {i}", content=("election results " if i % 3 == 0 else "market update ") * 50,
+            sentiment="Positive" if i % 4 == 0 else "Neutral",
+            # Pairs of articles share a timestamp, so the id tie-breaker matters
+            published_date=start + timedelta(hours=i // 2),
+        ))
+    session.commit()
+    return session
+
+def collect_pages(session, page_size, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, _, cursor = fetch_feed_page(session, after=cursor, page_size=page_size, **filters)
+        ids.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+def test_keyset_pages_cover_every_article_once(tmp_path):
+    session = make_session(tmp_path)
+    ids, pages = collect_pages(session, page_size=7)
+    assert len(ids) == len(set(ids)) == 60
+    assert pages == 9
+    dates = [session.get(Article, article_id).published_date for article_id in ids]
+    assert dates == sorted(dates, reverse=True)
+
+    ids, _ = collect_pages(session, page_size=10, category_filter=["Tech"], sentiment_filter=["Neutral"])
+    assert len(ids) == count_articles(session, category_filter=["Tech"], sentiment_filter=["Neutral"]) == 30
+    session.close()
+
+def test_feed_page_is_one_query_without_content(tmp_path):
+    session = make_session(tmp_path)
+    statements = []
+    event.listen(session.bind, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    rows, snippets, cursor = fetch_feed_page(session, source_filter=["World Wire"], page_size=5)
+    assert len(statements) == 1
+    assert 'content' not in statements[0]
+    assert [row.source_name for row in rows] == ["World Wire"] * 5
+    assert snippets == {} and cursor is not None
+
+    # The newest-first feed walks the published_date index instead of sorting the table
+    plan = " ".join(row[-1] for row in session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM articles ORDER BY published_date DESC, id DESC LIMIT 25"
+    )))
+    assert 'ix_articles_published_date' in plan and 'TEMP B-TREE' not in plan
+    session.close()
+
+def test_search_pages_are_ranked_with_snippets(tmp_path):
+    session = make_session(tmp_path)
+    ids, _ = collect_pages(session, page_size=6, topic_filter="election")
+    assert len(ids) == len(set(ids)) == count_articles(session, "election") == 20
+
+    rows, snippets, _ = fetch_feed_page(session, "elect*", page_size=3)
+    assert all('<mark>election</mark>' in snippets[row.id] for row in rows)
+    assert fetch_feed_page(session, "***") == ([], {}, None)
+    session.close()
+
+def test_search_window_is_cut_after_the_filters(tmp_path, monkeypatch):
+    monkeypatch.setattr(queries, 'RANK_WINDOW', 5)
+    session = make_session(tmp_path)
+    # Counts cover every match, not just the ranked window
+    assert count_articles(session, "election") == 20
+    assert count_articles(session, "election", source_filter=["World Wire"]) == 10
+    assert summary_metrics(session, "election")['total'] == 20
+
+    # The newest matches are Tech Daily's, World Wire's still fill the window
+    ids, _ = collect_pages(session, page_size=2, topic_filter="election", source_filter=["World Wire"])
+    assert len(ids) == 5
+    assert {session.get(Article, article_id).source.name for article_id in ids} == {"World Wire"}
+    session.close()
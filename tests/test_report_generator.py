@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import re
+import zlib
+from datetime import datetime
+from types import SimpleNamespace
+from database import init_db, Source, Article
+from report_generator import create_pdf_report, ReportBuilder
+
+def make_article(i):
+    return SimpleNamespace(title=f"Story {i}", summary="Lorem ipsum dolor sit amet. " * 20, url=f"https://example.com/{i}",
+                           sentiment="Neutral", source_name="Example", published_date=datetime(2024, 5, 1))
+
+def test_streamed_report_patches_page_count():
+    pdf = create_pdf_report([make_article(i) for i in range(30)], topic="AI")
+    assert pdf.startswith(b'%PDF-') and pdf.rstrip().endswith(b'%%EOF')
+
+    pages = int(re.search(rb'/Count (\d+)', pdf).group(1))
+    assert pages > 1
+    # Footers are uncompressed, one per page, and carry the final page count
+    footers = re.findall(rb'\(Page (\d+)/(\d+) *\)', pdf)
+    assert [int(number) for number, _ in footers] == list(range(1, pages + 1))
+    assert {int(total) for _, total in footers} == {pages}
+    # Page bodies are compressed
+    bodies = re.findall(rb'/Filter /FlateDecode /Length \d+>>\nstream\n(.*?)\nendstream', pdf, re.S)
+    assert len(bodies) == pages
+    assert b'(Story 29)' in b''.join(zlib.decompress(body) for body in bodies)
+
+def test_report_builder_caches_by_fingerprint(tmp_path):
+    Session = init_db(f"sqlite:///{tmp_path / 'news.db'}")
+    session = Session()
+    source = Source(name="Example", url="https://example.com")
+    session.add(source)
+    session.commit()
+    session.add_all([Article(title=f"Story {i}", url=f"https://example.com/{i}", summary="Body",
+                             sentiment="Positive" if i % 2 else "Negative", source_id=source.id) for i in range(10)])
+    session.commit()
+    session.close()
+
+    builder = ReportBuilder(Session, max_reports=1)
+    key = ReportBuilder.fingerprint('1', None, {'sentiment_filter': ['Positive']})
+    job = builder.submit(key, sentiment_filter=['Positive'])
+    path = job.result()
+    assert builder.submit(key, sentiment_filter=['Positive']) is job
+    assert b'Total Articles: 5' in zlib.decompress(
+        re.search(rb'/FlateDecode /Length \d+>>\nstream\n(.*?)\nendstream', open(path, 'rb').read(), re.S).group(1))
+
+    # A new data version is a new report, the oldest is deleted from disk
+    builder.report(ReportBuilder.fingerprint('2', None, {'sentiment_filter': ['Positive']}), sentiment_filter=['Positive'])
+    assert not os.path.exists(path)
@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from datetime import datetime, timedelta
+from database import init_db, Source, CrawlState, CrawlJob
+from jobs import job_source_ids
+from scheduler import (DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL, JITTER, next_interval, record_crawl,
+                       schedule_due_crawls)
+
+class NoJitter:
+    def uniform(self, low, high):
+        return 1.0
+
+def make_sources(tmp_path, count):
+    session = init_db(f"sqlite:///{tmp_path / 'news.db'}")()
+    for i in range(1, count + 1):
+        session.add(Source(name=f"Source {i}", url=f"https://s{i}.example"))
+    session.commit()
+    return session
+
+def test_interval_adapts_to_new_articles(tmp_path):
+    session = make_sources(tmp_path, 3)
+    start = datetime(2024, 5, 1)
+
+    def crawl(source_id, hours, new_articles, failed=False):
+        record_crawl(session, source_id, new_articles, failed=failed, now=start + timedelta(hours=hours), rng=NoJitter())
+        return session.get(CrawlState, source_id)
+
+    # The first crawl only finds the backlog
+    assert crawl(1, 0, 40).interval == DEFAULT_INTERVAL
+    # A busy source is crawled more often, never faster than MIN_INTERVAL
+    assert crawl(1, 1, 30).interval == 30
+    state = crawl(1, 1.5, 30)
+    assert state.interval == MIN_INTERVAL
+    assert state.next_crawl_at == start + timedelta(hours=1.5, minutes=MIN_INTERVAL)
+
+    # A quiet source backs off, at most doubling per crawl
+    crawl(2, 0, 10)
+    assert [crawl(2, hours, 0).interval for hours in (1, 3, 7)] == [120, 240, 480]
+    assert next_interval(MAX_INTERVAL, 0) == MAX_INTERVAL
+
+    # Failures back off without counting as a quiet period, a fixed interval wins
+    crawl(3, 0, 10)
+    assert crawl(3, 1, 0, failed=True).interval == 2 * DEFAULT_INTERVAL
+    assert session.get(CrawlState, 3).new_per_hour is None
+    session.get(Source, 3).crawl_interval = 10
+    assert crawl(3, 2, 5).next_crawl_at == start + timedelta(hours=2, minutes=10)
+    session.close()
+
+def test_jitter_spreads_next_crawls(tmp_path):
+    session = make_sources(tmp_path, 1)
+    now = datetime(2024, 5, 1)
+    record_crawl(session, 1, 3, now=now)
+    delay = session.get(CrawlState, 1).next_crawl_at - now
+    assert timedelta(minutes=DEFAULT_INTERVAL * (1 - JITTER)) <= delay <= timedelta(minutes=DEFAULT_INTERVAL * (1 + JITTER))
+    session.close()
+
+def test_due_sources_are_queued_within_budget(tmp_path):
+    session = make_sources(tmp_path, 5)
+    now = datetime.utcnow()
+
+    job = schedule_due_crawls(session, now=now, budget=3)
+    assert job.scheduled and job_source_ids(job) == [1, 2, 3]
+    # The budget is taken by the queued job
+    assert schedule_due_crawls(session, now=now, budget=3) is None
+
+    session.query(CrawlJob).filter_by(id=job.id).update({'status': 'done'})
+    session.commit()
+    assert job_source_ids(schedule_due_crawls(session, now=now, budget=3)) == [4, 5]
+    # Queued sources are leased until their crawl is recorded
+    session.query(CrawlJob).update({'status': 'done'})
+    session.commit()
+    assert schedule_due_crawls(session, now=now, budget=3) is None
+
+    record_crawl(session, 2, 1, now=now - timedelta(minutes=2 * DEFAULT_INTERVAL))
+    assert job_source_ids(schedule_due_crawls(session, now=now, budget=3)) == [2]
+    session.close()
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from database import init_db, Source, Article
+from sqlalchemy import select
+from search import to_fts_query, fts_matches, ranked_matches, snippets, highlight
+
+def test_to_fts_query():
+    assert to_fts_query('climate change') == '"climate" "change"'
+    assert to_fts_query('"prime minister" budg*') == '"prime minister" "budg"*'
+    assert to_fts_query('covid-19 OR flu OR') == '"covid 19" OR "flu"'
+    # FTS5 operators and quotes from the search box are plain text
+    assert to_fts_query('NEAR(a b) title:x "unclosed') == '"NEAR a" "b" "title x" "unclosed"'
+    assert to_fts_query(' * - ') is None
+
+def test_highlight():
+    content = "Officials said the Café opened. " + "Filler words here. " * 10 + "Cafés and coffee shops closed."
+    excerpt = highlight(content, 'cafe* coffee', words=8)
+    assert excerpt == "…said the <mark>Café</mark> opened. Filler words here. Filler…"
+    assert highlight("<b>Budget</b> talks", 'budget') == "&lt;b&gt;<mark>Budget</mark>&lt;/b&gt; talks"
+    assert highlight("Nothing relevant", 'budget') is None
+
+def search(session, user_query):
+    fts_query = to_fts_query(user_query)
+    matches = fts_matches(fts_query)
+    matches = ranked_matches(fts_query, select(matches.c.id))
+    articles = (session.query(Article)
+                .join(matches, matches.c.id == Article.id)
+                .order_by(matches.c.rank)
+                .all())
+    excerpts = snippets(articles, user_query)
+    return [article.title for article in articles], [excerpts.get(article.id) for article in articles]
+
+def test_index_follows_inserts_updates_and_deletes(tmp_path):
+    session = init_db(f"sqlite:///{tmp_path / 'news.db'}")()
+    source = Source(name="Example", url="https://example.com")
+    session.add(source)
+    session.flush()
+    budget = Article(title="Budget 2025 unveiled", url="https://example.com/1", source_id=source.id,
+                     content="The prime minister tabled the budget. Budget measures include <subsidies> for households.")
+    floods = Article(title="Floods in the east", url="https://example.com/2", source_id=source.id,
+                     content="Heavy rain displaced thousands, the budget for relief was raised.")
+    session.add_all([budget, floods])
+    session.commit()
+
+    titles, snippets = search(session, 'budget')
+    assert titles == ["Budget 2025 unveiled", "Floods in the east"] # More mentions rank first
+    assert '<mark>Budget</mark>' in snippets[0] and '&lt;subsidies&gt;' in snippets[0]
+    assert search(session, '"prime minister"')[0] == ["Budget 2025 unveiled"]
+    assert search(session, 'displ*')[0] == ["Floods in the east"]
+
+    floods.content = "Heavy rain displaced thousands."
+    session.commit()
+    assert search(session, 'budget')[0] == ["Budget 2025 unveiled"]
+
+    session.delete(budget)
+    session.commit()
+    assert search(session, 'budget')[0] == []
+    session.close()
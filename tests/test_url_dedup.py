@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sqlalchemy import event
+from database import Source, Article
+from scraper import NewsScraper
+
+def test_select_candidates_uses_bulk_lookups(tmp_path):
+    scraper = NewsScraper(f"sqlite:///{tmp_path / 'news.db'}")
+    source = Source(name="Example", url="https://example.com")
+    scraper.session.add(source)
+    scraper.session.flush()
+    for i in range(0, 1200, 2):
+        scraper.session.add(Article(title=f"Story {i}", url=f"https://example.com/news/story-{i}",
+                                   canonical_url=f"https://example.com/news/story-{i}", source_id=source.id))
+    scraper.session.commit()
+    scraper.session.refresh(source)
+
+    links = {f"https://example.com/news/story-{i}" for i in range(1200)}
+    links.add("https://elsewhere.com/news/story-1")
+    links.add("https://example.com/login")
+
+    statements = []
+    engine = scraper.session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        candidates = scraper._select_candidates(scraper.session, source, links)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert sorted(candidates.values()) == sorted(f"https://example.com/news/story-{i}" for i in range(1, 1200, 2))
+    # 1200 same-site links in chunks of 500
+    assert len(statements) == 3
+    scraper.close()
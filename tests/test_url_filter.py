@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from url_filter import UrlFilter
+
+def test_builtin_rules():
+    url_filter = UrlFilter()
+    assert url_filter.allows("https://example.com/news/2024/05/01/council-backs-transport-plan")
+    assert url_filter.allows("https://example.com/news/about-town-story")
+    assert url_filter.allows("https://example.com/tech/superuser-tools-review")
+    assert not url_filter.allows("https://example.com/about")
+    assert not url_filter.allows("https://example.com/about-us/")
+    assert not url_filter.allows("https://example.com/privacy-policy")
+    assert not url_filter.allows("https://example.com/users/42")
+    assert not url_filter.allows("https://example.com/login.php")
+    assert not url_filter.allows("https://example.com/report.PDF")
+    assert not url_filter.allows("https://www.facebook.com/sharer?u=x")
+    assert not url_filter.allows("mailto:desk@example.com")
+    assert not url_filter.allows("https://example.com/news?sort=latest")
+    assert not url_filter.allows("https://news.ycombinator.com/vote?id=1&how=up")
+    assert not url_filter.allows("https://news.ycombinator.com/item?id=1")
+    assert not url_filter.allows("https://example.com/api/list?format=json")
+
+def test_same_site_rule_uses_host_and_path_prefix():
+    url_filter = UrlFilter(site_url="https://www.scoop.my/sections")
+    assert url_filter.allows("https://scoop.my/sections/news/story-1")
+    assert not url_filter.allows("https://scoop.my/other/story-1")
+    assert not url_filter.allows("https://evil.com/?next=https://www.scoop.my/sections/x")
+
+def test_source_allow_and_deny_patterns():
+    url_filter = UrlFilter(allow_patterns=r"/profiles?/[a-z-]+-interview", deny_patterns="/sponsored/\n/live-blog\n[invalid")
+    assert url_filter.allows("https://example.com/profile/ceo-interview")
+    assert not url_filter.allows("https://example.com/profile/settings")
+    assert not url_filter.allows("https://example.com/sponsored/great-deal")
+    assert not url_filter.allows("https://example.com/news/LIVE-BLOG-election")
+    assert url_filter.allows("https://example.com/news/election-result")
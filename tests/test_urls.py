@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from urls import canonicalize_url
+
+def test_tracking_params_fragments_and_slashes_collapse():
+    variants = [
+        "https://www.example.com/news/story-1",
+        "https://www.example.com/news/story-1/",
+        "https://www.example.com/news/story-1#comments",
+        "http://WWW.Example.com:80/news//story-1",
+        "https://example.com/news/story-1?utm_medium=social&utm_source=twitter",
+        "https://example.com/news/story-1/?fbclid=abc123",
+    ]
+    assert {canonicalize_url(url) for url in variants} == {"https://example.com/news/story-1"}
+
+def test_meaningful_query_and_path_case_are_kept():
+    assert canonicalize_url("https://news.ycombinator.com/item?id=1&utm_source=x") == "https://news.ycombinator.com/item?id=1"
+    assert canonicalize_url("https://example.com/a?b=2&a=1") == canonicalize_url("https://example.com/a?a=1&b=2")
+    assert canonicalize_url("https://example.com/News/Story") != canonicalize_url("https://example.com/news/story")
+    assert canonicalize_url("https://example.com:8443/a") == "https://example.com:8443/a"
+    assert canonicalize_url("https://example.com") == "https://example.com/"
+
+def test_non_http_urls_are_left_alone():
+    assert canonicalize_url("mailto:desk@example.com") == "mailto:desk@example.com"